@@ -5,5 +5,7 @@ AgentForge Core - Framework modular para sistemas de agentes de IA
 __version__ = "0.1.0"
 
 from agentforge_core.agent.system import AgentSystem
+from agentforge_core.message import Message, Result
+from agentforge_core.sync import SyncAgentSystem
 
-__all__ = ["AgentSystem"]
+__all__ = ["AgentSystem", "Message", "Result", "SyncAgentSystem"]
@@ -4,6 +4,7 @@ Módulo principal para la gestión de agentes
 
 from agentforge_core.agent.base import Agent
 from agentforge_core.agent.registry import AgentRegistry
+from agentforge_core.agent.remote import RemoteAgent
 from agentforge_core.agent.system import AgentSystem
 
-__all__ = ["Agent", "AgentRegistry", "AgentSystem"]
+__all__ = ["Agent", "AgentRegistry", "AgentSystem", "RemoteAgent"]
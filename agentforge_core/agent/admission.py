@@ -0,0 +1,106 @@
+"""
+Control de admisión con límite de concurrencia adaptativo
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from agentforge_core.agent.scheduler import PriorityScheduler
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+class AdaptiveConcurrency:
+    """
+    Ajusta el límite de un PriorityScheduler según la latencia observada (AIMD)
+
+    La latencia de referencia es la mínima observada, que se deja subir
+    lentamente (en una ventana de baseline_window segundos) para seguir
+    cambios legítimos, como un modelo más lento. Mientras la latencia se mantiene cerca de la referencia y el
+    límite se está usando, este crece en una unidad por cada límite
+    peticiones completadas; cuando la latencia supera tolerance veces la
+    referencia, o una petición vence su timeout, el límite se multiplica por
+    backoff como mucho una vez por latencia de referencia.
+
+    Attributes:
+        min_limit (int): Límite mínimo
+        max_limit (int): Límite máximo
+        backoff (float): Factor de reducción ante congestión
+        tolerance (float): Latencia relativa a la referencia que se considera congestión
+        baseline_window (float): Segundos en los que la referencia alcanza una latencia mayor
+        limit (float): Límite actual
+    """
+
+    def __init__(self, scheduler: PriorityScheduler, initial_limit: int = 16, min_limit: int = 1,
+                 max_limit: int = 1000, backoff: float = 0.9, tolerance: float = 2.0,
+                 baseline_window: float = 60.0):
+        self.scheduler = scheduler
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.baseline_window = baseline_window
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.baseline: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._last_sample = time.monotonic()
+        scheduler.set_limit(int(self.limit))
+
+    def on_sample(self, latency: float, dropped: bool = False) -> None:
+        """
+        Registra una petición completada y ajusta el límite
+
+        Args:
+            latency: Duración de la petición en segundos (sin la espera en cola)
+            dropped: True si la petición venció su timeout o deadline
+        """
+        now = time.monotonic()
+        elapsed, self._last_sample = now - self._last_sample, now
+        self.last_latency = latency
+        if not dropped:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * min(1.0, elapsed / self.baseline_window)
+        if self.baseline is None:
+            return
+
+        if dropped or latency > self.baseline * self.tolerance:
+            # Como mucho una reducción por ventana para no desplomar el límite
+            if now - self._last_decrease >= self.baseline:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.decreases += 1
+                self._apply()
+        elif self.scheduler.active + 1 >= int(self.limit) or self.scheduler.waiting:
+            # Solo crecer si el límite actual se está usando
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.increases += 1
+            self._apply()
+
+    def _apply(self) -> None:
+        limit = int(self.limit)
+        if limit != self.scheduler.max_concurrency:
+            logger.debug(f"Límite de concurrencia ajustado a {limit}")
+            self.scheduler.set_limit(limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estado del controlador
+
+        Returns:
+            dict: Límite actual, latencias y número de ajustes
+        """
+        return {
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency": self.baseline,
+            "last_latency": self.last_latency,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
@@ -2,7 +2,15 @@
 Clase base para todos los agentes
 """
 
-from typing import Any, Dict, List, Optional, Union
+import copy
+from collections import ChainMap
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from agentforge_core.agent.tools import ToolRegistry, merge_tools, run_tool_loop
+from agentforge_core.llm.prompts import BoundPrompt, PromptTemplate
+
+# Plantilla usada por bound_prompt() si el agente no tiene una propia
+DEFAULT_PROMPT = PromptTemplate(system="Actúas como {role}.", user="{content}", name="default")
 
 class Agent:
     """
@@ -13,6 +21,8 @@ class Agent:
         name (str): Nombre legible del agente
         role (str): Descripción del rol del agente
         connections (list): Lista de agentes conectados
+        tools (ToolRegistry): Herramientas propias del agente
+        prompt (PromptTemplate): Plantilla de prompt del agente (None para DEFAULT_PROMPT)
     """
     
     def __init__(self, id: str, name: Optional[str] = None, role: Optional[str] = None):
@@ -21,6 +31,12 @@ class Agent:
         self.role = role or ""
         self.connections: List["Agent"] = []
         self.metadata: Dict[str, Any] = {}
+        self.tools = ToolRegistry()
+        self._shared_tools = False
+        self.prompt: Optional[PromptTemplate] = None
+        self._prompt_static: Dict[str, Any] = {}
+        self._bound_prompt: Optional[BoundPrompt] = None
+        self._bound_tools: Optional[Tuple] = None
         
     def connect_to(self, agent: "Agent") -> bool:
         """
@@ -37,6 +53,42 @@ class Agent:
             return True
         return False
         
+    def clone(self, agent_id: str, name: Optional[str] = None) -> "Agent":
+        """
+        Crea un agente nuevo a partir de este, usado como plantilla
+        
+        El clon comparte la configuración de la plantilla (rol, processor,
+        parámetros del framework), que debe tratarse como inmutable. Sus
+        metadatos y herramientas se copian al escribir: los cambios del clon
+        no afectan a la plantilla ni a otros clones, y lo que no modifica se
+        lee de ella. El coste no depende del tamaño de la plantilla.
+        
+        Args:
+            agent_id: ID del nuevo agente
+            name: Nombre del nuevo agente (por defecto el de la plantilla o el ID)
+            
+        Returns:
+            Agent: Agente clonado sin estado de ejecución
+        """
+        clone = copy.copy(self)
+        clone.id = agent_id
+        clone.name = name or (agent_id if self.name == self.id else self.name)
+        clone.connections = list(self.connections)
+        clone._shared_tools = True
+        if {"id", "name"} & set((self.prompt or DEFAULT_PROMPT).static_fields):
+            clone._bound_prompt = None
+        if isinstance(self.metadata, ChainMap):
+            clone.metadata = self.metadata.new_child()
+        else:
+            clone.metadata = ChainMap({}, self.metadata)
+        clone._reset_clone()
+        return clone
+        
+    def _reset_clone(self) -> None:
+        """
+        Descarta el estado de ejecución copiado de la plantilla en un clon
+        """
+        
     async def process(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
         Procesa un mensaje recibido
@@ -49,6 +101,20 @@ class Agent:
         """
         raise NotImplementedError("Los agentes deben implementar el método process")
         
+    async def stream(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa un mensaje devolviendo la respuesta por partes
+        
+        Por defecto devuelve el resultado de process en una sola parte.
+        
+        Args:
+            message: Mensaje a procesar
+            
+        Yields:
+            dict: Partes de la respuesta
+        """
+        yield await self.process(message)
+        
     def set_metadata(self, key: str, value: Any) -> None:
         """
         Establece un valor de metadatos para el agente
@@ -71,3 +137,110 @@ class Agent:
             El valor del metadato o el valor por defecto
         """
         return self.metadata.get(key, default)
+        
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Obtiene los parámetros con los que el framework puede reconstruir el agente
+        
+        Returns:
+            dict: Parámetros adicionales para create_agent (sin id, name ni role)
+        """
+        return {}
+        
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de ejecución del agente (p. ej. la conversación)
+        
+        Returns:
+            dict: Estado serializable a JSON
+        """
+        return {}
+        
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restaura el estado de ejecución obtenido con get_state
+        
+        Args:
+            state: Estado a restaurar
+        """
+        
+    def set_prompt(self, template: PromptTemplate, **static) -> None:
+        """
+        Establece la plantilla de prompt del agente
+        
+        Args:
+            template: Plantilla de prompt
+            **static: Valores fijos adicionales para el prompt de sistema
+                (además de id, name y role)
+        """
+        self.prompt = template
+        self._prompt_static = static
+        self._bound_prompt = None
+        
+    def bound_prompt(self) -> BoundPrompt:
+        """
+        Prompt del agente con la parte fija ya construida
+        
+        Se construye la primera vez que se pide con el rol, el nombre y las
+        herramientas disponibles, y se reutiliza en todas las peticiones
+        para que el prefijo sea idéntico. Se reconstruye al llamar a
+        set_prompt() o cuando cambian las herramientas del agente o del
+        sistema (se comprueba la versión de ambos registros).
+        
+        Returns:
+            BoundPrompt: Prompt listo para provider.chat_prompt
+        """
+        system_tools = getattr(self.get_metadata("system"), "tools", None)
+        key = (self.tools, self.tools.version, system_tools,
+               system_tools.version if system_tools is not None else None)
+        bound = self._bound_prompt
+        if bound is None or self._bound_tools != key:
+            tools = [tool.schema() for tool in merge_tools(self.tools, system_tools).values()]
+            static = {"id": self.id, "name": self.name, "role": self.role, **self._prompt_static}
+            bound = self._bound_prompt = (self.prompt or DEFAULT_PROMPT).bind(tools, **static)
+            self._bound_tools = key
+        return bound
+        
+    def register_tool(self, func=None, **kwargs) -> Any:
+        """
+        Registra una herramienta para este agente (también como decorador)
+        
+        Args:
+            func: Función síncrona o asíncrona
+            **kwargs: name, description, parameters, timeout, max_result_size
+            
+        Returns:
+            La función registrada
+        """
+        if self._shared_tools:
+            # Primera herramienta propia de un clon: capa sobre las de la plantilla
+            self.tools = self.tools.child()
+            self._shared_tools = False
+        return self.tools.register(func, **kwargs)
+        
+    def available_tools(self) -> Dict[str, Any]:
+        """
+        Herramientas del agente más las del sistema al que pertenece
+        
+        Returns:
+            dict: Herramientas por nombre (las del agente tienen prioridad)
+        """
+        system = self.get_metadata("system")
+        return merge_tools(self.tools, getattr(system, "tools", None))
+        
+    async def chat_with_tools(self, provider, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """
+        Conversa con un proveedor ejecutando las herramientas que pida el modelo
+        
+        Las llamadas de cada respuesta se ejecutan concurrentemente y sus
+        resultados se añaden a la conversación hasta obtener la respuesta final.
+        
+        Args:
+            provider: Proveedor de LLM
+            messages: Conversación inicial
+            **kwargs: Parámetros de run_tool_loop (max_rounds, executor) y de chat
+            
+        Returns:
+            dict: Respuesta final con "messages" y "tool_results"
+        """
+        return await run_tool_loop(provider, messages, self.available_tools(), **kwargs)
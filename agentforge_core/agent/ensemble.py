@@ -0,0 +1,97 @@
+"""
+Ejecución en conjunto (ensemble) con terminación anticipada por quórum
+"""
+
+import asyncio
+import logging
+from collections.abc import Mapping
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agentforge_core.agent.mapreduce import FAILED_STATUSES, result_text
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+def _same_text(a: Any, b: Any) -> bool:
+    return result_text(a).strip() == result_text(b).strip()
+
+async def run_ensemble(calls: Dict[str, Awaitable[Any]], quorum: Optional[int] = None,
+                       comparator: Optional[Callable[[Any, Any], bool]] = None,
+                       validator: Optional[Callable[[Any], bool]] = None) -> Dict[str, Any]:
+    """
+    Lanza varias llamadas a la vez y termina en cuanto hay quórum
+
+    Las respuestas se agrupan con el comparador (por defecto, igualdad del
+    texto de la respuesta). Si hay validador solo cuentan las respuestas que
+    lo pasan. En cuanto un grupo alcanza el quórum, o ya es imposible
+    alcanzarlo, se cancelan las llamadas que siguen en curso.
+
+    Args:
+        calls: Llamadas por nombre (agente o proveedor)
+        quorum: Respuestas coincidentes necesarias (por defecto 1 si hay
+            validador y mayoría absoluta si no)
+        comparator: Función (a, b) -> bool que indica si dos respuestas coinciden
+        validator: Función (respuesta) -> bool que indica si una respuesta es válida
+
+    Returns:
+        dict: status ("success" o "no_quorum"), result (respuesta elegida),
+        agreed (nombres que coinciden), responses (respuestas recibidas) y
+        cancelled (llamadas canceladas)
+    """
+    if quorum is None:
+        quorum = 1 if validator is not None else len(calls) // 2 + 1
+    if quorum < 1 or quorum > len(calls):
+        raise ValueError(f"Quórum {quorum} imposible con {len(calls)} participantes")
+    comparator = comparator or _same_text
+
+    tasks = {asyncio.ensure_future(call): name for name, call in calls.items()}
+    responses: Dict[str, Any] = {}
+    groups: List[List[str]] = []
+    winner: Optional[List[str]] = None
+    pending = set(tasks)
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    response = task.result()
+                except asyncio.CancelledError:
+                    response = {"status": "cancelled", "error": "Procesamiento cancelado"}
+                except Exception as e:
+                    logger.error(f"Error en ensemble con {name}: {e}")
+                    response = {"status": "error", "error": str(e)}
+                responses[name] = response
+
+                if isinstance(response, Mapping) and (response.get("status") in FAILED_STATUSES
+                                                   or response.get("role") == "error"):
+                    continue
+                if validator is not None and not validator(response):
+                    continue
+                for group in groups:
+                    if comparator(responses[group[0]], response):
+                        group.append(name)
+                        break
+                else:
+                    group = [name]
+                    groups.append(group)
+                if winner is None and len(group) >= quorum:
+                    winner = group
+
+            # Terminar si ningún grupo puede llegar ya al quórum
+            best = max((len(group) for group in groups), default=0)
+            if winner is None and best + len(pending) < quorum:
+                break
+    finally:
+        cancelled = [tasks[task] for task in tasks if not task.done()]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if cancelled:
+            await asyncio.gather(*(task for task in tasks if not task.done()), return_exceptions=True)
+
+    if winner is None:
+        return {"status": "no_quorum", "result": None, "agreed": [],
+                "responses": responses, "cancelled": cancelled}
+    return {"status": "success", "result": responses[winner[0]], "agreed": winner,
+            "responses": responses, "cancelled": cancelled}
@@ -3,12 +3,18 @@ Integración completa con el framework Atomic Agents
 Corregido el parámetro chat_message según el ejemplo
 """
 
+import asyncio
+import copy
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Union
 import os
 
 from agentforge_core.agent.base import Agent
 from agentforge_core.agent.frameworks.base import AgentFramework
+from agentforge_core.agent.schemas import CompiledSchema, compile_schema
+from agentforge_core.context import DeadlineExceeded, check_deadline, get_deadline
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -16,14 +22,29 @@ logger = logging.getLogger(__name__)
 class AtomicAgent(Agent):
     """
     Implementación de agente usando Atomic Agents
+    
+    Con esquemas propios la entrada se construye con message["input"] o, si
+    no existe, con los campos del mensaje que tenga el esquema, y la
+    respuesta se devuelve como dict en "response" y como instancia del
+    esquema en "output". Los esquemas se compilan una vez y se comparten
+    entre todos los agentes que los usan.
+    
+    Attributes:
+        input_schema (CompiledSchema): Esquema de entrada propio (None para el de Atomic Agents)
+        output_schema (CompiledSchema): Esquema de salida propio (None para el de Atomic Agents)
     """
     
-    def __init__(self, id: str, name: Optional[str] = None, role: Optional[str] = None, **kwargs):
+    def __init__(self, id: str, name: Optional[str] = None, role: Optional[str] = None,
+                 input_schema: Union[str, type, None] = None, output_schema: Union[str, type, None] = None,
+                 **kwargs):
         super().__init__(id, name, role)
         self.atomic_config = kwargs
+        self.input_schema: Optional[CompiledSchema] = compile_schema(input_schema) if input_schema else None
+        self.output_schema: Optional[CompiledSchema] = compile_schema(output_schema) if output_schema else None
         self._atomic_agent = None
         self._initialized = False
         self._input_schema = None
+        self._pending_memory = None
         
     async def process(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -47,26 +68,53 @@ class AtomicAgent(Agent):
             }
             
         try:
-            # Obtener el contenido del mensaje
-            content = message.get('content', '')
-            
-            # Crear la instancia correcta de InputSchema usando chat_message según el ejemplo
-            if self._input_schema:
-                input_data = self._input_schema(chat_message=content)
-                # Procesar con el agente atómico pasando la instancia del esquema
-                atomic_response = self._atomic_agent.run(input_data)
-            else:
-                # Alternativa: probar pasando un diccionario
-                atomic_response = self._atomic_agent.run({"chat_message": content})
+            # No llamar al LLM si el deadline ya ha pasado
+            check_deadline()
+        except DeadlineExceeded as e:
+            return {
+                "status": "expired",
+                "agent": self.id,
+                "error": str(e),
+                "input": message
+            }
+            
+        try:
+            input_data = self._build_input(message)
+                
+            # BaseAgent.run es síncrono: se ejecuta en el pool del framework para no
+            # bloquear el bucle. Si se cancela antes de empezar libera su hueco y,
+            # si ya ha empezado, la llamada al modelo termina como tarde en el
+            # deadline de la petición
+            framework = self.get_metadata("framework")
+            executor = getattr(framework, "executor", None)
+            loop = asyncio.get_running_loop()
+            atomic_response = await loop.run_in_executor(executor, self._run_atomic, framework,
+                                                         input_data, get_deadline())
             
             # Construir respuesta en formato estándar
+            if self.output_schema is None:
+                return {
+                    "status": "success",
+                    "agent": self.id,
+                    "role": self.role,
+                    "response": atomic_response.chat_message,
+                    "input": message,
+                }
             return {
                 "status": "success",
                 "agent": self.id,
                 "role": self.role,
-                "response": atomic_response.chat_message,
+                "response": atomic_response.model_dump(),
+                "output": atomic_response,
                 "input": message,
             }
+        except DeadlineExceeded as e:
+            return {
+                "status": "expired",
+                "agent": self.id,
+                "error": str(e),
+                "input": message
+            }
         except Exception as e:
             logger.error(f"Error procesando mensaje en agente Atomic {self.id}: {e}")
             return {
@@ -76,6 +124,55 @@ class AtomicAgent(Agent):
                 "input": message
             }
         
+    def _run_atomic(self, framework: Any, input_data: Any, deadline: Optional[float]) -> Any:
+        """
+        Ejecuta BaseAgent.run en un hilo del pool acotado por el deadline
+        
+        Los hilos del pool no heredan el contexto de la petición, así que el
+        deadline se recibe como argumento. Con deadline la llamada usa un
+        cliente cuyo timeout es el tiempo restante; el agente se copia para
+        no cambiar el cliente de otras llamadas (la memoria se comparte).
+        
+        Raises:
+            DeadlineExceeded: Si el deadline pasó mientras esperaba un hilo libre
+        """
+        agent = self._atomic_agent
+        if deadline is not None and hasattr(framework, "client_for"):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline superado antes de llamar al modelo del agente {self.id}")
+            client = framework.client_for(remaining)
+            if client is not None:
+                agent = copy.copy(agent)
+                agent.client = client
+        return agent.run(input_data)
+        
+    def _build_input(self, message: Dict[str, Any]) -> Any:
+        """
+        Construye la entrada del agente Atomic a partir del mensaje
+        
+        Los mensajes internos pueden llevar en "input" una instancia del
+        esquema (p. ej. el "output" de otro agente), que no se vuelve a validar.
+        Con el esquema de Atomic Agents un "input" que no es una instancia se
+        ignora (los resultados de otros agentes lo llevan) y la entrada se
+        construye con "content".
+        
+        Args:
+            message: Mensaje a procesar
+            
+        Returns:
+            Instancia del esquema de entrada
+        """
+        schema = self._input_schema
+        data = message.get("input")
+        if isinstance(data, schema.model):
+            return data
+        if self.input_schema is None:
+            return schema.validate({"chat_message": message.get("content", "")})
+        if data is None:
+            data = {key: message[key] for key in schema.fields if key in message}
+        return schema.validate(data)
+        
     def initialize(self) -> bool:
         """
         Inicializa el agente de Atomic Agents
@@ -101,22 +198,28 @@ class AtomicAgent(Agent):
             from atomic_agents.agents.base_agent import BaseAgentInputSchema, BaseAgentOutputSchema
             
             # Obtener parámetros específicos
-            system_prompt = self.atomic_config.pop("system_prompt", "")
+            system_prompt = self.atomic_config.get("system_prompt", "")
             
             # Guardar referencia al esquema de entrada para usarlo en process()
-            self._input_schema = BaseAgentInputSchema
+            self._input_schema = self.input_schema or compile_schema(BaseAgentInputSchema)
+            output_schema = self.output_schema.model if self.output_schema else BaseAgentOutputSchema
             
             # Crear la configuración completa
             agent_config = BaseAgentConfig(
                 system_prompt=system_prompt,
                 client=client,
-                input_schema=BaseAgentInputSchema,
-                output_schema=BaseAgentOutputSchema
+                input_schema=self._input_schema.model,
+                output_schema=output_schema
             )
             
             # Crear el agente con la configuración
             self._atomic_agent = BaseAgent(config=agent_config)
             
+            # Recuperar la conversación restaurada desde un snapshot
+            if self._pending_memory is not None:
+                self._atomic_agent.memory.load(self._pending_memory)
+                self._pending_memory = None
+            
             self._initialized = True
             logger.info(f"Agente Atomic {self.id} inicializado correctamente")
             return True
@@ -124,6 +227,57 @@ class AtomicAgent(Agent):
             logger.error(f"Error inicializando agente Atomic {self.id}: {e}")
             return False
 
+    def _reset_clone(self) -> None:
+        # El agente de Atomic guarda la memoria de conversación: cada clon
+        # crea el suyo al procesar su primer mensaje
+        self._atomic_agent = None
+        self._initialized = False
+        self._input_schema = None
+        self._pending_memory = None
+        
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Obtiene los parámetros de Atomic Agents con los que se creó el agente
+        
+        Returns:
+            dict: Parámetros adicionales para create_agent (los esquemas
+            propios como referencias "modulo:nombre")
+        """
+        config = dict(self.atomic_config)
+        if self.input_schema is not None:
+            config["input_schema"] = self.input_schema.reference
+        if self.output_schema is not None:
+            config["output_schema"] = self.output_schema.reference
+        return config
+        
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Obtiene la memoria de conversación del agente
+        
+        Returns:
+            dict: Estado serializable a JSON
+        """
+        if self._atomic_agent is not None:
+            return {"memory": self._atomic_agent.memory.dump()}
+        if self._pending_memory is not None:
+            return {"memory": self._pending_memory}
+        return {}
+        
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restaura la memoria de conversación (se aplica al inicializar el agente)
+        
+        Args:
+            state: Estado obtenido con get_state
+        """
+        memory = state.get("memory")
+        if memory is None:
+            return
+        if self._atomic_agent is not None:
+            self._atomic_agent.memory.load(memory)
+        else:
+            self._pending_memory = memory
+            
     def connect_to(self, agent: "Agent") -> bool:
         """
         Conecta este agente a otro
@@ -147,14 +301,23 @@ class AtomicAgentsFramework(AgentFramework):
         self.config = config or {}
         self._initialized = False
         self._client = None
+        self._openai = None
+        self._instructor = None
+        self._timeout: Optional[float] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
         
     def create_agent(self, agent_id: str, **kwargs) -> AtomicAgent:
         """
         Crea un agente de tipo Atomic
         
+        Los esquemas se compilan al crear el primer agente que los usa y
+        el resto de agentes reutilizan la misma compilación.
+        
         Args:
             agent_id: ID único del agente
-            **kwargs: Parámetros del agente
+            **kwargs: Parámetros del agente; input_schema y output_schema
+                admiten modelos de pydantic (subclases de BaseIOSchema de
+                Atomic Agents) o referencias "modulo:nombre"
             
         Returns:
             AtomicAgent: Instancia del agente creado
@@ -187,10 +350,16 @@ class AtomicAgentsFramework(AgentFramework):
             # Obtener configuración
             api_key = self.config.get("api_key", None)
             model = self.config.get("model", "gpt-3.5-turbo")
+            timeout = self.config.get("timeout", 60.0)
+            base_url = self.config.get("base_url")
             
             # Si no se proporciona API key, intentar obtenerla de la variable de entorno
             if not api_key:
                 api_key = os.environ.get("OPENAI_API_KEY")
+                
+            # Los servidores compatibles propios no suelen exigir clave
+            if not api_key and base_url:
+                api_key = "sin-clave"
             
             # Verificar que tenemos una API key
             if not api_key:
@@ -201,14 +370,23 @@ class AtomicAgentsFramework(AgentFramework):
             from openai import OpenAI
                 
             # Crear cliente con instructor
-            base_client = OpenAI(api_key=api_key)
+            base_client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
             client_with_instructor = instructor.from_openai(
                 client=base_client,
                 mode=instructor.Mode.TOOLS
             )
             
-            # Almacenar el cliente
+            # Almacenar el cliente (y el base para crear clientes por llamada)
             self._client = client_with_instructor
+            self._openai = base_client
+            self._instructor = instructor
+            self._timeout = timeout
+            
+            # Pool propio para las llamadas síncronas de los agentes
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.config.get("max_workers"),
+                thread_name_prefix="atomic-agents"
+            )
             logger.info(f"Cliente OpenAI con Instructor inicializado correctamente usando modelo {model}")
             
             self._initialized = True
@@ -228,12 +406,38 @@ class AtomicAgentsFramework(AgentFramework):
         if not self._initialized:
             return True
             
-        # Liberar referencias
+        # Liberar referencias y descartar las llamadas que aún no han empezado
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
         self._client = None
+        self._openai = None
+        self._instructor = None
         self._initialized = False
         logger.info(f"Framework AtomicAgents detenido correctamente")
         return True
     
+    def client_for(self, timeout: float) -> Any:
+        """
+        Cliente con Instructor para una llamada con un timeout propio
+        
+        Comparte el pool de conexiones del cliente base (with_options no
+        abre conexiones nuevas). No reintenta: un reintento tras agotar el
+        timeout terminaría después del deadline.
+        
+        Args:
+            timeout: Tiempo máximo de la llamada (se limita al timeout configurado)
+            
+        Returns:
+            Cliente con Instructor, o None si el framework no está iniciado
+        """
+        if self._openai is None:
+            return None
+        if self._timeout is not None:
+            timeout = min(timeout, self._timeout)
+        return self._instructor.from_openai(client=self._openai.with_options(timeout=timeout, max_retries=0),
+                                            mode=self._instructor.Mode.TOOLS)
+        
     def configure(self, config: Dict[str, Any]) -> None:
         """
         Configura el framework con parámetros específicos
@@ -2,11 +2,14 @@
 Framework para agentes personalizados
 """
 
+import importlib
+import inspect
 import logging
-from typing import Any, Callable, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
 from agentforge_core.agent.base import Agent
 from agentforge_core.agent.frameworks.base import AgentFramework
+from agentforge_core.message import Result
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -25,6 +28,9 @@ class CustomAgent(Agent):
         """
         Procesa un mensaje usando la función processor definida por el usuario
         
+        Si el processor es un generador asíncrono se recorre el stream
+        completo y se devuelve el contenido de todas las partes unido.
+        
         Args:
             message: Mensaje a procesar
             
@@ -40,11 +46,19 @@ class CustomAgent(Agent):
                 "input": message
             }
             
+        if inspect.isasyncgenfunction(self.processor):
+            return await self._collect_stream(message)
+            
         try:
             if callable(self.processor):
                 result = await self.processor(self, message)
                 
                 # Asegurar que el resultado tenga un formato estándar
+                if isinstance(result, Result):
+                    # Inmutable: se completa con una copia solo si le falta algo
+                    if result.status is None or result.agent is None:
+                        result = result.evolve(status=result.status or "success", agent=result.agent or self.id)
+                    return result
                 if isinstance(result, dict):
                     if "status" not in result:
                         result["status"] = "success"
@@ -68,6 +82,111 @@ class CustomAgent(Agent):
                 "error": str(e),
                 "input": message
             }
+            
+    async def _collect_stream(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Recorre el stream del processor y devuelve una respuesta completa
+        """
+        parts = []
+        chunks = self.stream(message)
+        try:
+            async for chunk in chunks:
+                if chunk.get("status") not in (None, "success"):
+                    # Las partes de error terminan el stream
+                    return chunk
+                content = chunk.get("content")
+                if content is not None:
+                    parts.append(str(content))
+        finally:
+            await chunks.aclose()
+        return {
+            "status": "success",
+            "agent": self.id,
+            "response": "".join(parts),
+            "input": message
+        }
+        
+    async def stream(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa un mensaje devolviendo la respuesta por partes
+        
+        Si el processor es un generador asíncrono cada valor que produce es
+        una parte (los textos se envuelven en {"content": texto}); si no, la
+        respuesta completa se devuelve en una sola parte.
+        
+        Args:
+            message: Mensaje a procesar
+            
+        Yields:
+            dict: Partes de la respuesta
+        """
+        if not inspect.isasyncgenfunction(self.processor):
+            yield await self.process(message)
+            return
+            
+        chunks = self.processor(self, message)
+        try:
+            async for chunk in chunks:
+                yield chunk if isinstance(chunk, dict) else {"content": chunk}
+        except Exception as e:
+            logger.error(f"Error en streaming en agente Custom {self.id}: {e}")
+            yield {
+                "status": "error",
+                "agent": self.id,
+                "error": str(e)
+            }
+        finally:
+            await chunks.aclose()
+            
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Obtiene la referencia importable ("modulo:funcion") del processor
+        
+        Returns:
+            dict: Parámetros adicionales para create_agent
+            
+        Raises:
+            ValueError: Si el processor no es importable (lambda o función
+                anidada) y el agente no se podría reconstruir
+        """
+        reference = processor_reference(self.processor)
+        if self.processor is not None and reference is None:
+            raise ValueError(f"El processor del agente {self.id} no es importable (lambda o función anidada)")
+        return {"processor": reference} if reference else {}
+
+def processor_reference(processor: Optional[Callable]) -> Optional[str]:
+    """
+    Obtiene la referencia "modulo:funcion" de un processor importable
+    
+    Args:
+        processor: Función processor
+        
+    Returns:
+        str: Referencia o None si la función no se puede importar por nombre
+    """
+    module = getattr(processor, "__module__", None)
+    qualname = getattr(processor, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+    
+def resolve_processor(reference: str) -> Callable:
+    """
+    Importa un processor a partir de su referencia "modulo:funcion"
+    
+    Args:
+        reference: Referencia del processor
+        
+    Returns:
+        Callable: Función processor
+    """
+    module_name, _, qualname = reference.partition(":")
+    if not qualname:
+        raise ValueError(f"Referencia de processor inválida: {reference}")
+    target: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
 
 class CustomAgentFramework(AgentFramework):
     """
@@ -83,13 +202,17 @@ class CustomAgentFramework(AgentFramework):
         
         Args:
             agent_id: ID único del agente
-            processor: Función que procesa los mensajes
+            processor: Función que procesa los mensajes o su referencia "modulo:funcion"
             **kwargs: Parámetros adicionales
             
         Returns:
             CustomAgent: Instancia del agente creado
         """
         processor = kwargs.pop("processor", None)
+        if isinstance(processor, str):
+            processor = resolve_processor(processor)
         agent = CustomAgent(agent_id, processor=processor, **kwargs)
+        # Guardar referencia al framework en el agente
+        agent.set_metadata("framework", self)
         logger.debug(f"Agente Custom {agent_id} creado")
         return agent
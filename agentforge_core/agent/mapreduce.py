@@ -0,0 +1,276 @@
+"""
+Map-reduce en streaming sobre entradas grandes
+
+La entrada se lee por bloques y se divide en fragmentos que se envían a los
+agentes con un número limitado de peticiones en vuelo, de modo que nunca hay
+en memoria más de unos pocos fragmentos. Los resultados parciales se combinan
+en un árbol: cada fan_in resultados consecutivos se reducen en uno, y así
+sucesivamente hasta obtener un único resultado.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from agentforge_core.message import to_builtin
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+FAILED_STATUSES = {"error", "timeout", "expired", "cancelled", "overloaded", "quota_exceeded"}
+
+def _split_point(text: str, limit: int) -> int:
+    """
+    Busca el mejor punto de corte (párrafo, línea o espacio) antes de limit
+    """
+    floor = limit * 4 // 5
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, floor, limit)
+        if position > 0:
+            return position + len(separator)
+    return limit
+
+async def _blocks(source: Union[str, Path, AsyncIterator[str]], size: int) -> AsyncIterator[str]:
+    if isinstance(source, (str, Path)):
+        loop = asyncio.get_running_loop()
+        with open(source, "r", encoding="utf-8") as f:
+            while True:
+                block = await loop.run_in_executor(None, f.read, size)
+                if not block:
+                    return
+                yield block
+    else:
+        async for block in source:
+            yield block
+
+async def chunk_stream(source: Union[str, Path, AsyncIterator[str]], chunk_size: int = 8000,
+                       overlap: int = 0) -> AsyncIterator[str]:
+    """
+    Divide una entrada en fragmentos sin cargarla entera en memoria
+
+    Los cortes se hacen preferentemente en un salto de párrafo, de línea o
+    en un espacio dentro del último 20% del fragmento.
+
+    Args:
+        source: Ruta de un fichero de texto o iterador asíncrono de texto
+        chunk_size: Tamaño máximo de cada fragmento en caracteres
+        overlap: Caracteres del final de un fragmento que se repiten al
+            principio del siguiente
+
+    Yields:
+        str: Fragmentos de la entrada
+    """
+    if overlap >= chunk_size:
+        raise ValueError("overlap debe ser menor que chunk_size")
+    buffer = ""
+    async for block in _blocks(source, chunk_size):
+        buffer += block
+        while len(buffer) >= chunk_size:
+            cut = _split_point(buffer, chunk_size)
+            yield buffer[:cut]
+            buffer = buffer[cut - overlap:] if cut > overlap else buffer[cut:]
+    if buffer.strip():
+        yield buffer
+
+def result_text(result: Any) -> str:
+    """
+    Extrae el texto de la respuesta de un agente
+
+    Args:
+        result: Respuesta del agente
+
+    Returns:
+        str: Campo "response" o "content", o la respuesta en JSON
+    """
+    if isinstance(result, str):
+        return result
+    if isinstance(result, Mapping):
+        for key in ("response", "content", "result"):
+            value = result.get(key)
+            if isinstance(value, str):
+                return value
+    return json.dumps(result, ensure_ascii=False, default=to_builtin)
+
+def default_map_message(chunk: str, index: int) -> Dict[str, Any]:
+    return {"task": "map", "chunk": index, "content": chunk}
+
+def default_reduce_message(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"task": "reduce", "parts": parts, "content": "\n\n".join(result_text(part) for part in parts)}
+
+class _Level:
+    """
+    Resultados de un nivel del árbol, agrupados por orden de posición
+    """
+
+    def __init__(self):
+        self.results: Dict[int, Any] = {}
+        self.next_position = 0
+        self.received = 0
+        self.total: Optional[int] = None
+        self.groups = 0
+        self.buffer: List[Any] = []
+        self.closed = False
+
+class MapReduce:
+    """
+    Ejecución de un map-reduce sobre los agentes de un AgentSystem
+
+    Attributes:
+        agents (list): IDs de los agentes de la fase map (se reparten en turno rotatorio)
+        reduce_agent (str): ID del agente que combina los resultados
+        max_parallel (int): Máximo de peticiones a agentes en vuelo
+        fan_in (int): Resultados que se combinan en cada reducción
+    """
+
+    def __init__(self, system, agents: List[str], reduce_agent: Optional[str] = None,
+                 map_message: Optional[Callable[[str, int], Dict[str, Any]]] = None,
+                 reduce_message: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+                 max_parallel: int = 4, fan_in: int = 4, timeout: Optional[float] = None):
+        if not agents:
+            raise ValueError("map_reduce necesita al menos un agente")
+        if fan_in < 2:
+            raise ValueError("fan_in debe ser al menos 2")
+        self.system = system
+        self.agents = list(agents)
+        self.reduce_agent = reduce_agent or self.agents[0]
+        self.map_message = map_message or default_map_message
+        self.reduce_message = reduce_message or default_reduce_message
+        self.max_parallel = max_parallel
+        self.fan_in = fan_in
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_parallel)
+        self._done: asyncio.Queue = asyncio.Queue()
+        self._tasks: set = set()
+        self._levels: List[_Level] = []
+        self._failed = 0
+
+    async def run(self, chunks: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecuta el map-reduce
+
+        Args:
+            chunks: Fragmentos de la entrada
+
+        Yields:
+            dict: Eventos "map" y "reduce" con cada resultado parcial y un
+            evento final "result"
+        """
+        producer = asyncio.create_task(self._produce(chunks))
+        self._tasks.add(producer)
+        try:
+            while True:
+                kind, level, position, value = await self._done.get()
+                if kind == "error":
+                    raise value
+                if kind == "eof":
+                    self._level(0).total = position
+                else:
+                    completed = self._level(level).received + 1
+                    if level == 0:
+                        yield {"event": "map", "index": position, "result": value,
+                               "completed": completed, "total": self._levels[0].total}
+                    elif kind == "reduce":
+                        yield {"event": "reduce", "level": level, "index": position, "result": value}
+                    self._add(level, position, value)
+                final = self._advance()
+                if final is not None:
+                    yield {"event": "result", "result": final[0],
+                           "chunks": self._levels[0].total, "failed": self._failed}
+                    return
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _level(self, level: int) -> _Level:
+        while len(self._levels) <= level:
+            self._levels.append(_Level())
+        return self._levels[level]
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _produce(self, chunks: AsyncIterator[str]) -> None:
+        try:
+            count = 0
+            window = asyncio.Semaphore(self.max_parallel)
+            async for chunk in chunks:
+                # No leer más fragmentos de los que se pueden procesar
+                await window.acquire()
+                agent_id = self.agents[count % len(self.agents)]
+                self._spawn(self._map(agent_id, chunk, count, window))
+                count += 1
+            self._done.put_nowait(("eof", 0, count, None))
+        except Exception as e:
+            self._done.put_nowait(("error", 0, 0, e))
+
+    async def _call(self, agent_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._slots:
+            try:
+                return await self.system.process_message(agent_id, message, timeout=self.timeout)
+            except Exception as e:
+                logger.error(f"Error en map-reduce con el agente {agent_id}: {e}")
+                return {"status": "error", "agent": agent_id, "error": str(e)}
+
+    async def _map(self, agent_id: str, chunk: str, index: int, window: asyncio.Semaphore) -> None:
+        try:
+            result = await self._call(agent_id, self.map_message(chunk, index))
+        finally:
+            window.release()
+        self._done.put_nowait(("map", 0, index, result))
+
+    async def _reduce(self, level: int, group: int, parts: List[Dict[str, Any]]) -> None:
+        result = await self._call(self.reduce_agent, self.reduce_message(parts))
+        self._done.put_nowait(("reduce", level, group, result))
+
+    def _add(self, level: int, position: int, value: Any) -> None:
+        """
+        Añade un resultado y lanza la reducción de cada grupo completo de
+        resultados consecutivos
+        """
+        current = self._level(level)
+        if isinstance(value, Mapping) and value.get("status") in FAILED_STATUSES:
+            self._failed += 1
+            value = None
+        current.results[position] = value
+        current.received += 1
+        while current.next_position in current.results:
+            current.buffer.append(current.results.pop(current.next_position))
+            current.next_position += 1
+            if len(current.buffer) == self.fan_in:
+                self._flush(level)
+
+    def _flush(self, level: int) -> None:
+        current = self._level(level)
+        parts = [part for part in current.buffer if part is not None]
+        group = current.groups
+        current.groups += 1
+        current.buffer = []
+        if len(parts) > 1:
+            self._spawn(self._reduce(level + 1, group, parts))
+        else:
+            # Nada que combinar: el resultado sube tal cual
+            self._done.put_nowait(("pass", level + 1, group, parts[0] if parts else None))
+
+    def _advance(self) -> Optional[Tuple[Any]]:
+        """
+        Cierra los niveles completos y devuelve el resultado final cuando lo hay
+        """
+        for level, current in enumerate(self._levels):
+            if current.total is None or current.received < current.total:
+                return None
+            if current.total <= 1:
+                value = current.buffer[0] if current.buffer else None
+                return (value,)
+            if not current.closed:
+                if current.buffer:
+                    self._flush(level)
+                current.closed = True
+                self._level(level + 1).total = current.groups
+        return None
@@ -2,33 +2,251 @@
 Registro de agentes disponibles
 """
 
-from typing import Dict, List, Optional, Union
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 from agentforge_core.agent.base import Agent
 
+# Configurar logger
+logger = logging.getLogger(__name__)
+
 class AgentRegistry:
     """
     Registro centralizado de agentes disponibles
+    
+    Los agentes registrados como desechables (p. ej. uno por sesión de
+    usuario) se eliminan solos cuando llevan más de ttl segundos sin usarse
+    o, si se supera max_agents, empezando por el usado hace más tiempo.
+    Los que tienen peticiones en curso (ver in_use) no se eliminan.
+    
+    Puede modificarse desde varios hilos a la vez: cada operación se hace
+    con un cerrojo reentrante, así que los loaders y los listeners pueden
+    volver a llamar al registro.
+    
+    Attributes:
+        ttl (float): Segundos sin uso tras los que se elimina un agente desechable (None sin límite)
+        max_agents (int): Máximo de agentes desechables registrados (None sin límite)
+        on_evict: Función (agent_id, agent) llamada antes de eliminar cada
+            agente desechable, p. ej. para guardar su estado
+        evicted (int): Agentes desechables eliminados
     """
     
-    def __init__(self):
+    def __init__(self, ttl: Optional[float] = None, max_agents: Optional[int] = None,
+                 on_evict: Optional[Callable[[str, Agent], None]] = None):
         self._agents: Dict[str, Agent] = {}
+        self._lazy: Dict[str, Callable[[str], Agent]] = {}
+        self._listeners: List[Callable[[str, str, Optional[Agent]], None]] = []
+        self.ttl = ttl
+        self.max_agents = max_agents
+        self.on_evict = on_evict
+        self.evicted = 0
+        # Agentes desechables por orden de último uso {id: instante}
+        self._idle: "OrderedDict[str, float]" = OrderedDict()
+        # Peticiones en curso por agente {id: número}
+        self._busy: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        
+    def configure_eviction(self, ttl: Optional[float] = None, max_agents: Optional[int] = None,
+                           on_evict: Optional[Callable[[str, Agent], None]] = None) -> None:
+        """
+        Configura la eliminación de agentes desechables inactivos
         
-    def register(self, agent_id: str, agent: Agent) -> bool:
+        Args:
+            ttl: Segundos sin uso tras los que se elimina un agente (None sin límite)
+            max_agents: Máximo de agentes desechables (None sin límite)
+            on_evict: Función (agent_id, agent) llamada antes de eliminar cada agente
+        """
+        with self._lock:
+            self.ttl = ttl
+            self.max_agents = max_agents
+            if on_evict is not None:
+                self.on_evict = on_evict
+            self.evict_idle()
+        
+    def add_listener(self, listener: Callable[[str, str, Optional[Agent]], None]) -> None:
+        """
+        Registra una función que se llama en cada alta o baja de agentes
+        
+        La función recibe el evento ("add", "lazy" o "remove"), el ID del
+        agente y la instancia (None para "lazy" y "remove").
+        
+        Args:
+            listener: Función a llamar
+        """
+        with self._lock:
+            self._listeners.append(listener)
+        
+    def remove_listener(self, listener: Callable[[str, str, Optional[Agent]], None]) -> None:
+        """
+        Deja de notificar a una función registrada con add_listener
+        
+        Args:
+            listener: Función a eliminar
+        """
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+            
+    def _notify(self, event: str, agent_id: str, agent: Optional[Agent] = None) -> None:
+        for listener in list(self._listeners):
+            listener(event, agent_id, agent)
+        
+    def register(self, agent_id: str, agent: Agent, evictable: bool = False) -> bool:
         """
         Registra un agente en el sistema
         
         Args:
             agent_id: ID único del agente
             agent: Instancia del agente
+            evictable: Si es True el agente se elimina cuando queda inactivo
+                (ver ttl y max_agents)
+            
+        Returns:
+            bool: True si el agente fue registrado con éxito
+        """
+        with self._lock:
+            if agent_id in self._agents or agent_id in self._lazy:
+                return False
+            self._agents[agent_id] = agent
+            self._notify("add", agent_id, agent)
+            if evictable:
+                self._idle[agent_id] = time.monotonic()
+                self.evict_idle(keep=agent_id)
+            return True
+        
+    def evict_idle(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Elimina los agentes desechables que han superado ttl o max_agents
+        
+        Se llama sola al registrar, al obtener y al terminar de usar agentes
+        (y periódicamente desde AgentSystem); solo recorre los agentes que
+        hay que eliminar y los que se saltan por estar en uso.
+        
+        Args:
+            keep: ID de un agente que no debe eliminarse aunque le toque
+                (el que se acaba de registrar u obtener)
+        
+        Returns:
+            list: IDs de los agentes eliminados
+        """
+        with self._lock:
+            evicted = []
+            now = time.monotonic()
+            excess = 0 if self.max_agents is None else len(self._idle) - self.max_agents
+            for agent_id, last_used in list(self._idle.items()):
+                expired = self.ttl is not None and now - last_used > self.ttl
+                if not expired and excess <= 0:
+                    break
+                if agent_id in self._busy or agent_id == keep:
+                    # En uso: se elimina cuando termine, si le toca
+                    continue
+                self._evict(agent_id)
+                evicted.append(agent_id)
+                excess -= 1
+            return evicted
+            
+    @contextmanager
+    def in_use(self, agent_id: str) -> Iterator[None]:
+        """
+        Marca un agente como en uso durante el bloque para que no se elimine
+        
+        Al terminar cuenta como último uso del agente.
+        
+        Args:
+            agent_id: ID del agente
+        """
+        with self._lock:
+            self._busy[agent_id] = self._busy.get(agent_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                remaining = self._busy[agent_id] - 1
+                if remaining:
+                    self._busy[agent_id] = remaining
+                else:
+                    del self._busy[agent_id]
+                if agent_id in self._idle:
+                    self._idle[agent_id] = time.monotonic()
+                    self._idle.move_to_end(agent_id)
+                    self.evict_idle()
+        
+    def _evict(self, agent_id: str) -> None:
+        del self._idle[agent_id]
+        agent = self._agents.get(agent_id)
+        if agent is None:
+            return
+        if self.on_evict is not None:
+            try:
+                self.on_evict(agent_id, agent)
+            except Exception as e:
+                logger.error(f"Error guardando el agente {agent_id} antes de eliminarlo: {e}")
+        del self._agents[agent_id]
+        self.evicted += 1
+        self._notify("remove", agent_id)
+        
+    def register_lazy(self, agent_id: str, loader: Callable[[str], Agent]) -> bool:
+        """
+        Registra un agente que se construirá la primera vez que se use
+        
+        Args:
+            agent_id: ID único del agente
+            loader: Función que recibe el ID y devuelve el agente
             
         Returns:
             bool: True si el agente fue registrado con éxito
         """
-        if agent_id in self._agents:
-            return False
-        self._agents[agent_id] = agent
-        return True
+        with self._lock:
+            if agent_id in self._agents or agent_id in self._lazy:
+                return False
+            self._lazy[agent_id] = loader
+            self._notify("lazy", agent_id)
+            return True
+        
+    def is_loaded(self, agent_id: str) -> bool:
+        """
+        Indica si un agente registrado ya está construido
+        
+        Args:
+            agent_id: ID del agente
+            
+        Returns:
+            bool: True si el agente existe y no está pendiente de carga
+        """
+        return agent_id in self._agents
+        
+    def ids(self) -> List[str]:
+        """
+        Lista los IDs de todos los agentes sin construir los pendientes
+        
+        Returns:
+            list: IDs de los agentes registrados
+        """
+        with self._lock:
+            return list(self._agents) + list(self._lazy)
+        
+    def replace(self, agent_id: str, agent: Agent) -> Optional[Agent]:
+        """
+        Registra un agente sustituyendo al que tuviera el mismo ID
+        
+        Args:
+            agent_id: ID único del agente
+            agent: Nueva instancia del agente
+            
+        Returns:
+            Agent: Instancia sustituida o None si no existía
+        """
+        with self._lock:
+            self._lazy.pop(agent_id, None)
+            self._idle.pop(agent_id, None)
+            previous = self._agents.get(agent_id)
+            self._agents[agent_id] = agent
+            self._notify("add", agent_id, agent)
+            return previous
         
     def get(self, agent_id: str) -> Optional[Agent]:
         """
@@ -40,16 +258,43 @@ class AgentRegistry:
         Returns:
             Agent: Instancia del agente o None si no existe
         """
-        return self._agents.get(agent_id)
+        with self._lock:
+            if agent_id in self._idle:
+                self._idle[agent_id] = time.monotonic()
+                self._idle.move_to_end(agent_id)
+                self.evict_idle(keep=agent_id)
+            agent = self._agents.get(agent_id)
+            if agent is None and agent_id in self._lazy:
+                # El loader puede registrar el agente él mismo antes de resolver
+                # sus conexiones, así los ciclos no se cargan dos veces
+                loader = self._lazy.pop(agent_id)
+                try:
+                    loaded = loader(agent_id)
+                    if agent_id not in self._agents:
+                        self._agents[agent_id] = loaded
+                        self._notify("add", agent_id, loaded)
+                    agent = self._agents[agent_id]
+                except Exception:
+                    self._agents.pop(agent_id, None)
+                    self._lazy[agent_id] = loader
+                    raise
+            return agent
         
-    def list_agents(self) -> Dict[str, Agent]:
+    def list_agents(self, materialize: bool = True) -> Dict[str, Agent]:
         """
         Lista todos los agentes registrados
         
+        Args:
+            materialize: Si es False no se construyen los agentes pendientes de carga
+            
         Returns:
             dict: Diccionario con todos los agentes {id: agente}
         """
-        return self._agents.copy()
+        with self._lock:
+            if materialize:
+                for agent_id in list(self._lazy):
+                    self.get(agent_id)
+            return self._agents.copy()
         
     def remove(self, agent_id: str) -> bool:
         """
@@ -61,10 +306,31 @@ class AgentRegistry:
         Returns:
             bool: True si el agente fue eliminado con éxito
         """
-        if agent_id in self._agents:
-            del self._agents[agent_id]
+        with self._lock:
+            self._idle.pop(agent_id, None)
+            if agent_id in self._agents:
+                del self._agents[agent_id]
+            elif agent_id in self._lazy:
+                del self._lazy[agent_id]
+            else:
+                return False
+            self._notify("remove", agent_id)
             return True
-        return False
+        
+    def stats(self) -> Dict[str, int]:
+        """
+        Tamaño del registro
+        
+        Returns:
+            dict: Agentes construidos, pendientes de carga, desechables y eliminados
+        """
+        with self._lock:
+            return {
+                "loaded": len(self._agents),
+                "lazy": len(self._lazy),
+                "evictable": len(self._idle),
+                "evicted": self.evicted,
+            }
         
     def filter_by_metadata(self, key: str, value: any) -> List[Agent]:
         """
@@ -78,6 +344,6 @@ class AgentRegistry:
             list: Lista de agentes que coinciden con el criterio
         """
         return [
-            agent for agent in self._agents.values()
+            agent for agent in self.list_agents().values()
             if key in agent.metadata and agent.metadata[key] == value
         ]
@@ -0,0 +1,67 @@
+"""
+Proxy para agentes alojados en otro nodo
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from agentforge_core.agent.base import Agent
+from agentforge_core.context import current_tenant, get_deadline, remaining_time
+from agentforge_core.transport.base import Transport, TransportError
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+class RemoteAgent(Agent):
+    """
+    Agente local que reenvía los mensajes a un agente de otro nodo
+
+    Attributes:
+        node_id (str): ID del nodo que aloja el agente
+        transport (Transport): Transporte hacia ese nodo
+    """
+
+    def __init__(self, id: str, node_id: str, transport: Transport,
+                 name: Optional[str] = None, role: Optional[str] = None):
+        super().__init__(id, name, role)
+        self.node_id = node_id
+        self.transport = transport
+        self.set_metadata("node", node_id)
+        self.set_metadata("remote", True)
+
+    async def process(self, message: Dict[str, Any], priority: Optional[int] = None,
+                      tenant: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Procesa un mensaje en el nodo remoto
+
+        El deadline, la prioridad y el tenant viajan con la petición para
+        que el nodo remoto aplique la misma planificación y las mismas cuotas.
+
+        Args:
+            message: Mensaje a procesar
+            priority: Prioridad de la petición
+            tenant: Tenant de la petición (por defecto el de la petición en curso)
+
+        Returns:
+            dict: Resultado del procesamiento remoto
+        """
+        if tenant is None:
+            tenant = getattr(current_tenant(), "name", None)
+        try:
+            return await self.transport.request({
+                "op": "process",
+                "agent_id": self.id,
+                "message": message,
+                "deadline": get_deadline(),
+                "priority": priority,
+                "tenant": tenant
+            }, timeout=remaining_time())
+        except TransportError as e:
+            logger.error(f"Error enviando mensaje al agente remoto {self.id} en {self.node_id}: {e}")
+            return {
+                "status": "error",
+                "agent": self.id,
+                "node": self.node_id,
+                "error": str(e),
+                "input": message
+            }
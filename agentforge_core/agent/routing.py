@@ -0,0 +1,197 @@
+"""
+Índice vectorial de roles para enrutar mensajes por similitud
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+def message_text(message: Any) -> str:
+    """
+    Extrae el texto de un mensaje para compararlo con los roles
+
+    Args:
+        message: Texto o mensaje en formato dict
+
+    Returns:
+        str: Campo "content" o, si no existe, la concatenación de los
+        campos de texto del mensaje
+    """
+    if isinstance(message, str):
+        return message
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    return " ".join(value for value in message.values() if isinstance(value, str))
+
+class RoleIndex:
+    """
+    Matriz de embeddings de los roles de los agentes
+
+    Las altas y bajas se encolan sin bloquear y se incorporan en la
+    siguiente búsqueda, calculando todos los roles pendientes en una sola
+    llamada a embed(). Cada fila está normalizada, por lo que la similitud
+    coseno con un mensaje es un único producto matriz-vector.
+
+    Attributes:
+        embedder (Provider): Proveedor con el que calcular los embeddings
+        store (VectorStore): Caché opcional de embeddings en disco
+    """
+
+    def __init__(self, embedder, role_of: Callable[[str], Optional[str]], store=None):
+        """
+        Args:
+            embedder: Proveedor que implementa embed()
+            role_of: Función que devuelve el rol de un agente (o None si no
+                debe enrutarse a él)
+            store: VectorStore opcional
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Módulo 'numpy' no encontrado. Instálalo con 'pip install numpy'")
+        self._np = np
+        self.embedder = embedder
+        self.store = store
+        self._role_of = role_of
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self._pending: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._rows
+
+    def _bump(self, agent_id: str) -> int:
+        version = self._versions.get(agent_id, 0) + 1
+        self._versions[agent_id] = version
+        return version
+
+    def add(self, agent_id: str) -> None:
+        """
+        Encola un agente para (re)calcular su vector en la próxima búsqueda
+
+        Args:
+            agent_id: ID del agente
+        """
+        self._pending[agent_id] = self._bump(agent_id)
+
+    def remove(self, agent_id: str) -> None:
+        """
+        Elimina un agente del índice
+
+        Args:
+            agent_id: ID del agente
+        """
+        self._bump(agent_id)
+        self._pending.pop(agent_id, None)
+        self._drop(agent_id)
+
+    def on_registry_event(self, event: str, agent_id: str, agent=None) -> None:
+        """
+        Listener para AgentRegistry.add_listener
+        """
+        if event == "remove":
+            self.remove(agent_id)
+        else:
+            self.add(agent_id)
+
+    def _drop(self, agent_id: str) -> None:
+        row = self._rows.pop(agent_id, None)
+        if row is None:
+            return
+        # Mover la última fila al hueco para mantener la matriz compacta
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+            self._matrix[row] = self._matrix[last]
+        self._ids.pop()
+
+    def _insert(self, agent_id: str, vector) -> None:
+        np = self._np
+        row = self._rows.get(agent_id)
+        if row is not None:
+            self._matrix[row] = vector
+            return
+        count = len(self._ids)
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            self._matrix = np.empty((max(16, count * 2), vector.shape[0]), dtype=np.float32)
+        elif count == self._matrix.shape[0]:
+            grown = np.empty((count * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:count] = self._matrix[:count]
+            self._matrix = grown
+        self._matrix[count] = vector
+        self._rows[agent_id] = count
+        self._ids.append(agent_id)
+
+    def _normalize(self, matrix):
+        norms = self._np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    async def refresh(self) -> None:
+        """
+        Calcula los vectores de los agentes pendientes
+        """
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            roles: Dict[str, str] = {}
+            for agent_id, version in pending.items():
+                try:
+                    role = self._role_of(agent_id)
+                except Exception as e:
+                    logger.warning(f"No se pudo obtener el rol del agente {agent_id}: {e}")
+                    role = None
+                if role:
+                    roles[agent_id] = role
+                else:
+                    self._drop(agent_id)
+            if not roles:
+                return
+            try:
+                vectors = self._normalize(await self.embedder.embed(list(roles.values()), store=self.store))
+            except BaseException:
+                for agent_id, version in pending.items():
+                    self._pending.setdefault(agent_id, version)
+                raise
+            for (agent_id, _), vector in zip(roles.items(), vectors):
+                # Descartar los agentes modificados mientras se calculaban
+                if self._versions.get(agent_id) == pending[agent_id]:
+                    self._insert(agent_id, vector)
+
+    async def search(self, text: str, top_k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Busca los agentes cuyo rol es más parecido a un texto
+
+        Args:
+            text: Texto del mensaje
+            top_k: Número máximo de agentes a devolver
+
+        Returns:
+            list: Pares (agent_id, similitud) ordenados de mayor a menor
+        """
+        np = self._np
+        await self.refresh()
+        count = len(self._ids)
+        if count == 0 or top_k <= 0:
+            return []
+        query = self._normalize(await self.embedder.embed([text]))[0]
+        scores = self._matrix[:count] @ query
+        if top_k < count:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(count)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in best]
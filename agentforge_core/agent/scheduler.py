@@ -0,0 +1,240 @@
+"""
+Planificador por prioridad de las peticiones a los agentes
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from agentforge_core.agent.tenancy import DEFAULT_TENANT, QuotaExceeded, Tenant
+from agentforge_core.context import DeadlineExceeded
+
+class Overloaded(Exception):
+    """
+    La cola de espera está llena y la petición se descarta
+    """
+
+class PriorityScheduler:
+    """
+    Limita la concurrencia y reparte los huecos libres por prioridad y tenant
+
+    Las peticiones con mayor prioridad pasan antes. A igual prioridad los
+    huecos se reparten entre tenants por cola justa ponderada (start-time
+    fair queuing): cada petición recibe una etiqueta virtual que avanza
+    1/weight por petición de su tenant, de modo que una ráfaga de un tenant
+    no retrasa a los demás más que una petición suya por turno. Dentro de un
+    tenant se respeta el orden de llegada. Una petición en cola cuyo
+    deadline pasa abandona la cola sin llegar a ocupar hueco. Si la cola
+    está llena las nuevas peticiones se rechazan con Overloaded en lugar de
+    esperar.
+
+    Attributes:
+        max_concurrency (int): Número máximo de peticiones simultáneas (None sin límite)
+        max_queue (int): Número máximo de peticiones en cola (None sin límite)
+        shed (int): Peticiones rechazadas por tener la cola llena
+        tenants (dict): Estado y cuotas de cada tenant {nombre: Tenant}
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.shed = 0
+        self.tenants: Dict[str, Tenant] = {}
+        self._active = 0
+        self._queued = 0
+        self._vtime = 0.0
+        self._backlogged: Set[Tenant] = set()
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """
+        Número de peticiones en ejecución
+        """
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """
+        Número de peticiones en cola
+        """
+        return self._queued
+
+    def tenant(self, name: Optional[str] = None) -> Tenant:
+        """
+        Obtiene el estado de un tenant, creándolo sin cuotas si no existe
+
+        Args:
+            name: Nombre del tenant (None para el tenant por defecto)
+
+        Returns:
+            Tenant: Estado del tenant
+        """
+        name = name or DEFAULT_TENANT
+        state = self.tenants.get(name)
+        if state is None:
+            state = self.tenants[name] = Tenant(name)
+        return state
+
+    def configure_tenant(self, name: str, weight: Optional[float] = None,
+                         max_concurrency: Optional[int] = None, token_quota: Optional[int] = None,
+                         quota_window: Optional[float] = None) -> Tenant:
+        """
+        Establece el peso y las cuotas de un tenant
+
+        Args:
+            name: Nombre del tenant
+            weight: Peso en el reparto de huecos
+            max_concurrency: Peticiones simultáneas del tenant
+            token_quota: Tokens por ventana
+            quota_window: Duración de la ventana de la cuota en segundos
+
+        Returns:
+            Tenant: Estado del tenant
+        """
+        state = self.tenant(name)
+        state.configure(weight, max_concurrency, token_quota, quota_window)
+        self._wake()
+        return state
+
+    def set_limit(self, max_concurrency: Optional[int]) -> None:
+        """
+        Cambia el límite de concurrencia y despierta a las peticiones que quepan
+
+        Args:
+            max_concurrency: Nuevo límite (None sin límite)
+        """
+        self.max_concurrency = max_concurrency
+        self._wake()
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrency is None or self._active < self.max_concurrency
+
+    def _grant(self, state: Tenant, start: float) -> None:
+        self._active += 1
+        state.active += 1
+        self._vtime = max(self._vtime, start)
+
+    async def acquire(self, priority: int = 0, deadline: Optional[float] = None,
+                      tenant: Optional[str] = None) -> None:
+        """
+        Espera un hueco libre
+
+        Args:
+            priority: Prioridad de la petición (mayor pasa antes)
+            deadline: Deadline absoluto (epoch en segundos) o None
+            tenant: Tenant de la petición (None para el tenant por defecto)
+
+        Raises:
+            DeadlineExceeded: Si el deadline pasa antes de obtener hueco
+            Overloaded: Si no hay hueco y la cola está llena
+            QuotaExceeded: Si el tenant ha agotado su cuota de tokens
+        """
+        if deadline is not None and deadline <= time.time():
+            raise DeadlineExceeded("Deadline superado antes de encolar la petición")
+
+        state = self.tenant(tenant)
+        state.check_quota()
+        if self._has_capacity() and state.has_capacity() and not self._queued:
+            start = max(self._vtime, state.finish_tag)
+            state.finish_tag = start + 1.0 / state.weight
+            self._grant(state, start)
+            return
+
+        if self.max_queue is not None and self._queued >= self.max_queue:
+            self.shed += 1
+            raise Overloaded(f"Cola de espera llena ({self._queued} peticiones)")
+
+        start = max(self._vtime, state.finish_tag)
+        state.finish_tag = start + 1.0 / state.weight
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(state.waiters, [-priority, start, next(self._seq), future])
+        self._backlogged.add(state)
+        self._queued += 1
+        state.queued += 1
+        future.add_done_callback(functools.partial(self._dequeued, state))
+        # Puede haber hueco si la cola solo contenía peticiones ya expiradas
+        self._wake()
+        timeout = None if deadline is None else deadline - time.time()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline superado esperando en la cola") from None
+        except asyncio.CancelledError:
+            # Si el hueco ya se había concedido hay que devolverlo
+            if future.done() and not future.cancelled():
+                self.release(tenant)
+            raise
+
+        if deadline is not None and deadline <= time.time():
+            self.release(tenant)
+            raise DeadlineExceeded("Deadline superado al obtener hueco")
+        try:
+            # La cuota puede haberse agotado mientras la petición esperaba
+            state.check_quota()
+        except QuotaExceeded:
+            self.release(tenant)
+            raise
+
+    def _dequeued(self, state: Tenant, future: asyncio.Future) -> None:
+        self._queued -= 1
+        state.queued -= 1
+
+    def release(self, tenant: Optional[str] = None) -> None:
+        """
+        Libera un hueco y se lo concede a la siguiente petición en cola
+
+        Args:
+            tenant: Tenant que ocupaba el hueco
+        """
+        self._active -= 1
+        self.tenant(tenant).active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._backlogged and self._has_capacity():
+            # Entre los tenants que pueden ejecutar, la petición con menor
+            # etiqueta (a igual prioridad) es la siguiente
+            best: Optional[Tenant] = None
+            for state in list(self._backlogged):
+                waiters = state.waiters
+                while waiters and waiters[0][-1].done():
+                    heapq.heappop(waiters)
+                if not waiters:
+                    self._backlogged.discard(state)
+                elif state.has_capacity() and (best is None or waiters[0] < best.waiters[0]):
+                    best = state
+            if best is None:
+                return
+            _, start, _, future = heapq.heappop(best.waiters)
+            self._grant(best, start)
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0, deadline: Optional[float] = None,
+                   tenant: Optional[str] = None) -> AsyncIterator[Tenant]:
+        """
+        Ocupa un hueco durante el bloque
+
+        Args:
+            priority: Prioridad de la petición
+            deadline: Deadline absoluto (epoch en segundos) o None
+            tenant: Tenant de la petición
+
+        Yields:
+            Tenant: Estado del tenant, para atribuirle el consumo del bloque
+        """
+        enqueued = time.monotonic()
+        await self.acquire(priority, deadline, tenant)
+        state = self.tenant(tenant)
+        started = time.monotonic()
+        try:
+            yield state
+        finally:
+            self.release(tenant)
+            now = time.monotonic()
+            state.observe(started - enqueued, now - enqueued)
@@ -0,0 +1,84 @@
+"""
+Esquemas de entrada y salida compilados y compartidos entre agentes
+
+Pydantic compila el validador de un modelo al crear la clase.
+compile_schema() resuelve el esquema (clase o referencia "modulo:nombre")
+una sola vez y devuelve la misma instancia a todos los agentes que lo usan,
+que validan directamente con ese validador.
+"""
+
+import threading
+from typing import Any, Dict, Type, Union
+
+from pydantic import BaseModel
+
+class CompiledSchema:
+    """
+    Esquema con su validador ya resuelto
+
+    Attributes:
+        model (type): Clase del esquema (modelo de pydantic)
+        reference (str): Referencia "modulo:nombre" de la clase
+        fields (frozenset): Nombres de los campos del esquema
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.reference = f"{model.__module__}:{model.__qualname__}"
+        self.fields = frozenset(model.model_fields)
+        self._validator = model.__pydantic_validator__
+
+    def validate(self, data: Any) -> BaseModel:
+        """
+        Valida datos y construye una instancia del esquema
+
+        Las instancias del esquema ya se validaron al crearlas (p. ej. la
+        salida de otro agente o un mensaje construido por el propio código)
+        y se devuelven sin volver a validarlas.
+
+        Args:
+            data: dict, instancia del esquema o texto JSON
+
+        Returns:
+            BaseModel: Instancia validada (la misma si ya lo era)
+
+        Raises:
+            pydantic.ValidationError: Si los datos no cumplen el esquema
+        """
+        if isinstance(data, self.model):
+            return data
+        if isinstance(data, (str, bytes)):
+            return self._validator.validate_json(data)
+        return self._validator.validate_python(data)
+
+_cache: Dict[type, CompiledSchema] = {}
+_lock = threading.Lock()
+
+def compile_schema(schema: Union[str, Type[BaseModel]]) -> CompiledSchema:
+    """
+    Obtiene el esquema compilado de una clase, compilándolo solo la primera vez
+
+    Args:
+        schema: Clase de pydantic o referencia "modulo:nombre"
+
+    Returns:
+        CompiledSchema: Instancia compartida por todos los que usan el esquema
+    """
+    if isinstance(schema, str):
+        from agentforge_core.config.loader import resolve_reference
+        schema = resolve_reference(schema, {})
+    compiled = _cache.get(schema)
+    if compiled is None:
+        if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+            raise TypeError(f"El esquema {schema!r} debe ser un modelo de pydantic")
+        with _lock:
+            compiled = _cache.get(schema)
+            if compiled is None:
+                compiled = _cache[schema] = CompiledSchema(schema)
+    return compiled
+
+def cached_schemas() -> int:
+    """
+    Número de esquemas compilados en caché
+    """
+    return len(_cache)
@@ -0,0 +1,222 @@
+"""
+Formato binario de snapshots del estado de un AgentSystem
+
+Estructura del fichero:
+    MAGIC | registro_1 | ... | registro_n | índice | trailer
+
+Cada registro es el JSON comprimido con zlib de un agente. El índice
+(también JSON comprimido) asocia cada agent_id con el desplazamiento y la
+longitud de su registro, y el trailer de tamaño fijo indica dónde está el
+índice. Al restaurar el fichero se proyecta en memoria con mmap y solo se
+decodifican los registros de los agentes que se usan.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from agentforge_core.agent.base import Agent
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AFSNAP01"
+_TRAILER = struct.Struct(">QQ8s")
+
+class SnapshotError(Exception):
+    """
+    Error leyendo o escribiendo un snapshot
+    """
+
+def _serializable(value: Any) -> bool:
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def agent_to_record(agent: Agent) -> Dict[str, Any]:
+    """
+    Convierte un agente en un registro serializable
+
+    Los metadatos que no se pueden serializar a JSON (referencias al
+    framework, al sistema, etc.) se omiten.
+
+    Args:
+        agent: Agente a convertir
+
+    Returns:
+        dict: Registro del agente
+
+    Raises:
+        SnapshotError: Si el agente no se podría reconstruir a partir del
+            registro (p. ej. su processor es una lambda)
+    """
+    framework = agent.get_metadata("framework")
+    try:
+        config = agent.get_config()
+    except ValueError as e:
+        raise SnapshotError(f"El agente {agent.id} no se puede guardar: {e}") from e
+    return {
+        "id": agent.id,
+        "name": agent.name,
+        "role": agent.role,
+        "framework": getattr(framework, "name", None),
+        "class": type(agent).__name__,
+        "config": config,
+        "state": agent.get_state(),
+        "metadata": {key: value for key, value in agent.metadata.items() if _serializable(value)},
+        "connections": [connected.id for connected in agent.connections],
+    }
+
+class SnapshotWriter:
+    """
+    Escribe un snapshot de forma atómica (fichero temporal + rename)
+    """
+
+    def __init__(self, path: str, node_id: Optional[str] = None):
+        self.path = path
+        self.node_id = node_id
+        self._tmp_path = f"{path}.tmp-{os.getpid()}"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC)
+        self._index: Dict[str, Tuple[int, int]] = {}
+
+    def add_record(self, agent_id: str, record: Dict[str, Any]) -> None:
+        """
+        Añade el registro de un agente
+
+        Args:
+            agent_id: ID del agente
+            record: Registro obtenido con agent_to_record
+        """
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        self.add_raw(agent_id, zlib.compress(data))
+
+    def add_raw(self, agent_id: str, data: bytes) -> None:
+        """
+        Añade un registro ya codificado (copiado de otro snapshot)
+
+        Args:
+            agent_id: ID del agente
+            data: Registro comprimido
+        """
+        self._index[agent_id] = (self._file.tell(), len(data))
+        self._file.write(data)
+
+    def close(self) -> int:
+        """
+        Escribe el índice y publica el snapshot
+
+        Returns:
+            int: Número de agentes guardados
+        """
+        index = zlib.compress(json.dumps({
+            "version": 1,
+            "node_id": self.node_id,
+            "created": time.time(),
+            "agents": self._index,
+        }, separators=(",", ":")).encode("utf-8"))
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_TRAILER.pack(offset, len(index), MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return len(self._index)
+
+    def abort(self) -> None:
+        """
+        Descarta el snapshot a medio escribir
+        """
+        self._file.close()
+        try:
+            os.unlink(self._tmp_path)
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class SnapshotReader:
+    """
+    Lector de snapshots proyectado en memoria
+
+    Attributes:
+        path (str): Ruta del snapshot
+        node_id (str): Nodo que generó el snapshot
+        created (float): Momento de creación (epoch en segundos)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < len(MAGIC) + _TRAILER.size or self._map[:len(MAGIC)] != MAGIC:
+                raise SnapshotError(f"{path} no es un snapshot válido")
+            offset, length, magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+            if magic != MAGIC:
+                raise SnapshotError(f"Snapshot {path} incompleto o corrupto")
+            header = json.loads(zlib.decompress(self._map[offset:offset + length]))
+        except (zlib.error, ValueError, struct.error) as e:
+            self._map.close()
+            raise SnapshotError(f"Snapshot {path} corrupto: {e}") from e
+        except SnapshotError:
+            self._map.close()
+            raise
+        self.node_id = header.get("node_id")
+        self.created = header.get("created")
+        self._index: Dict[str, List[int]] = header["agents"]
+
+    def ids(self) -> List[str]:
+        """
+        Lista los IDs de los agentes del snapshot
+        """
+        return list(self._index)
+
+    def raw(self, agent_id: str) -> bytes:
+        """
+        Obtiene el registro comprimido de un agente sin decodificarlo
+
+        Args:
+            agent_id: ID del agente
+
+        Returns:
+            bytes: Registro comprimido
+        """
+        offset, length = self._index[agent_id]
+        return self._map[offset:offset + length]
+
+    def read(self, agent_id: str) -> Dict[str, Any]:
+        """
+        Decodifica el registro de un agente
+
+        Args:
+            agent_id: ID del agente
+
+        Returns:
+            dict: Registro del agente
+        """
+        return json.loads(zlib.decompress(self.raw(agent_id)))
+
+    def close(self) -> None:
+        """
+        Libera la proyección en memoria
+        """
+        self._map.close()
@@ -2,13 +2,32 @@
 Sistema central de gestión de agentes
 """
 
-from typing import Any, Dict, List, Optional, Type, Union
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
 import asyncio
 import logging
+import time
 
+from agentforge_core.agent.admission import AdaptiveConcurrency
 from agentforge_core.agent.base import Agent
+from agentforge_core.agent.ensemble import run_ensemble
+from agentforge_core.agent.mapreduce import MapReduce, chunk_stream
 from agentforge_core.agent.registry import AgentRegistry
+from agentforge_core.agent.remote import RemoteAgent
+from agentforge_core.agent.routing import RoleIndex, message_text
+from agentforge_core.agent.scheduler import Overloaded, PriorityScheduler
+from agentforge_core.agent.snapshot import SnapshotError, SnapshotReader, SnapshotWriter, agent_to_record
+from agentforge_core.agent.tenancy import QuotaExceeded, Tenant, tenant_of
+from agentforge_core.agent.tools import ToolRegistry
+from agentforge_core.context import DeadlineExceeded, deadline_scope, remaining_time, tenant_scope
+from agentforge_core.diagnostics import LoopMonitor
+from agentforge_core.lifecycle import start_all, stop_all
+from agentforge_core.llm.batch import BatchJob
 from agentforge_core.llm.provider import Provider
+from agentforge_core.transport.base import Transport
+from agentforge_core.transport.hashring import HashRing
+from agentforge_core.transport.sockets import SocketServer
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -16,14 +35,49 @@ logger = logging.getLogger(__name__)
 class AgentSystem:
     """
     Sistema central para la gestión de agentes, proveedores y frameworks
+    
+    Attributes:
+        tools (ToolRegistry): Herramientas compartidas por todos los agentes
+        scheduler (PriorityScheduler): Control de concurrencia y cola de espera
+        admission (AdaptiveConcurrency): Ajuste automático del límite de
+            concurrencia (None si el límite es fijo)
+        loop_monitor (LoopMonitor): Detector de bloqueos del bucle de eventos
+            (None si está desactivado)
+        templates (dict): Agentes plantilla para clone_agent {id: agente}
+        readiness (dict): Informe de disponibilidad del último start()
     """
     
-    def __init__(self):
-        self.registry = AgentRegistry()
+    def __init__(self, node_id: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 default_timeout: Optional[float] = None, max_queue: Optional[int] = None,
+                 adaptive_concurrency: bool = False, loop_monitor_threshold: Optional[float] = None,
+                 agent_ttl: Optional[float] = None, max_session_agents: Optional[int] = None):
+        self.registry = AgentRegistry(agent_ttl, max_session_agents)
+        self.templates: Dict[str, Agent] = {}
         self.providers: Dict[str, Provider] = {}
         self.framework = None
+        self.node_id = node_id or "local"
+        self.ring = HashRing()
+        self._transports: Dict[str, Transport] = {}
+        self.scheduler = PriorityScheduler(max_concurrency, max_queue)
+        self.admission: Optional[AdaptiveConcurrency] = None
+        if adaptive_concurrency:
+            self.set_concurrency(max_concurrency, adaptive=True)
+        self.default_timeout = default_timeout
+        self._snapshots: Dict[str, SnapshotReader] = {}
+        self._generation = 0
+        self._inflight: Dict[int, int] = {}
+        self._drain_waiters: List[Tuple[int, asyncio.Future]] = []
         self._running = False
+        self._stopping = False
+        self._sweeper: Optional[asyncio.Task] = None
         self._default_provider = None
+        self._embedder: Optional[Provider] = None
+        self._embedding_store = None
+        self._role_index: Optional[RoleIndex] = None
+        self.tools = ToolRegistry()
+        self.loop_monitor_threshold = loop_monitor_threshold
+        self.loop_monitor: Optional[LoopMonitor] = None
+        self.readiness: Dict[str, Any] = {"ready": False, "node_id": self.node_id, "components": {}}
         
     def add_provider(self, provider: Provider) -> bool:
         """
@@ -36,6 +90,9 @@ class AgentSystem:
             bool: True si se añadió correctamente
         """
         self.providers[provider.name] = provider
+        # Proveedores compuestos (cascadas) que resuelven otros proveedores del sistema
+        if hasattr(provider, "bind"):
+            provider.bind(self)
         
         # Establecer como proveedor por defecto si es el primero
         if len(self.providers) == 1:
@@ -97,86 +154,810 @@ class AgentSystem:
         if not self.framework:
             raise ValueError("No se ha establecido un framework de agentes")
             
+        if len(self.ring) and not self.owns(agent_id):
+            logger.warning(f"Agente {agent_id} creado en {self.node_id} pero el anillo lo ubica en {self.locate(agent_id)}")
+            
         agent = self.framework.create_agent(agent_id, **kwargs)
+        agent.metadata.setdefault("system", self)
         self.registry.register(agent_id, agent)
         return agent
         
-    def start(self) -> bool:
+    def create_template(self, template_id: str, **kwargs) -> Agent:
         """
-        Inicia el sistema de agentes
+        Crea un agente plantilla, que no se registra ni recibe mensajes
         
+        Args:
+            template_id: ID de la plantilla
+            **kwargs: Parámetros para el framework, como en create_agent
+            
         Returns:
-            bool: True si el sistema se inició correctamente
+            Agent: Agente plantilla
         """
-        if self._running:
+        if not self.framework:
+            raise ValueError("No se ha establecido un framework de agentes")
+            
+        template = self.framework.create_agent(template_id, **kwargs)
+        template.metadata.setdefault("system", self)
+        self.templates[template_id] = template
+        return template
+        
+    def clone_agent(self, template_id: str, agent_id: str, name: Optional[str] = None,
+                    metadata: Optional[Dict[str, Any]] = None, evictable: bool = True) -> Agent:
+        """
+        Registra un agente nuevo clonando una plantilla
+        
+        No pasa por el framework: el clon comparte la configuración de la
+        plantilla y copia sus metadatos al escribir (ver Agent.clone). Por
+        defecto el agente es desechable y el registro lo elimina cuando
+        queda inactivo (agent_ttl, max_session_agents).
+        
+        Args:
+            template_id: ID de la plantilla
+            agent_id: ID único del nuevo agente
+            name: Nombre del nuevo agente
+            metadata: Metadatos propios del nuevo agente
+            evictable: Si es False el agente se mantiene hasta eliminarlo
+            
+        Returns:
+            Agent: Agente registrado
+        """
+        template = self.templates.get(template_id)
+        if template is None:
+            raise ValueError(f"Plantilla {template_id} no encontrada")
+            
+        agent = template.clone(agent_id, name)
+        if metadata:
+            agent.metadata.update(metadata)
+        if not self.registry.register(agent_id, agent, evictable=evictable):
+            raise ValueError(f"Ya existe un agente con ID {agent_id}")
+        return agent
+        
+    def register_tool(self, func=None, **kwargs) -> Any:
+        """
+        Registra una herramienta disponible para todos los agentes (también
+        como decorador)
+        
+        Args:
+            func: Función síncrona o asíncrona
+            **kwargs: name, description, parameters, timeout, max_result_size
+            
+        Returns:
+            La función registrada
+        """
+        return self.tools.register(func, **kwargs)
+        
+    def set_embedder(self, embedder: Provider, store=None) -> None:
+        """
+        Establece el proveedor de embeddings usado por route()
+        
+        El índice de roles se reconstruye con el nuevo proveedor en la
+        siguiente llamada a route().
+        
+        Args:
+            embedder: Proveedor que implementa embed()
+            store: VectorStore opcional para reutilizar los vectores de los roles
+        """
+        self._embedder = embedder
+        self._embedding_store = store
+        if self._role_index is not None:
+            self.registry.remove_listener(self._role_index.on_registry_event)
+            self._role_index = None
+            
+    def _role_of(self, agent_id: str) -> Optional[str]:
+        """
+        Obtiene el rol de un agente local sin construirlo si está pendiente de carga
+        """
+        source = self._snapshots.get(agent_id)
+        if source is not None and not self.registry.is_loaded(agent_id):
+            return source.read(agent_id).get("role")
+        agent = self.registry.get(agent_id)
+        if agent is None or isinstance(agent, RemoteAgent):
+            return None
+        return agent.role
+        
+    def _get_role_index(self) -> RoleIndex:
+        if self._role_index is None:
+            if self._embedder is None:
+                from agentforge_core.llm.local import HashingEmbedder
+                self._embedder = HashingEmbedder()
+            self._embedder.start()
+            index = RoleIndex(self._embedder, self._role_of, self._embedding_store)
+            for agent_id in self.registry.ids():
+                index.add(agent_id)
+            self.registry.add_listener(index.on_registry_event)
+            self._role_index = index
+        return self._role_index
+        
+    async def route(self, message: Union[str, Dict[str, Any]], top_k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Selecciona los agentes cuyo rol es más parecido al mensaje
+        
+        Los roles se convierten en vectores una sola vez y se mantienen en
+        una matriz que se actualiza al crear o eliminar agentes, así que cada
+        llamada solo calcula el embedding del mensaje y un producto matricial.
+        
+        Args:
+            message: Mensaje (se usa su campo "content") o texto
+            top_k: Número máximo de agentes a devolver
+            
+        Returns:
+            list: Pares (agent_id, similitud) ordenados de mayor a menor
+        """
+        return await self._get_role_index().search(message_text(message), top_k)
+        
+    def add_node(self, node_id: str, transport: Optional[Transport] = None, weight: int = 1) -> bool:
+        """
+        Añade un nodo al anillo de hash consistente que reparte los agentes
+        
+        El nodo local también debe añadirse (sin transporte) para que reciba
+        su parte de los agentes.
+        
+        Args:
+            node_id: ID del nodo
+            transport: Transporte hacia el nodo (None para el nodo local)
+            weight: Peso relativo del nodo en el reparto
+            
+        Returns:
+            bool: True si el nodo se añadió correctamente
+        """
+        if node_id != self.node_id and transport is None:
+            raise ValueError(f"El nodo remoto {node_id} necesita un transporte")
+        if not self.ring.add_node(node_id, weight):
             return False
+        if transport is not None:
+            self._transports[node_id] = transport
+        self._drop_stale_proxies()
+        return True
+        
+    def remove_node(self, node_id: str) -> Optional[Transport]:
+        """
+        Elimina un nodo del anillo
+        
+        Args:
+            node_id: ID del nodo
+            
+        Returns:
+            Transport: Transporte del nodo eliminado (para cerrarlo) o None
+        """
+        self.ring.remove_node(node_id)
+        transport = self._transports.pop(node_id, None)
+        self._drop_stale_proxies()
+        return transport
+        
+    def locate(self, agent_id: str) -> str:
+        """
+        Obtiene el nodo responsable de un agente
+        
+        Args:
+            agent_id: ID del agente
             
-        # Iniciar todos los proveedores
-        for provider_name, provider in self.providers.items():
+        Returns:
+            str: ID del nodo (el local si no hay anillo configurado)
+        """
+        return self.ring.get_node(agent_id) or self.node_id
+        
+    def owns(self, agent_id: str) -> bool:
+        """
+        Indica si el agente corresponde a este nodo según el anillo
+        
+        Args:
+            agent_id: ID del agente
+            
+        Returns:
+            bool: True si el agente debe crearse en este nodo
+        """
+        return self.locate(agent_id) == self.node_id
+        
+    def is_local(self, agent_id: str) -> bool:
+        """
+        Indica si el agente está registrado y se ejecuta en este nodo
+        
+        Args:
+            agent_id: ID del agente
+            
+        Returns:
+            bool: True si el agente es local
+        """
+        agent = self.registry.get(agent_id)
+        return agent is not None and not isinstance(agent, RemoteAgent)
+        
+    def resolve_agent(self, agent_id: str) -> Optional[Agent]:
+        """
+        Obtiene un agente local o un proxy hacia el nodo que lo aloja
+        
+        Args:
+            agent_id: ID del agente
+            
+        Returns:
+            Agent: Agente local, RemoteAgent o None si no existe
+        """
+        agent = self.registry.get(agent_id)
+        if agent is not None:
+            return agent
+            
+        node_id = self.locate(agent_id)
+        transport = self._transports.get(node_id)
+        if node_id == self.node_id or transport is None:
+            return None
+            
+        proxy = RemoteAgent(agent_id, node_id, transport)
+        # Los proxies se vuelven a crear al usarlos: pueden eliminarse si quedan inactivos
+        self.registry.register(agent_id, proxy, evictable=True)
+        return proxy
+        
+    def _drop_stale_proxies(self) -> None:
+        """
+        Elimina los proxies cuyo agente ha cambiado de nodo
+        """
+        for agent_id, agent in self.registry.list_agents(materialize=False).items():
+            if isinstance(agent, RemoteAgent) and self.locate(agent_id) != agent.node_id:
+                self.registry.remove(agent_id)
+                
+    async def serve(self, host: Optional[str] = None, port: Optional[int] = None,
+                    path: Optional[str] = None) -> SocketServer:
+        """
+        Expone los agentes locales a otros nodos por TCP o socket Unix
+        
+        Args:
+            host: Host en el que escuchar
+            port: Puerto TCP (0 para uno libre)
+            path: Ruta del socket Unix (alternativa a host/port)
+            
+        Returns:
+            SocketServer: Servidor iniciado
+        """
+        server = SocketServer(self, host=host, port=port, path=path)
+        await server.start()
+        return server
+        
+    async def disconnect_nodes(self) -> None:
+        """
+        Cierra las conexiones con todos los nodos remotos
+        """
+        for node_id, transport in self._transports.items():
             try:
-                provider.start()
-                logger.info(f"Proveedor {provider_name} iniciado correctamente")
+                await transport.close()
             except Exception as e:
-                logger.error(f"Error iniciando proveedor {provider_name}: {e}")
+                logger.error(f"Error cerrando conexión con el nodo {node_id}: {e}")
                 
-        # Iniciar framework
+    def snapshot(self, path: str) -> int:
+        """
+        Guarda el registro, los metadatos, las conexiones y el estado de
+        conversación de los agentes locales en un fichero binario
+        
+        Los agentes restaurados que aún no se han usado se copian tal cual
+        desde su snapshot de origen, sin decodificarlos.
+        
+        Args:
+            path: Ruta del fichero de snapshot
+            
+        Returns:
+            int: Número de agentes guardados
+            
+        Raises:
+            SnapshotError: Si algún agente no se podría restaurar (p. ej. su
+                processor es una lambda); el snapshot anterior se conserva
+        """
+        with SnapshotWriter(path, self.node_id) as writer:
+            for agent_id in self.registry.ids():
+                source = self._snapshots.get(agent_id)
+                if source is not None and not self.registry.is_loaded(agent_id):
+                    writer.add_raw(agent_id, source.raw(agent_id))
+                    continue
+                agent = self.registry.get(agent_id)
+                if agent is None or isinstance(agent, RemoteAgent):
+                    continue
+                writer.add_record(agent_id, agent_to_record(agent))
+        count = len(writer)
+        logger.info(f"Snapshot de {count} agentes guardado en {path}")
+        return count
+        
+    def restore(self, path: str, frameworks: Optional[List[Any]] = None) -> int:
+        """
+        Restaura los agentes de un snapshot de forma incremental
+        
+        El fichero se proyecta en memoria y cada agente se reconstruye la
+        primera vez que se usa. Los agentes ya registrados no se sustituyen.
+        
+        Args:
+            path: Ruta del fichero de snapshot
+            frameworks: Frameworks adicionales al del sistema, para agentes
+                creados con otros frameworks
+                
+        Returns:
+            int: Número de agentes registrados para carga diferida
+        """
+        reader = SnapshotReader(path)
+        available = {framework.name: framework for framework in frameworks or []}
         if self.framework:
-            try:
-                self.framework.start()
-                logger.info(f"Framework {self.framework.name} iniciado correctamente")
-            except Exception as e:
-                logger.error(f"Error iniciando framework {self.framework.name}: {e}")
+            available.setdefault(self.framework.name, self.framework)
             
-        self._running = True
-        return True
+        count = 0
+        for agent_id in reader.ids():
+            loader = lambda agent_id, reader=reader: self._materialize(reader, agent_id, available)
+            if self.registry.register_lazy(agent_id, loader):
+                self._snapshots[agent_id] = reader
+                count += 1
+        logger.info(f"Restaurados {count} agentes desde {path}")
+        return count
         
-    def stop(self) -> bool:
+    def _materialize(self, reader: SnapshotReader, agent_id: str, frameworks: Dict[str, Any]) -> Agent:
         """
-        Detiene el sistema de agentes
+        Reconstruye un agente a partir de su registro en un snapshot
+        """
+        record = reader.read(agent_id)
+        framework = frameworks.get(record.get("framework")) if record.get("framework") else self.framework
+        if framework is None:
+            raise SnapshotError(f"Framework {record.get('framework')} no disponible para el agente {agent_id}")
+            
+        agent = framework.create_agent(agent_id, name=record["name"], role=record["role"], **record["config"])
+        agent.metadata.update(record["metadata"])
+        agent.metadata.setdefault("system", self)
+        agent.set_state(record["state"])
+        
+        # Registrar antes de resolver las conexiones para cortar los ciclos
+        self.registry.register(agent_id, agent)
+        self._snapshots.pop(agent_id, None)
+        for connected_id in record["connections"]:
+            connected = self.resolve_agent(connected_id)
+            if connected is not None:
+                agent.connect_to(connected)
+        return agent
+        
+    @property
+    def running(self) -> bool:
+        """
+        Indica si el sistema está iniciado
+        """
+        return self._running
+        
+    @property
+    def inflight(self) -> int:
+        """
+        Número de peticiones en curso en el sistema
+        """
+        return sum(self._inflight.values())
+        
+    def advance_generation(self) -> int:
+        """
+        Inicia una nueva generación de peticiones (p. ej. tras recargar la configuración)
         
         Returns:
-            bool: True si el sistema se detuvo correctamente
+            int: Generación anterior, para esperar a que se vacíe con wait_drained
         """
-        if not self._running:
+        self._generation += 1
+        return self._generation - 1
+        
+    async def wait_drained(self, generation: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que terminen las peticiones iniciadas hasta una generación
+        
+        Args:
+            generation: Última generación a esperar (por defecto la actual)
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            bool: True si se vaciaron, False si se agotó el timeout
+        """
+        if generation is None:
+            generation = self._generation
+        if not self._pending_until(generation):
+            return True
+            
+        future = asyncio.get_running_loop().create_future()
+        waiter = (generation, future)
+        self._drain_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
             return False
+        finally:
+            self._drain_waiters.remove(waiter)
+            
+    def set_concurrency(self, max_concurrency: Optional[int], adaptive: bool = False) -> None:
+        """
+        Cambia el límite de concurrencia y activa o desactiva su ajuste automático
+        
+        Args:
+            max_concurrency: Límite fijo o, con adaptive, techo del límite
+                adaptativo (None sin límite)
+            adaptive: Ajustar el límite según la latencia observada
+        """
+        if not adaptive:
+            self.admission = None
+            self.scheduler.set_limit(max_concurrency)
+            return
+        # max_concurrency pasa a ser el techo del límite adaptativo
+        max_limit = max_concurrency or 1000
+        if self.admission is None:
+            self.admission = AdaptiveConcurrency(self.scheduler, initial_limit=min(16, max_limit),
+                                                 max_limit=max_limit)
+        else:
+            self.admission.max_limit = max_limit
+            
+    def configure_tenant(self, name: str, weight: Optional[float] = None,
+                         max_concurrency: Optional[int] = None, token_quota: Optional[int] = None,
+                         quota_window: Optional[float] = None) -> Tenant:
+        """
+        Establece el peso y las cuotas de un tenant
+        
+        El tenant de cada petición se toma del campo "tenant" del mensaje o
+        del metadato "tenant" del agente destinatario.
+        
+        Args:
+            name: Nombre del tenant
+            weight: Peso en el reparto de huecos del planificador
+            max_concurrency: Peticiones simultáneas del tenant
+            token_quota: Tokens por ventana; agotada, sus peticiones se
+                rechazan con el estado "quota_exceeded"
+            quota_window: Duración de la ventana de la cuota en segundos
+            
+        Returns:
+            Tenant: Estado del tenant
+        """
+        return self.scheduler.configure_tenant(name, weight, max_concurrency, token_quota, quota_window)
+        
+    def _observe_latency(self, started: float, dropped: bool = False) -> None:
+        if self.admission is not None:
+            self.admission.on_sample(time.monotonic() - started, dropped)
+            
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de carga del sistema
+        
+        Returns:
+            dict: Peticiones en curso, tamaño del registro, estado del
+            planificador y del control de admisión adaptativo, estadísticas
+            de los proveedores que las ofrecen (p. ej. cascadas) y métricas
+            por tenant
+        """
+        return {
+            "node_id": self.node_id,
+            "inflight": self.inflight,
+            "agents": self.registry.stats(),
+            "scheduler": {
+                "active": self.scheduler.active,
+                "waiting": self.scheduler.waiting,
+                "limit": self.scheduler.max_concurrency,
+                "max_queue": self.scheduler.max_queue,
+                "shed": self.scheduler.shed,
+            },
+            "admission": self.admission.stats() if self.admission is not None else None,
+            "loop": self.loop_monitor.stats() if self.loop_monitor is not None else None,
+            "providers": {name: provider.stats() for name, provider in self.providers.items()
+                          if hasattr(provider, "stats")},
+            "tenants": {name: tenant.stats() for name, tenant in self.scheduler.tenants.items()},
+        }
+        
+    def enable_loop_monitor(self, threshold: Optional[float] = None) -> LoopMonitor:
+        """
+        Activa la medición del retardo del bucle de eventos y la detección
+        de llamadas bloqueantes
+        
+        Debe llamarse desde el bucle de eventos que se quiere vigilar. Los
+        resultados se publican en get_metrics()["loop"].
+        
+        Args:
+            threshold: Segundos de bloqueo a partir de los que se captura la
+                pila (por defecto loop_monitor_threshold o 0.1)
+                
+        Returns:
+            LoopMonitor: Monitor activo
+        """
+        self.disable_loop_monitor()
+        self.loop_monitor = LoopMonitor(threshold or self.loop_monitor_threshold or 0.1)
+        self.loop_monitor.start()
+        return self.loop_monitor
+        
+    def disable_loop_monitor(self) -> None:
+        """
+        Desactiva el monitor del bucle de eventos (se conservan sus métricas)
+        """
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+            
+    def _pending_until(self, generation: int) -> bool:
+        return any(g <= generation for g in self._inflight)
+        
+    @contextmanager
+    def _track_request(self) -> Iterator[None]:
+        """
+        Contabiliza una petición en curso en la generación actual
+        """
+        generation = self._generation
+        self._inflight[generation] = self._inflight.get(generation, 0) + 1
+        try:
+            yield
+        finally:
+            remaining = self._inflight[generation] - 1
+            if remaining:
+                self._inflight[generation] = remaining
+            else:
+                del self._inflight[generation]
+                for waiting_generation, future in self._drain_waiters:
+                    if not future.done() and not self._pending_until(waiting_generation):
+                        future.set_result(None)
+                        
+    async def start(self, probe: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Inicia el sistema de agentes
+        
+        Los proveedores y el framework se inician a la vez. Con probe cada
+        proveedor hace además una petición barata (health_check) que valida
+        la clave y deja abiertas las conexiones antes de recibir tráfico.
+        
+        Args:
+            probe: Si es True se comprueba que cada proveedor responde
+            timeout: Tiempo máximo para iniciar y comprobar cada componente
+            
+        Returns:
+            dict: Informe de disponibilidad: "ready" (True si todos los
+            componentes están listos), duración y estado de cada componente
+            ("provider:<nombre>", "framework:<nombre>")
+        """
+        if self._running:
+            return self.readiness
             
-        # Detener framework
+        started = time.monotonic()
+        components = {f"provider:{name}": provider for name, provider in self.providers.items()}
         if self.framework:
-            try:
-                self.framework.stop()
-                logger.info(f"Framework {self.framework.name} detenido correctamente")
-            except Exception as e:
-                logger.error(f"Error deteniendo framework {self.framework.name}: {e}")
+            components[f"framework:{self.framework.name}"] = self.framework
+        reports = await start_all(components, probe, timeout)
+                
+        if self.loop_monitor_threshold is not None:
+            self.enable_loop_monitor()
+        self._sweeper = asyncio.create_task(self._sweep_agents())
             
-        # Detener todos los proveedores
-        for provider_name, provider in self.providers.items():
-            try:
-                provider.stop()
-                logger.info(f"Proveedor {provider_name} detenido correctamente")
-            except Exception as e:
-                logger.error(f"Error deteniendo proveedor {provider_name}: {e}")
+        self._running = True
+        self._stopping = False
+        self.readiness = {
+            "ready": all(report["status"] == "ready" for report in reports.values()),
+            "node_id": self.node_id,
+            "duration": time.monotonic() - started,
+            "components": reports,
+        }
+        if self.readiness["ready"]:
+            logger.info(f"Sistema {self.node_id} iniciado en {self.readiness['duration']:.2f}s")
+        else:
+            failed = [name for name, report in reports.items() if report["status"] != "ready"]
+            logger.warning(f"Sistema {self.node_id} iniciado sin {', '.join(failed)}")
+        return self.readiness
+        
+    async def stop(self, drain_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Detiene el sistema de agentes
+        
+        Desde ese momento se rechazan las peticiones nuevas con el estado
+        "overloaded". Espera como mucho drain_timeout segundos a que terminen
+        las peticiones en curso y después detiene a la vez el framework y los
+        proveedores, cerrando sus conexiones.
+        
+        Args:
+            drain_timeout: Tiempo máximo de espera de las peticiones en curso
+                (None espera sin límite, 0 no espera)
+            
+        Returns:
+            dict: "drained" (False si quedaron peticiones en curso), las
+            peticiones abandonadas y el estado de cada componente
+        """
+        if not self._running:
+            return {"drained": True, "inflight": 0, "components": {}}
             
         self._running = False
-        return True
+        self._stopping = True
+        self.readiness = {"ready": False, "node_id": self.node_id, "components": {}}
+        # Solo se esperan las peticiones aceptadas antes de empezar a detener
+        generation = self.advance_generation()
+        drained = self.inflight == 0 or (drain_timeout != 0 and await self.wait_drained(generation, drain_timeout))
+        inflight = self.inflight
+        if not drained:
+            logger.warning(f"Deteniendo el sistema con {inflight} peticiones aún en curso")
+            
+        self.disable_loop_monitor()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
         
-    async def process_message(self, agent_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        components = {f"provider:{name}": provider for name, provider in self.providers.items()}
+        if self.framework:
+            components[f"framework:{self.framework.name}"] = self.framework
+        reports = await stop_all(components)
+        return {"drained": drained, "inflight": inflight, "components": reports}
+        
+    async def _sweep_agents(self) -> None:
+        """
+        Elimina periódicamente los agentes desechables inactivos, aunque no
+        llegue tráfico nuevo que lo haga al registrar u obtener agentes
+        """
+        while True:
+            ttl = self.registry.ttl
+            await asyncio.sleep(min(ttl / 2, 60.0) if ttl else 60.0)
+            try:
+                self.registry.evict_idle()
+            except Exception as e:
+                logger.error(f"Error eliminando agentes inactivos: {e}")
+                
+    async def process_message(self, agent_id: str, message: Dict[str, Any],
+                              priority: Optional[int] = None,
+                              deadline: Optional[float] = None,
+                              timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Procesa un mensaje enviándolo a un agente específico
         
+        La prioridad y el deadline se toman de los argumentos o, si no se
+        indican, de los campos "priority" y "deadline" del mensaje. Si se
+        supera el timeout se cancela la petición en curso y se devuelve
+        el estado "timeout".
+        
         Args:
             agent_id: ID del agente destinatario
             message: Mensaje a procesar
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos (por defecto default_timeout)
             
         Returns:
             dict: Respuesta del agente
         """
-        agent = self.registry.get(agent_id)
+        agent = self.resolve_agent(agent_id)
         if not agent:
             raise ValueError(f"Agente {agent_id} no encontrado")
             
+        return await self._dispatch(agent_id, agent, message, priority, deadline, timeout)
+        
+    async def stream_message(self, agent_id: str, message: Dict[str, Any],
+                             priority: Optional[int] = None,
+                             deadline: Optional[float] = None,
+                             timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa un mensaje devolviendo la respuesta del agente por partes
+        
+        El hueco del planificador se mantiene hasta que termina el stream; el
+        deadline y el timeout se aplican a la respuesta completa. Los errores
+        se devuelven como una última parte con el estado correspondiente.
+        
+        Args:
+            agent_id: ID del agente destinatario
+            message: Mensaje a procesar
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos (por defecto default_timeout)
+            
+        Yields:
+            dict: Partes de la respuesta del agente
+        """
+        agent = self.resolve_agent(agent_id)
+        if not agent:
+            raise ValueError(f"Agente {agent_id} no encontrado")
+        if isinstance(agent, RemoteAgent):
+            yield await self._dispatch(agent_id, agent, message, priority, deadline, timeout)
+            return
+            
+        priority, deadline = self._request_limits(message, priority, deadline, timeout)
+        try:
+            self._check_accepting()
+            with self._track_request(), self.registry.in_use(agent_id):
+                async with self.scheduler.slot(priority, deadline, tenant_of(message, agent)) as tenant:
+                    chunks = agent.stream(message)
+                    try:
+                        while True:
+                            # El deadline y el tenant solo se fijan mientras se genera cada parte
+                            with deadline_scope(deadline), tenant_scope(tenant):
+                                async with asyncio.timeout(remaining_time()):
+                                    try:
+                                        chunk = await chunks.__anext__()
+                                    except StopAsyncIteration:
+                                        break
+                            yield chunk
+                    finally:
+                        await chunks.aclose()
+        except Overloaded as e:
+            yield {"status": "overloaded", "agent": agent_id, "error": str(e)}
+        except QuotaExceeded as e:
+            yield {"status": "quota_exceeded", "agent": agent_id, "error": str(e)}
+        except DeadlineExceeded as e:
+            logger.warning(f"Stream para el agente {agent_id} descartado: {e}")
+            yield {"status": "expired", "agent": agent_id, "error": str(e)}
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout en el stream del agente {agent_id}")
+            yield {"status": "timeout", "agent": agent_id, "error": "Timeout procesando el mensaje"}
+        except Exception as e:
+            logger.error(f"Error en el stream del agente {agent_id}: {e}")
+            yield {"status": "error", "agent": agent_id, "error": str(e)}
+            
+    def _check_accepting(self) -> None:
+        """
+        Rechaza las peticiones nuevas mientras el sistema se detiene
+        
+        Raises:
+            Overloaded: Si se ha llamado a stop y no se ha vuelto a iniciar
+        """
+        if self._stopping:
+            raise Overloaded(f"El sistema {self.node_id} se está deteniendo")
+            
+    def _request_limits(self, message: Dict[str, Any], priority: Optional[int],
+                        deadline: Optional[float], timeout: Optional[float]) -> Tuple[int, Optional[float]]:
+        """
+        Calcula la prioridad y el deadline efectivos de una petición
+        """
+        if priority is None:
+            priority = message.get("priority", 0)
+        if deadline is None:
+            deadline = message.get("deadline")
+        if timeout is None:
+            timeout = self.default_timeout
+        if timeout is not None:
+            timeout_deadline = time.time() + timeout
+            deadline = timeout_deadline if deadline is None else min(deadline, timeout_deadline)
+        return priority, deadline
+        
+    async def _dispatch(self, agent_id: str, agent: Agent, message: Dict[str, Any],
+                        priority: Optional[int] = None,
+                        deadline: Optional[float] = None,
+                        timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ejecuta un mensaje en un agente respetando prioridad, deadline y timeout
+        """
+        priority, deadline = self._request_limits(message, priority, deadline, timeout)
         try:
-            result = await agent.process(message)
-            return result
+            self._check_accepting()
+            with self._track_request(), self.registry.in_use(agent_id), deadline_scope(deadline):
+                # El nodo remoto aplica su propia planificación
+                if isinstance(agent, RemoteAgent):
+                    tenant = message.get("tenant") or agent.get_metadata("tenant")
+                    return await asyncio.wait_for(agent.process(message, priority, tenant), remaining_time())
+                async with self.scheduler.slot(priority, deadline, tenant_of(message, agent)) as tenant:
+                    started = time.monotonic()
+                    try:
+                        with tenant_scope(tenant):
+                            result = await asyncio.wait_for(agent.process(message), remaining_time())
+                    except asyncio.TimeoutError:
+                        self._observe_latency(started, dropped=True)
+                        raise
+                    self._observe_latency(started, dropped=isinstance(result, Mapping)
+                                          and result.get("status") in ("timeout", "expired"))
+                    return result
+        except Overloaded as e:
+            # En sobrecarga no se registra cada rechazo: se cuentan en get_metrics
+            logger.debug(f"Mensaje para el agente {agent_id} descartado por sobrecarga: {e}")
+            return {
+                "status": "overloaded",
+                "agent": agent_id,
+                "error": str(e)
+            }
+        except QuotaExceeded as e:
+            logger.debug(f"Mensaje para el agente {agent_id} descartado: {e}")
+            return {
+                "status": "quota_exceeded",
+                "agent": agent_id,
+                "error": str(e)
+            }
+        except DeadlineExceeded as e:
+            logger.warning(f"Mensaje para el agente {agent_id} descartado: {e}")
+            return {
+                "status": "expired",
+                "agent": agent_id,
+                "error": str(e)
+            }
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout procesando mensaje en agente {agent_id}")
+            return {
+                "status": "timeout",
+                "agent": agent_id,
+                "error": "Timeout procesando el mensaje"
+            }
+        except asyncio.CancelledError:
+            # Si quien espera ha sido cancelado se propaga; si se canceló el
+            # trabajo interno se informa como estado propio
+            if _cancelling():
+                raise
+            return {
+                "status": "cancelled",
+                "agent": agent_id,
+                "error": "Procesamiento cancelado"
+            }
         except Exception as e:
             logger.error(f"Error procesando mensaje en agente {agent_id}: {e}")
             return {
@@ -185,13 +966,22 @@ class AgentSystem:
                 "error": str(e)
             }
             
-    async def broadcast_message(self, message: Dict[str, Any], filter_func=None) -> Dict[str, Dict[str, Any]]:
+    async def broadcast_message(self, message: Dict[str, Any], filter_func=None,
+                                priority: Optional[int] = None,
+                                deadline: Optional[float] = None,
+                                timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
         """
         Envía un mensaje a múltiples agentes
         
+        Si se cancela el broadcast se cancelan también todas las peticiones
+        pendientes a los agentes.
+        
         Args:
             message: Mensaje a enviar
             filter_func: Función para filtrar los agentes destinatarios
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos para cada agente (por defecto default_timeout)
             
         Returns:
             dict: Diccionario con las respuestas de cada agente {id: respuesta}
@@ -202,21 +992,183 @@ class AgentSystem:
             agents = {agent_id: agent for agent_id, agent in agents.items() if filter_func(agent)}
             
         tasks = {
-            agent_id: asyncio.create_task(agent.process(message.copy()))
+            agent_id: asyncio.create_task(
+                self._dispatch(agent_id, agent, message.copy(), priority, deadline, timeout)
+            )
             for agent_id, agent in agents.items()
         }
         
         # Esperar a que todas las tareas terminen
         results = {}
-        for agent_id, task in tasks.items():
-            try:
-                results[agent_id] = await task
-            except Exception as e:
-                logger.error(f"Error en broadcast a agente {agent_id}: {e}")
-                results[agent_id] = {
-                    "status": "error",
-                    "agent": agent_id,
-                    "error": str(e)
-                }
+        try:
+            for agent_id, task in tasks.items():
+                try:
+                    results[agent_id] = await task
+                except asyncio.CancelledError:
+                    if _cancelling():
+                        raise
+                    results[agent_id] = {
+                        "status": "cancelled",
+                        "agent": agent_id,
+                        "error": "Procesamiento cancelado"
+                    }
+                except Exception as e:
+                    logger.error(f"Error en broadcast a agente {agent_id}: {e}")
+                    results[agent_id] = {
+                        "status": "error",
+                        "agent": agent_id,
+                        "error": str(e)
+                    }
+        finally:
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
                 
         return results
+        
+    async def ensemble(self, message: Dict[str, Any], agents: Optional[List[str]] = None,
+                       quorum: Optional[int] = None,
+                       comparator: Optional[Callable[[Any, Any], bool]] = None,
+                       validator: Optional[Callable[[Any], bool]] = None,
+                       priority: Optional[int] = None,
+                       deadline: Optional[float] = None,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Envía el mismo mensaje a varios agentes y devuelve en cuanto hay quórum
+        
+        A diferencia de broadcast_message no espera a todas las respuestas:
+        cuando quorum agentes coinciden (por igualdad del texto o según el
+        comparador), o cuando la primera respuesta pasa el validador, las
+        peticiones que siguen en curso se cancelan.
+        
+        Args:
+            message: Mensaje a enviar
+            agents: IDs de los agentes (por defecto todos los registrados)
+            quorum: Respuestas coincidentes necesarias
+            comparator: Función (a, b) -> bool para decidir si dos respuestas coinciden
+            validator: Función (respuesta) -> bool para descartar respuestas inválidas
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos para cada agente (por defecto default_timeout)
+            
+        Returns:
+            dict: status ("success" o "no_quorum"), result, agreed, responses y cancelled
+        """
+        if agents is None:
+            agents = list(self.registry.list_agents())
+        resolved = {}
+        for agent_id in agents:
+            resolved[agent_id] = self.resolve_agent(agent_id)
+            if not resolved[agent_id]:
+                raise ValueError(f"Agente {agent_id} no encontrado")
+        calls = {
+            agent_id: self._dispatch(agent_id, agent, message.copy(), priority, deadline, timeout)
+            for agent_id, agent in resolved.items()
+        }
+        return await run_ensemble(calls, quorum, comparator, validator)
+        
+    async def ensemble_chat(self, messages: List[Dict[str, Any]], providers: Optional[List[str]] = None,
+                            quorum: Optional[int] = None,
+                            comparator: Optional[Callable[[Any, Any], bool]] = None,
+                            validator: Optional[Callable[[Any], bool]] = None,
+                            **kwargs) -> Dict[str, Any]:
+        """
+        Envía la misma conversación a varios proveedores y devuelve en cuanto hay quórum
+        
+        Args:
+            messages: Conversación
+            providers: Nombres de los proveedores (por defecto todos)
+            quorum: Respuestas coincidentes necesarias
+            comparator: Función (a, b) -> bool para decidir si dos respuestas coinciden
+            validator: Función (respuesta) -> bool para descartar respuestas inválidas
+            **kwargs: Parámetros adicionales para chat
+            
+        Returns:
+            dict: status ("success" o "no_quorum"), result, agreed, responses y cancelled
+        """
+        names = providers or list(self.providers)
+        missing = [name for name in names if name not in self.providers]
+        if missing:
+            raise ValueError(f"Proveedor {missing[0]} no encontrado")
+        calls = {name: self.providers[name].chat(messages, **kwargs) for name in names}
+        return await run_ensemble(calls, quorum, comparator, validator)
+        
+    async def map_reduce(self, source: Union[str, AsyncIterator[str]], agents: Union[str, List[str]],
+                         reduce_agent: Optional[str] = None,
+                         map_message: Optional[Callable[[str, int], Dict[str, Any]]] = None,
+                         reduce_message: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+                         chunk_size: int = 8000, overlap: int = 0, max_parallel: int = 4,
+                         fan_in: int = 4, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa una entrada grande por fragmentos y combina los resultados en árbol
+        
+        La entrada se lee en streaming; los fragmentos se reparten entre los
+        agentes con como mucho max_parallel peticiones en vuelo, y cada fan_in
+        resultados consecutivos se combinan con reduce_agent hasta obtener
+        uno solo. Los resultados parciales se emiten según terminan.
+        
+        Args:
+            source: Ruta de un fichero de texto o iterador asíncrono de texto
+            agents: ID o lista de IDs de los agentes de la fase map
+            reduce_agent: Agente que combina resultados (por defecto el primero)
+            map_message: Función (fragmento, índice) -> mensaje para la fase map
+            reduce_message: Función (resultados) -> mensaje para la reducción
+            chunk_size: Tamaño máximo de cada fragmento en caracteres
+            overlap: Caracteres compartidos entre fragmentos consecutivos
+            max_parallel: Máximo de peticiones en vuelo
+            fan_in: Resultados que se combinan en cada reducción
+            timeout: Timeout de cada petición (por defecto default_timeout)
+            
+        Yields:
+            dict: Eventos {"event": "map" | "reduce", ...} con los resultados
+            parciales y un último evento {"event": "result", "result": ...}
+        """
+        if isinstance(agents, str):
+            agents = [agents]
+        job = MapReduce(self, agents, reduce_agent, map_message, reduce_message,
+                        max_parallel=max_parallel, fan_in=fan_in, timeout=timeout)
+        async for event in job.run(chunk_stream(source, chunk_size, overlap)):
+            yield event
+            
+    async def submit_batch(self, inputs: Any = None, provider: Optional[str] = None,
+                           job_id: Optional[str] = None, spool_dir: str = "batches",
+                           poll_interval: float = 30.0, **params) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Procesa muchas peticiones en diferido con la API de lotes del proveedor
+        
+        Pensado para trabajos nocturnos: las peticiones no pasan por el
+        planificador ni por los agentes, sino que se escriben en un spool en
+        disco y se envían como lotes (más baratos y sin consumir los límites
+        de peticiones interactivas). Los proveedores sin API de lotes los
+        procesan en local con chat(). Para reanudar un trabajo interrumpido
+        basta con volver a llamar con el mismo job_id.
+        
+        Args:
+            inputs: Textos o dicts con "messages" o "content" y,
+                opcionalmente, "id" y "params" (iterable o iterable asíncrono)
+            provider: Nombre del proveedor (por defecto el predeterminado)
+            job_id: ID del trabajo (se genera uno si no se indica)
+            spool_dir: Directorio donde se guardan los spools de los trabajos
+            poll_interval: Segundos entre consultas del estado de los lotes
+            **params: Parámetros de chat comunes a todas las peticiones
+            
+        Yields:
+            dict: {"id", "status": "success", "response"} o
+            {"id", "status": "error", "error"} por cada entrada
+        """
+        llm = self.get_provider(provider)
+        if llm is None:
+            raise ValueError(f"Proveedor {provider or 'predeterminado'} no encontrado")
+        job = BatchJob(llm, spool_dir, job_id, poll_interval, **params)
+        logger.info(f"Trabajo por lotes {job.job_id} en {job.path}")
+        async for result in job.run(inputs):
+            yield result
+            
+def _cancelling() -> bool:
+    """
+    Indica si la tarea actual tiene una cancelación pendiente
+    """
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
@@ -0,0 +1,162 @@
+"""
+Tenants: reparto justo de la capacidad del sistema entre clientes
+"""
+
+import collections
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+DEFAULT_TENANT = "default"
+
+class QuotaExceeded(Exception):
+    """
+    El tenant ha agotado su cuota de tokens
+    """
+
+def tenant_of(message: Dict[str, Any], agent=None) -> str:
+    """
+    Identifica el tenant de una petición
+
+    Se usa el campo "tenant" del mensaje o, si no lo tiene, el metadato
+    "tenant" del agente destinatario.
+
+    Args:
+        message: Mensaje de la petición
+        agent: Agente destinatario (opcional)
+
+    Returns:
+        str: Nombre del tenant (DEFAULT_TENANT si no se indica)
+    """
+    tenant = message.get("tenant")
+    if tenant is None and agent is not None:
+        tenant = agent.get_metadata("tenant")
+    return str(tenant) if tenant is not None else DEFAULT_TENANT
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+class Tenant:
+    """
+    Cuotas, estado de planificación y métricas de un tenant
+
+    Attributes:
+        name (str): Nombre del tenant
+        weight (float): Peso en el reparto de huecos (2 recibe el doble que 1)
+        max_concurrency (int): Peticiones simultáneas del tenant (None sin límite)
+        token_quota (int): Tokens por ventana (None sin límite)
+        quota_window (float): Duración de la ventana de la cuota en segundos
+    """
+
+    def __init__(self, name: str, weight: float = 1.0, max_concurrency: Optional[int] = None,
+                 token_quota: Optional[int] = None, quota_window: float = 60.0):
+        if weight <= 0:
+            raise ValueError(f"El peso del tenant {name} debe ser positivo")
+        self.name = name
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.token_quota = token_quota
+        self.quota_window = quota_window
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.tokens = 0
+        self.window_tokens = 0
+        self.window_start = time.monotonic()
+        # Etiqueta virtual de fin de la última petición (reparto justo ponderado)
+        self.finish_tag = 0.0
+        self.waiters: List[list] = []
+        self.waits: Deque[float] = collections.deque(maxlen=1000)
+        self.latencies: Deque[float] = collections.deque(maxlen=1000)
+
+    def configure(self, weight: Optional[float] = None, max_concurrency: Optional[int] = None,
+                  token_quota: Optional[int] = None, quota_window: Optional[float] = None) -> None:
+        """
+        Cambia las cuotas del tenant (los valores None no se modifican)
+        """
+        if weight is not None:
+            if weight <= 0:
+                raise ValueError(f"El peso del tenant {self.name} debe ser positivo")
+            self.weight = weight
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if token_quota is not None:
+            self.token_quota = token_quota
+        if quota_window is not None:
+            self.quota_window = quota_window
+
+    def has_capacity(self) -> bool:
+        return self.max_concurrency is None or self.active < self.max_concurrency
+
+    def _roll_window(self) -> None:
+        now = time.monotonic()
+        if now - self.window_start >= self.quota_window:
+            self.window_start = now
+            self.window_tokens = 0
+
+    def check_quota(self) -> None:
+        """
+        Comprueba que al tenant le quedan tokens en la ventana actual
+
+        Raises:
+            QuotaExceeded: Si la cuota de tokens está agotada
+        """
+        if self.token_quota is None:
+            return
+        self._roll_window()
+        if self.window_tokens >= self.token_quota:
+            self.rejected += 1
+            retry = self.quota_window - (time.monotonic() - self.window_start)
+            raise QuotaExceeded(
+                f"Cuota de tokens del tenant {self.name} agotada ({self.window_tokens}/{self.token_quota},"
+                f" se renueva en {retry:.0f}s)"
+            )
+
+    def record_tokens(self, tokens: int) -> None:
+        """
+        Suma tokens consumidos por una petición del tenant
+        """
+        self._roll_window()
+        self.tokens += tokens
+        self.window_tokens += tokens
+
+    def observe(self, wait: float, latency: float) -> None:
+        """
+        Registra una petición completada
+
+        Args:
+            wait: Segundos en cola
+            latency: Segundos desde que se encoló hasta que terminó
+        """
+        self.completed += 1
+        self.waits.append(wait)
+        self.latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas del tenant
+
+        Returns:
+            dict: Cuotas, peticiones en curso y en cola, tokens consumidos y
+            percentiles de espera en cola y de latencia total
+        """
+        waits = sorted(self.waits)
+        latencies = sorted(self.latencies)
+        self._roll_window()
+        return {
+            "weight": self.weight,
+            "max_concurrency": self.max_concurrency,
+            "token_quota": self.token_quota,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "tokens": self.tokens,
+            "window_tokens": self.window_tokens,
+            "wait_p50": _percentile(waits, 0.5),
+            "wait_p99": _percentile(waits, 0.99),
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p99": _percentile(latencies, 0.99),
+        }
@@ -0,0 +1,343 @@
+"""
+Registro de herramientas y ejecución concurrente de llamadas a herramientas
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import time
+import types
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from agentforge_core.context import DeadlineExceeded, remaining_time
+from agentforge_core.message import to_builtin
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+def _json_type(annotation: Any) -> str:
+    """
+    Tipo JSON de una anotación (Optional[X] se trata como X)
+    """
+    if typing.get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    return _JSON_TYPES.get(typing.get_origin(annotation) or annotation, "string")
+
+def _parameters_from_signature(func: Callable) -> Dict[str, Any]:
+    """
+    Genera el JSON Schema de los parámetros a partir de la firma de la función
+    """
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for name, parameter in inspect.signature(func).parameters.items():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        properties[name] = {"type": _json_type(parameter.annotation)}
+        if parameter.default is parameter.empty:
+            required.append(name)
+    return {"type": "object", "properties": properties, "required": required}
+
+class Tool:
+    """
+    Herramienta que un modelo puede invocar
+
+    Attributes:
+        name (str): Nombre de la herramienta
+        func (callable): Función (síncrona o asíncrona) que la implementa
+        description (str): Descripción para el modelo
+        parameters (dict): JSON Schema de los argumentos
+        timeout (float): Tiempo máximo de ejecución en segundos (None sin límite).
+            Una herramienta síncrona que lo supera no se puede interrumpir:
+            su hilo del pool sigue ocupado hasta que termina
+        max_result_size (int): Máximo de caracteres del resultado devuelto al modelo
+    """
+
+    def __init__(self, func: Callable, name: Optional[str] = None, description: Optional[str] = None,
+                 parameters: Optional[Dict[str, Any]] = None, timeout: Optional[float] = 30.0,
+                 max_result_size: Optional[int] = 16000):
+        self.func = func
+        self.name = name or getattr(func, "__name__", type(func).__name__)
+        self.description = description or inspect.getdoc(func) or ""
+        self.parameters = parameters or _parameters_from_signature(func)
+        self.timeout = timeout
+        self.max_result_size = max_result_size
+        # Los objetos con __call__ asíncrono también se ejecutan en el bucle
+        call = getattr(func, "__call__", None)
+        self.is_async = inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(call)
+
+    def schema(self) -> Dict[str, Any]:
+        """
+        Definición de la herramienta en el formato de la API de chat
+
+        Returns:
+            dict: Definición {"type": "function", "function": {...}}
+        """
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            }
+        }
+
+    def format_result(self, result: Any) -> str:
+        """
+        Convierte el resultado en texto y lo recorta al tamaño máximo
+
+        Args:
+            result: Valor devuelto por la herramienta
+
+        Returns:
+            str: Texto para el mensaje de rol "tool"
+        """
+        text = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=to_builtin)
+        if self.max_result_size is not None and len(text) > self.max_result_size:
+            omitted = len(text) - self.max_result_size
+            text = f"{text[:self.max_result_size]}... [{omitted} caracteres omitidos]"
+        return text
+
+class ToolRegistry:
+    """
+    Conjunto de herramientas disponibles para un agente o un sistema
+
+    Un registro puede tener un registro padre (ver child()) cuyas
+    herramientas también ofrece; las propias tienen prioridad.
+
+    Attributes:
+        parent (ToolRegistry): Registro del que se heredan herramientas (o None)
+    """
+
+    def __init__(self, parent: Optional["ToolRegistry"] = None):
+        self._tools: Dict[str, Tool] = {}
+        self._version = 0
+        self.parent = parent
+
+    @property
+    def version(self) -> int:
+        """
+        Contador de cambios del registro y de sus padres (solo crece)
+        """
+        if self.parent is None:
+            return self._version
+        return self._version + self.parent.version
+
+    def child(self) -> "ToolRegistry":
+        """
+        Crea un registro que ve las herramientas de este y guarda aparte las suyas
+
+        Returns:
+            ToolRegistry: Registro hijo
+        """
+        return ToolRegistry(self)
+
+    def register(self, func: Union[Callable, Tool, None] = None, **kwargs) -> Any:
+        """
+        Registra una herramienta
+
+        Puede usarse directamente o como decorador, con o sin argumentos.
+
+        Args:
+            func: Función o Tool a registrar
+            **kwargs: Parámetros de Tool (name, description, parameters,
+                timeout, max_result_size)
+
+        Returns:
+            La función registrada (para poder usarlo como decorador)
+        """
+        if func is None:
+            return lambda f: self.register(f, **kwargs)
+        tool = func if isinstance(func, Tool) else Tool(func, **kwargs)
+        self._tools[tool.name] = tool
+        self._version += 1
+        return func
+
+    def remove(self, name: str) -> bool:
+        """
+        Elimina una herramienta (las heredadas del padre no se eliminan)
+
+        Args:
+            name: Nombre de la herramienta
+
+        Returns:
+            bool: True si existía
+        """
+        if self._tools.pop(name, None) is None:
+            return False
+        self._version += 1
+        return True
+
+    def get(self, name: str) -> Optional[Tool]:
+        tool = self._tools.get(name)
+        if tool is None and self.parent is not None:
+            return self.parent.get(name)
+        return tool
+
+    def list_tools(self) -> List[Tool]:
+        if self.parent is None:
+            return list(self._tools.values())
+        tools = dict(self._tools)
+        for tool in self.parent.list_tools():
+            tools.setdefault(tool.name, tool)
+        return list(tools.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools or (self.parent is not None and name in self.parent)
+
+    def __len__(self) -> int:
+        return len(self.list_tools())
+
+def merge_tools(*registries: Optional[ToolRegistry]) -> Dict[str, Tool]:
+    """
+    Combina varios registros; los primeros tienen prioridad
+
+    Args:
+        *registries: Registros de herramientas (se ignoran los None)
+
+    Returns:
+        dict: Herramientas por nombre
+    """
+    tools: Dict[str, Tool] = {}
+    for registry in registries:
+        if registry is None:
+            continue
+        for tool in registry.list_tools():
+            tools.setdefault(tool.name, tool)
+    return tools
+
+async def _resolve(awaitable: Any) -> Any:
+    value = await awaitable
+    # Un invocable asíncrono que no se detectó por su firma devuelve una corrutina
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+async def _run_tool(tool: Optional[Tool], call: Dict[str, Any], executor=None) -> Dict[str, Any]:
+    """
+    Ejecuta una llamada y devuelve siempre un resultado, aunque falle
+    """
+    function = call.get("function", {})
+    name = function.get("name")
+    result = {"tool_call_id": call.get("id"), "name": name}
+    start = time.monotonic()
+    try:
+        if tool is None:
+            raise LookupError(f"Herramienta desconocida: {name}")
+        arguments = function.get("arguments") or "{}"
+        kwargs = json.loads(arguments) if isinstance(arguments, str) else dict(arguments)
+        if not isinstance(kwargs, dict):
+            raise ValueError("Los argumentos deben ser un objeto JSON")
+
+        timeout = tool.timeout
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline superado antes de ejecutar {name}")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        if tool.is_async:
+            awaitable = tool.func(**kwargs)
+        else:
+            # Las herramientas síncronas no bloquean el bucle de eventos
+            context = contextvars.copy_context()
+            call_func = functools.partial(context.run, tool.func, **kwargs)
+            awaitable = asyncio.get_running_loop().run_in_executor(executor, call_func)
+        value = await asyncio.wait_for(_resolve(awaitable), timeout)
+        result.update(status="success", content=tool.format_result(value))
+    except asyncio.TimeoutError:
+        result.update(status="timeout", content=f"Error: la herramienta {name} superó el tiempo máximo")
+    except Exception as e:
+        logger.warning(f"Error ejecutando la herramienta {name}: {e}")
+        result.update(status="error", content=f"Error: {e}")
+    result["elapsed"] = time.monotonic() - start
+    return result
+
+async def run_tool_calls(tool_calls: Iterable[Dict[str, Any]], tools: Dict[str, Tool],
+                         executor=None) -> List[Dict[str, Any]]:
+    """
+    Ejecuta concurrentemente las llamadas a herramientas de una respuesta
+
+    Las herramientas asíncronas se ejecutan en el bucle de eventos y las
+    síncronas en un pool de hilos. Un fallo o timeout en una herramienta no
+    afecta a las demás: su error se devuelve como resultado. Tras un
+    timeout la herramienta asíncrona se cancela, pero la síncrona sigue
+    ocupando su hilo hasta terminar; con herramientas lentas conviene
+    pasar un executor propio para no agotar el pool por defecto del bucle.
+
+    Args:
+        tool_calls: Llamadas en el formato de la API de chat
+        tools: Herramientas disponibles por nombre
+        executor: Pool de hilos para las herramientas síncronas (None para
+            el pool por defecto del bucle)
+
+    Returns:
+        list: Resultados en el mismo orden que las llamadas, con
+        tool_call_id, name, status, content y elapsed
+    """
+    calls = list(tool_calls)
+    return list(await asyncio.gather(*(
+        _run_tool(tools.get(call.get("function", {}).get("name")), call, executor) for call in calls
+    )))
+
+async def run_tool_loop(provider, messages: List[Dict[str, Any]], tools: Dict[str, Tool],
+                        max_rounds: int = 8, executor=None, **kwargs) -> Dict[str, Any]:
+    """
+    Conversa con el modelo ejecutando sus llamadas a herramientas hasta que
+    devuelve una respuesta final
+
+    Args:
+        provider: Proveedor de LLM cuyo chat devuelve "tool_calls"
+        messages: Conversación inicial (no se modifica)
+        tools: Herramientas disponibles por nombre
+        max_rounds: Máximo de rondas de herramientas antes de parar
+        executor: Pool de hilos para las herramientas síncronas
+        **kwargs: Parámetros adicionales para provider.chat
+
+    Returns:
+        dict: Última respuesta del modelo con "messages" (conversación
+        completa) y "tool_results" (resultados de todas las herramientas)
+    """
+    conversation = list(messages)
+    results: List[Dict[str, Any]] = []
+    schemas = [tool.schema() for tool in tools.values()]
+    if schemas:
+        kwargs.setdefault("tools", schemas)
+
+    rounds = 0
+    while True:
+        response = await provider.chat(conversation, **kwargs)
+        tool_calls = response.get("tool_calls")
+        if not tool_calls or response.get("role") == "error":
+            break
+        if rounds == max_rounds:
+            logger.warning(f"Bucle de herramientas detenido tras {max_rounds} rondas")
+            response = dict(response, finish_reason="max_rounds")
+            break
+        rounds += 1
+        conversation.append({"role": "assistant", "content": response.get("content"), "tool_calls": tool_calls})
+        round_results = await run_tool_calls(tool_calls, tools, executor)
+        results.extend(round_results)
+        conversation.extend(
+            {"role": "tool", "tool_call_id": result["tool_call_id"], "content": result["content"]}
+            for result in round_results
+        )
+
+    response = dict(response)
+    response["messages"] = conversation
+    response["tool_results"] = results
+    return response
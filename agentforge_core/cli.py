@@ -0,0 +1,77 @@
+"""
+Línea de comandos de AgentForge
+
+    agentforge serve --config sistema.toml --port 8000
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+def _serve(args: argparse.Namespace) -> int:
+    try:
+        import uvicorn
+    except ImportError:
+        print("Módulo 'uvicorn' no encontrado. Instálalo con 'pip install uvicorn'", file=sys.stderr)
+        return 1
+
+    from agentforge_core.config import ConfigError, ConfigManager
+    from agentforge_core.server import create_app
+
+    try:
+        manager = ConfigManager(args.config, drain_timeout=args.drain_timeout)
+    except (ConfigError, ImportError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    app = create_app(manager.system, drain_timeout=args.drain_timeout, manager=manager,
+                     watch_interval=args.watch, probe=args.probe)
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level,
+                timeout_graceful_shutdown=args.drain_timeout)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Construye el parser de argumentos de la línea de comandos
+
+    Returns:
+        argparse.ArgumentParser: Parser con los subcomandos disponibles
+    """
+    parser = argparse.ArgumentParser(prog="agentforge", description="Herramientas de AgentForge")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Expone un sistema de agentes por HTTP/SSE")
+    serve.add_argument("--config", "-c", required=True, help="Fichero de configuración (.toml, .yaml o .json)")
+    serve.add_argument("--host", default="127.0.0.1", help="Dirección en la que escuchar")
+    serve.add_argument("--port", "-p", type=int, default=8000, help="Puerto en el que escuchar")
+    serve.add_argument("--drain-timeout", type=float, default=30.0,
+                       help="Segundos de espera de las peticiones en curso al apagar")
+    serve.add_argument("--watch", type=float, default=None, metavar="SEGUNDOS",
+                       help="Recargar la configuración cuando cambie el fichero")
+    serve.add_argument("--probe", action="store_true",
+                       help="Comprobar que los proveedores responden antes de aceptar tráfico")
+    serve.add_argument("--log-level", default="info", help="Nivel de log")
+    serve.set_defaults(func=_serve)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada del comando agentforge
+
+    Args:
+        argv: Argumentos (por defecto los de sys.argv)
+
+    Returns:
+        int: Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(),
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""
+Configuración declarativa del sistema de agentes
+"""
+
+from agentforge_core.config.loader import ConfigError, load_config
+from agentforge_core.config.manager import ConfigManager, build_system
+
+__all__ = ["ConfigError", "ConfigManager", "build_system", "load_config"]
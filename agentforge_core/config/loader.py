@@ -0,0 +1,272 @@
+"""
+Carga y validación de la configuración declarativa del sistema
+
+Formato (TOML, YAML, JSON o dict):
+
+    [system]
+    node_id = "node-a"
+    max_concurrency = 32
+    max_queue = 1000
+    adaptive_concurrency = true
+    default_timeout = 30
+    default_provider = "openai"
+
+    [providers.openai]
+    type = "openai"
+    api_key_env = "OPENAI_API_KEY"
+    model = "gpt-4o"
+
+    [framework]
+    type = "custom"
+
+    [agents.asistente]
+    role = "asistente personal"
+    processor = "mi_paquete.procesadores:simple_processor"
+    connections = ["investigador"]
+"""
+
+import copy
+import importlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+PROVIDER_TYPES = {
+    "openai": "agentforge_core.llm.openai:OpenAIProvider",
+    "groq": "agentforge_core.llm.groq:GroqProvider",
+    "hashing": "agentforge_core.llm.local:HashingEmbedder",
+    "echo": "agentforge_core.llm.local:EchoProvider",
+    "cascade": "agentforge_core.llm.cascade:CascadeProvider",
+}
+
+FRAMEWORK_TYPES = {
+    "atomic": "agentforge_core.agent.frameworks.atomic:AtomicAgentsFramework",
+    "custom": "agentforge_core.agent.frameworks.custom:CustomAgentFramework",
+}
+
+SYSTEM_KEYS = {"node_id", "max_concurrency", "default_timeout", "default_provider",
+               "max_queue", "adaptive_concurrency", "loop_monitor_threshold", "agent_ttl",
+               "max_session_agents"}
+AGENT_RESERVED_KEYS = {"connections", "metadata", "provider"}
+TENANT_KEYS = {"weight", "max_concurrency", "token_quota", "quota_window"}
+
+class ConfigError(ValueError):
+    """
+    Configuración inválida
+
+    Attributes:
+        errors (list): Lista de todos los problemas encontrados
+    """
+
+    def __init__(self, errors: Union[str, List[str]]):
+        self.errors = [errors] if isinstance(errors, str) else list(errors)
+        super().__init__("Configuración inválida:\n  - " + "\n  - ".join(self.errors))
+
+def resolve_reference(reference: str, aliases: Dict[str, str]) -> Any:
+    """
+    Importa una clase o función a partir de un alias o de "modulo:nombre"
+
+    Args:
+        reference: Alias conocido o referencia "modulo:nombre"
+        aliases: Alias disponibles
+
+    Returns:
+        El objeto importado
+    """
+    reference = aliases.get(reference, reference)
+    module_name, _, qualname = reference.partition(":")
+    if not qualname:
+        raise ValueError(f"Tipo desconocido: {reference}")
+    target: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
+
+def load_config(source: Union[str, Path, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Carga y valida una configuración
+
+    Args:
+        source: Ruta a un fichero .toml, .yaml/.yml o .json, o un dict
+
+    Returns:
+        dict: Configuración normalizada
+
+    Raises:
+        ConfigError: Si la configuración no es válida
+    """
+    if isinstance(source, dict):
+        config = copy.deepcopy(source)
+    else:
+        config = _read_file(Path(source))
+
+    config = normalize_config(config)
+    validate_config(config)
+    return config
+
+def _read_file(path: Path) -> Dict[str, Any]:
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".toml":
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ImportError("Módulo 'tomli' no encontrado. Instálalo con 'pip install tomli'")
+            with open(path, "rb") as f:
+                return tomllib.load(f)
+        if suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Módulo 'yaml' no encontrado. Instálalo con 'pip install pyyaml'")
+            with open(path, "r", encoding="utf-8") as f:
+                return yaml.safe_load(f) or {}
+        if suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except OSError as e:
+        raise ConfigError(f"No se pudo leer {path}: {e}") from e
+    except ValueError as e:
+        raise ConfigError(f"Error de sintaxis en {path}: {e}") from e
+    raise ConfigError(f"Formato de configuración no soportado: {path}")
+
+def normalize_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rellena las secciones opcionales de la configuración
+
+    Args:
+        config: Configuración en bruto
+
+    Returns:
+        dict: Configuración con todas las secciones
+    """
+    if not isinstance(config, dict):
+        raise ConfigError("La configuración debe ser un diccionario")
+    config.setdefault("system", {})
+    config.setdefault("providers", {})
+    config.setdefault("agents", {})
+    config.setdefault("tenants", {})
+    framework = config.get("framework") or {"type": "custom"}
+    if isinstance(framework, str):
+        framework = {"type": framework}
+    config["framework"] = framework
+    return config
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """
+    Valida la configuración completa y acumula todos los errores
+
+    Args:
+        config: Configuración normalizada
+
+    Raises:
+        ConfigError: Si hay algún error
+    """
+    errors: List[str] = []
+
+    system = config["system"]
+    if not isinstance(system, dict):
+        errors.append("[system] debe ser una tabla")
+        system = {}
+    for key in set(system) - SYSTEM_KEYS:
+        errors.append(f"[system] clave desconocida: {key}")
+    for key in ("max_concurrency", "default_timeout", "max_queue", "loop_monitor_threshold", "agent_ttl",
+                "max_session_agents"):
+        value = system.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            errors.append(f"[system] {key} debe ser un número positivo")
+
+    providers = config["providers"]
+    if not isinstance(providers, dict):
+        errors.append("[providers] debe ser una tabla")
+        providers = {}
+    for name, params in providers.items():
+        if not isinstance(params, dict):
+            errors.append(f"[providers.{name}] debe ser una tabla")
+            continue
+        if "type" not in params:
+            errors.append(f"[providers.{name}] falta el campo type")
+        else:
+            try:
+                resolve_reference(params["type"], PROVIDER_TYPES)
+            except (ImportError, AttributeError, ValueError) as e:
+                errors.append(f"[providers.{name}] tipo inválido {params['type']}: {e}")
+        if params.get("type") == "cascade":
+            stages = params.get("stages")
+            if not isinstance(stages, list) or not stages:
+                errors.append(f"[providers.{name}] stages debe ser una lista no vacía")
+                stages = []
+            for index, stage in enumerate(stages):
+                stage_provider = stage.get("provider") if isinstance(stage, dict) else None
+                if stage_provider not in providers or stage_provider == name:
+                    errors.append(f"[providers.{name}] la etapa {index} debe indicar un provider de [providers]")
+        env = params.get("api_key_env")
+        if env and env not in os.environ:
+            errors.append(f"[providers.{name}] variable de entorno {env} no definida")
+
+    default_provider = system.get("default_provider")
+    if default_provider and default_provider not in providers:
+        errors.append(f"[system] default_provider {default_provider} no está en [providers]")
+
+    framework = config["framework"]
+    if not isinstance(framework, dict) or "type" not in framework:
+        errors.append("[framework] debe indicar un type")
+    else:
+        try:
+            resolve_reference(framework["type"], FRAMEWORK_TYPES)
+        except (ImportError, AttributeError, ValueError) as e:
+            errors.append(f"[framework] tipo inválido {framework['type']}: {e}")
+        if not isinstance(framework.get("config", {}), dict):
+            errors.append("[framework] config debe ser una tabla")
+
+    tenants = config["tenants"]
+    if not isinstance(tenants, dict):
+        errors.append("[tenants] debe ser una tabla")
+        tenants = {}
+    for name, params in tenants.items():
+        if not isinstance(params, dict):
+            errors.append(f"[tenants.{name}] debe ser una tabla")
+            continue
+        for key in set(params) - TENANT_KEYS:
+            errors.append(f"[tenants.{name}] clave desconocida: {key}")
+        for key in TENANT_KEYS & set(params):
+            value = params[key]
+            if not isinstance(value, (int, float)) or value <= 0:
+                errors.append(f"[tenants.{name}] {key} debe ser un número positivo")
+
+    agents = config["agents"]
+    if not isinstance(agents, dict):
+        errors.append("[agents] debe ser una tabla")
+        agents = {}
+    for agent_id, params in agents.items():
+        if not isinstance(params, dict):
+            errors.append(f"[agents.{agent_id}] debe ser una tabla")
+            continue
+        for connected_id in params.get("connections", []):
+            if connected_id not in agents:
+                errors.append(f"[agents.{agent_id}] conexión a agente inexistente {connected_id}")
+        provider = params.get("provider")
+        if provider and provider not in providers:
+            errors.append(f"[agents.{agent_id}] proveedor desconocido {provider}")
+        if not isinstance(params.get("metadata", {}), dict):
+            errors.append(f"[agents.{agent_id}] metadata debe ser una tabla")
+        processor = params.get("processor")
+        if isinstance(processor, str):
+            try:
+                resolve_reference(processor, {})
+            except (ImportError, AttributeError, ValueError) as e:
+                errors.append(f"[agents.{agent_id}] processor inválido {processor}: {e}")
+        for key in ("input_schema", "output_schema"):
+            schema = params.get(key)
+            if isinstance(schema, str):
+                try:
+                    resolve_reference(schema, {})
+                except (ImportError, AttributeError, ValueError) as e:
+                    errors.append(f"[agents.{agent_id}] {key} inválido {schema}: {e}")
+
+    if errors:
+        raise ConfigError(errors)
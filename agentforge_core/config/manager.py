@@ -0,0 +1,317 @@
+"""
+Construcción del sistema desde la configuración y recarga en caliente
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from agentforge_core.agent.base import Agent
+from agentforge_core.agent.system import AgentSystem
+from agentforge_core.config.loader import (
+    AGENT_RESERVED_KEYS, FRAMEWORK_TYPES, PROVIDER_TYPES, ConfigError, load_config, resolve_reference
+)
+from agentforge_core.lifecycle import start_all, stop_all, stop_component
+from agentforge_core.llm.provider import Provider
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+def build_provider(name: str, params: Dict[str, Any]) -> Provider:
+    """
+    Crea un proveedor a partir de su configuración
+
+    Args:
+        name: Nombre con el que se registrará el proveedor
+        params: Configuración del proveedor
+
+    Returns:
+        Provider: Instancia del proveedor
+    """
+    params = dict(params)
+    cls = resolve_reference(params.pop("type"), PROVIDER_TYPES)
+    env = params.pop("api_key_env", None)
+    if env:
+        params["api_key"] = os.environ[env]
+    provider = cls(**params)
+    provider.name = name
+    return provider
+
+def build_framework(params: Dict[str, Any]):
+    """
+    Crea un framework de agentes a partir de su configuración
+
+    Args:
+        params: Configuración del framework
+
+    Returns:
+        AgentFramework: Instancia del framework
+    """
+    framework = resolve_reference(params["type"], FRAMEWORK_TYPES)()
+    framework.configure(params.get("config", {}))
+    return framework
+
+def build_agent(system: AgentSystem, framework, agent_id: str, params: Dict[str, Any]) -> Agent:
+    """
+    Crea un agente (sin registrarlo) a partir de su configuración
+
+    Args:
+        system: Sistema al que pertenecerá el agente
+        framework: Framework con el que crearlo
+        agent_id: ID del agente
+        params: Configuración del agente
+
+    Returns:
+        Agent: Instancia del agente
+    """
+    kwargs = {key: value for key, value in params.items() if key not in AGENT_RESERVED_KEYS}
+    agent = framework.create_agent(agent_id, **kwargs)
+    for key, value in params.get("metadata", {}).items():
+        agent.set_metadata(key, value)
+    if params.get("provider"):
+        agent.set_metadata("provider", params["provider"])
+    agent.set_metadata("system", system)
+    return agent
+
+def build_system(source: Union[str, Path, Dict[str, Any]]) -> AgentSystem:
+    """
+    Construye un AgentSystem completo a partir de una configuración
+
+    Args:
+        source: Ruta del fichero de configuración o dict
+
+    Returns:
+        AgentSystem: Sistema con proveedores, framework y agentes
+    """
+    return ConfigManager(source).system
+
+def _without_connections(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in params.items() if key != "connections"}
+
+class ConfigManager:
+    """
+    Mantiene un AgentSystem sincronizado con su configuración
+
+    Al recargar se construyen y validan primero todas las instancias nuevas;
+    después se intercambian de golpe y las antiguas se detienen cuando
+    terminan las peticiones que ya estaban en curso.
+
+    Attributes:
+        system (AgentSystem): Sistema gestionado
+        config (dict): Configuración aplicada actualmente
+        drain_timeout (float): Tiempo máximo de espera antes de retirar instancias antiguas
+    """
+
+    def __init__(self, source: Union[str, Path, Dict[str, Any]], drain_timeout: float = 30.0):
+        self.source = None if isinstance(source, dict) else source
+        self.drain_timeout = drain_timeout
+        self.config = load_config(source)
+        try:
+            self.system = self._create_system(self.config)
+        except (TypeError, ValueError, KeyError) as e:
+            raise ConfigError(f"No se pudo construir el sistema: {e}") from e
+        self._retiring: Set[asyncio.Task] = set()
+        # Los proveedores nuevos se inician con await: una recarga cada vez
+        self._reload_lock = asyncio.Lock()
+
+    def _create_system(self, config: Dict[str, Any]) -> AgentSystem:
+        settings = config["system"]
+        system = AgentSystem(
+            node_id=settings.get("node_id"),
+            max_concurrency=settings.get("max_concurrency"),
+            default_timeout=settings.get("default_timeout"),
+            max_queue=settings.get("max_queue"),
+            adaptive_concurrency=bool(settings.get("adaptive_concurrency")),
+            loop_monitor_threshold=settings.get("loop_monitor_threshold"),
+            agent_ttl=settings.get("agent_ttl"),
+            max_session_agents=settings.get("max_session_agents")
+        )
+        for name, params in config["providers"].items():
+            system.add_provider(build_provider(name, params))
+        if settings.get("default_provider"):
+            system.set_default_provider(settings["default_provider"])
+
+        system.set_framework(build_framework(config["framework"]))
+        for agent_id, params in config["agents"].items():
+            system.registry.register(agent_id, build_agent(system, system.framework, agent_id, params))
+        self._wire(system, config)
+        self._apply_tenants(system, {}, config["tenants"])
+        return system
+
+    def _apply_tenants(self, system: AgentSystem, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """
+        Aplica el peso y las cuotas de los tenants; los que desaparecen de la
+        configuración vuelven a no tener cuotas
+        """
+        for name in set(old) | set(new):
+            params = new.get(name, {})
+            tenant = system.scheduler.tenant(name)
+            tenant.weight = params.get("weight", 1.0)
+            tenant.max_concurrency = params.get("max_concurrency")
+            tenant.token_quota = params.get("token_quota")
+            tenant.quota_window = params.get("quota_window", 60.0)
+        # Despertar a las peticiones en cola que caben con los nuevos límites
+        system.scheduler.set_limit(system.scheduler.max_concurrency)
+
+    def _wire(self, system: AgentSystem, config: Dict[str, Any]) -> None:
+        """
+        Reconstruye las conexiones de los agentes definidos en la configuración
+        """
+        for agent_id, params in config["agents"].items():
+            agent = system.registry.get(agent_id)
+            agent.connections = [system.registry.get(connected_id) for connected_id in params.get("connections", [])]
+
+    async def reload(self, source: Union[str, Path, Dict[str, Any], None] = None) -> Dict[str, List[str]]:
+        """
+        Aplica una nueva configuración sin detener el sistema
+
+        Si la configuración no es válida o algún proveedor nuevo no arranca
+        no se cambia nada.
+
+        Args:
+            source: Nueva configuración (por defecto se relee el fichero original)
+
+        Returns:
+            dict: Cambios aplicados por sección
+
+        Raises:
+            ConfigError: Si la nueva configuración no es válida
+        """
+        async with self._reload_lock:
+            return await self._reload(source)
+
+    async def _reload(self, source: Union[str, Path, Dict[str, Any], None]) -> Dict[str, List[str]]:
+        if source is None:
+            if self.source is None:
+                raise ConfigError("No hay fichero de configuración que recargar")
+            source = self.source
+        new = load_config(source)
+        old = self.config
+        system = self.system
+        if new["system"].get("node_id") != old["system"].get("node_id"):
+            # El nodo está registrado con su ID en el anillo de los demás nodos
+            raise ConfigError("Cambiar system.node_id requiere reinicio")
+        changes: Dict[str, List[str]] = {"system": [], "providers": [], "framework": [], "agents": [],
+                                         "tenants": []}
+
+        # 1. Construir todas las instancias nuevas sin tocar el sistema
+        framework_changed = old["framework"] != new["framework"]
+        try:
+            new_providers = {
+                name: build_provider(name, params)
+                for name, params in new["providers"].items()
+                if old["providers"].get(name) != params
+            }
+            framework = build_framework(new["framework"]) if framework_changed else system.framework
+            new_agents = {
+                agent_id: build_agent(system, framework, agent_id, params)
+                for agent_id, params in new["agents"].items()
+                if framework_changed
+                or _without_connections(old["agents"].get(agent_id, {})) != _without_connections(params)
+            }
+        except (TypeError, ValueError, KeyError) as e:
+            raise ConfigError(f"No se pudo construir la nueva configuración: {e}") from e
+        removed_providers = [name for name in old["providers"] if name not in new["providers"]]
+        removed_agents = [agent_id for agent_id in old["agents"] if agent_id not in new["agents"]]
+
+        for provider in new_providers.values():
+            if hasattr(provider, "bind"):
+                provider.bind(system)
+
+        if system.running:
+            components: Dict[str, Any] = {f"provider:{name}": provider for name, provider in new_providers.items()}
+            if framework_changed:
+                components[f"framework:{framework.name}"] = framework
+            reports = await start_all(components)
+            failed = [f"No se pudo iniciar {name}: {report['error']}"
+                      for name, report in reports.items() if report["status"] != "ready"]
+            if failed:
+                await stop_all(components)
+                raise ConfigError(failed)
+
+        # 2. Intercambio atómico: no hay ningún await entre estas líneas
+        retired: List[Any] = [system.providers[name] for name in list(new_providers) + removed_providers
+                              if name in system.providers]
+        providers = {name: provider for name, provider in system.providers.items() if name not in removed_providers}
+        providers.update(new_providers)
+        system.providers = providers
+        default_provider = new["system"].get("default_provider")
+        if default_provider:
+            system.set_default_provider(default_provider)
+        elif system._default_provider not in providers:
+            system._default_provider = next(iter(providers), None)
+
+        if framework_changed:
+            retired.append(system.framework)
+            system.set_framework(framework)
+
+        for agent_id in removed_agents:
+            system.registry.remove(agent_id)
+        for agent_id, agent in new_agents.items():
+            system.registry.replace(agent_id, agent)
+        self._wire(system, new)
+
+        system.default_timeout = new["system"].get("default_timeout")
+        system.scheduler.max_queue = new["system"].get("max_queue")
+        system.registry.configure_eviction(new["system"].get("agent_ttl"), new["system"].get("max_session_agents"))
+        system.set_concurrency(new["system"].get("max_concurrency"), bool(new["system"].get("adaptive_concurrency")))
+        threshold = new["system"].get("loop_monitor_threshold")
+        if threshold != system.loop_monitor_threshold:
+            system.loop_monitor_threshold = threshold
+            if threshold is None:
+                system.disable_loop_monitor()
+            elif system.running:
+                system.enable_loop_monitor(threshold)
+        self._apply_tenants(system, old["tenants"], new["tenants"])
+        old_generation = system.advance_generation()
+        self.config = new
+
+        changes["system"] = [key for key in set(old["system"]) | set(new["system"])
+                             if old["system"].get(key) != new["system"].get(key)]
+        changes["providers"] = list(new_providers) + removed_providers
+        changes["framework"] = [framework.name] if framework_changed else []
+        changes["agents"] = list(new_agents) + removed_agents
+        changes["tenants"] = [name for name in set(old["tenants"]) | set(new["tenants"])
+                              if old["tenants"].get(name) != new["tenants"].get(name)]
+        logger.info(f"Configuración recargada: {changes}")
+
+        # 3. Retirar las instancias antiguas cuando terminen sus peticiones
+        if retired:
+            task = asyncio.create_task(self._retire(old_generation, retired))
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+        return changes
+
+    async def _retire(self, generation: int, instances: List[Any]) -> None:
+        if not await self.system.wait_drained(generation, self.drain_timeout):
+            logger.warning(f"Retirando instancias antiguas con peticiones aún en curso tras {self.drain_timeout}s")
+        await asyncio.gather(*(stop_component(instance) for instance in instances))
+
+    async def watch(self, interval: float = 2.0) -> None:
+        """
+        Recarga la configuración cada vez que cambia el fichero
+
+        Las configuraciones inválidas se registran en el log y se ignoran.
+
+        Args:
+            interval: Segundos entre comprobaciones
+        """
+        if self.source is None:
+            raise ConfigError("No hay fichero de configuración que vigilar")
+        path = Path(self.source)
+        last_mtime: Optional[float] = path.stat().st_mtime
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if mtime == last_mtime:
+                continue
+            last_mtime = mtime
+            try:
+                await self.reload()
+            except (ConfigError, ImportError, KeyError, TypeError) as e:
+                logger.error(f"No se aplicó la nueva configuración de {path}: {e}")
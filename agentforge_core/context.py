@@ -0,0 +1,102 @@
+"""
+Contexto de ejecución de una petición (deadline y tenant propagados por contextvars)
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("agentforge_deadline", default=None)
+_tenant: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("agentforge_tenant", default=None)
+
+class DeadlineExceeded(Exception):
+    """
+    El deadline de la petición ya ha pasado
+    """
+
+def get_deadline() -> Optional[float]:
+    """
+    Obtiene el deadline absoluto (epoch en segundos) de la petición actual
+
+    Returns:
+        float: Deadline o None si la petición no tiene
+    """
+    return _deadline.get()
+
+def remaining_time() -> Optional[float]:
+    """
+    Calcula el tiempo que le queda a la petición actual
+
+    Returns:
+        float: Segundos restantes (puede ser negativo) o None si no hay deadline
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+def check_deadline() -> None:
+    """
+    Comprueba que el deadline de la petición actual no ha pasado
+
+    Raises:
+        DeadlineExceeded: Si el deadline ya ha pasado
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline superado hace {-remaining:.3f}s")
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Establece el deadline de la petición para el bloque
+
+    Si ya hay un deadline más estricto en el contexto, se mantiene ese.
+
+    Args:
+        deadline: Deadline absoluto (epoch en segundos) o None
+    """
+    current = _deadline.get()
+    if deadline is None or (current is not None and current <= deadline):
+        yield
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def current_tenant() -> Optional[Any]:
+    """
+    Obtiene el tenant de la petición actual
+
+    Returns:
+        Tenant: Tenant o None si la petición no tiene
+    """
+    return _tenant.get()
+
+@contextmanager
+def tenant_scope(tenant: Optional[Any]) -> Iterator[None]:
+    """
+    Establece el tenant de la petición para el bloque
+
+    Args:
+        tenant: Tenant al que se atribuye el consumo del bloque
+    """
+    token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+def record_usage(usage: Optional[Dict[str, Any]]) -> None:
+    """
+    Atribuye el consumo de tokens de una respuesta al tenant de la petición actual
+
+    Args:
+        usage: Campo "usage" de la respuesta de un proveedor
+    """
+    tenant = _tenant.get()
+    if tenant is not None and usage:
+        tenant.record_tokens(usage.get("total_tokens") or 0)
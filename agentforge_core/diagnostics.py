@@ -0,0 +1,178 @@
+"""
+Diagnóstico del bucle de eventos: retardo y llamadas bloqueantes
+
+Una tarea del bucle marca un latido cada interval segundos y mide cuánto
+se retrasa cada latido. Un hilo vigilante comprueba que los latidos llegan;
+si el bucle lleva más de threshold segundos sin latir, captura la pila del
+hilo del bucle (lo que se está ejecutando en ese momento) y la atribuye al
+agente o proveedor que aparece en ella. Si durante el mismo bloqueo cambia
+el agente o proveedor implicado se registra un bloqueo nuevo.
+"""
+
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Deque, Dict, Optional
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+def _origin_key(event: Dict[str, Any]) -> str:
+    if event.get("agent"):
+        return f"agent:{event['agent']}"
+    if event.get("provider"):
+        return f"provider:{event['provider']}"
+    return "unknown"
+
+class LoopMonitor:
+    """
+    Medidor de retardo del bucle de eventos y detector de bloqueos
+
+    Attributes:
+        threshold (float): Segundos sin latido a partir de los que se considera bloqueo
+        interval (float): Segundos entre latidos
+        max_events (int): Bloqueos recientes que se conservan
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: Optional[float] = None, max_events: int = 50,
+                 stack_limit: int = 40):
+        self.threshold = threshold
+        self.interval = interval or min(threshold / 2, 0.05)
+        self.max_events = max_events
+        self.stack_limit = stack_limit
+        self.events: Deque[Dict[str, Any]] = collections.deque(maxlen=max_events)
+        self.blocked_by: Dict[str, int] = collections.Counter()
+        self.beats = 0
+        self.lag_max = 0.0
+        self.lag_avg = 0.0
+        self.lag_total = 0.0
+        self._last_beat = time.monotonic()
+        self._current: Optional[Dict[str, Any]] = None
+        self._current_start = 0.0
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Empieza a vigilar el bucle de eventos actual (debe llamarse desde él)
+        """
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="agentforge-loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Monitor del bucle de eventos activo (umbral {self.threshold * 1000:.0f} ms)")
+
+    def stop(self) -> None:
+        """
+        Deja de vigilar el bucle
+        """
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.beats += 1
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            self.lag_avg += (lag - self.lag_avg) * 0.1
+            self._last_beat = now
+            current, self._current = self._current, None
+            if current is not None:
+                # El bloqueo ha terminado: ya se conoce su duración
+                self._close(current, now - self._current_start)
+
+    def _watch(self) -> None:
+        """
+        Hilo vigilante: captura la pila del bucle cuando deja de latir
+        """
+        while not self._stopped.wait(self.interval / 2):
+            now = time.monotonic()
+            blocked = now - self._last_beat - self.interval
+            if blocked < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            origin = self._attribute(frame)
+            current = self._current
+            if current is not None:
+                if _origin_key(current) == _origin_key(origin):
+                    continue
+                # Otro agente o proveedor sigue bloqueando el bucle
+                self._close(current, now - self._current_start)
+                start = now
+            else:
+                start = self._last_beat + self.interval
+            event = {"time": time.time(), "duration": None, **origin}
+            event["stack"] = [f"{entry.filename}:{entry.lineno} {entry.name}"
+                              for entry in traceback.extract_stack(frame, limit=self.stack_limit)]
+            self._current = event
+            self._current_start = start
+            self.events.append(event)
+            self.blocked_by[_origin_key(event)] += 1
+
+    def _close(self, event: Dict[str, Any], duration: float) -> None:
+        event["duration"] = duration
+        logger.warning(
+            f"Bucle de eventos bloqueado {duration * 1000:.0f} ms ({_origin_key(event)})"
+            f" en {event['stack'][-1] if event['stack'] else '?'}"
+        )
+
+    def _attribute(self, frame) -> Dict[str, Any]:
+        """
+        Busca en la pila el agente y el proveedor implicados
+        """
+        from agentforge_core.agent.base import Agent
+        from agentforge_core.llm.provider import Provider
+
+        found: Dict[str, Any] = {}
+        while frame is not None and len(found) < 2:
+            instance = frame.f_locals.get("self")
+            if "agent" not in found:
+                agent = instance if isinstance(instance, Agent) else frame.f_locals.get("agent")
+                if isinstance(agent, Agent):
+                    found["agent"] = agent.id
+            if "provider" not in found and isinstance(instance, Provider):
+                found["provider"] = instance.name
+            frame = frame.f_back
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas del bucle de eventos
+
+        Returns:
+            dict: Retardos medio, máximo y acumulado, bloqueos detectados por
+            origen y los bloqueos más recientes con su pila
+        """
+        return {
+            "threshold": self.threshold,
+            "beats": self.beats,
+            "lag_avg": self.lag_avg,
+            "lag_max": self.lag_max,
+            "lag_total": self.lag_total,
+            "blocked": sum(self.blocked_by.values()),
+            "blocked_by": dict(self.blocked_by),
+            "recent": list(self.events),
+        }
@@ -0,0 +1,95 @@
+"""
+Arranque y parada concurrentes de proveedores y frameworks con informe de estado
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+async def start_component(component: Any, probe: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Inicia un proveedor o framework y, si se pide, comprueba que responde
+
+    start() es síncrono (puede importar módulos o crear clientes), así que
+    se ejecuta en un hilo para poder iniciar varios componentes a la vez.
+
+    Args:
+        component: Proveedor o framework con start() y, opcionalmente, health_check()
+        probe: Si es True se llama a health_check() tras iniciarlo
+        timeout: Tiempo máximo para iniciar y comprobar el componente
+
+    Returns:
+        dict: {"status": "ready" | "failed" | "unhealthy", "latency", "error"}
+    """
+    started = time.monotonic()
+    report: Dict[str, Any] = {"status": "ready"}
+    try:
+        async with asyncio.timeout(timeout):
+            if not await asyncio.to_thread(component.start):
+                report = {"status": "failed", "error": "No se pudo iniciar (ver log)"}
+            elif probe and hasattr(component, "health_check"):
+                try:
+                    await component.health_check()
+                except Exception as e:
+                    report = {"status": "unhealthy", "error": str(e)}
+    except TimeoutError:
+        report = {"status": "failed", "error": f"Sin respuesta tras {timeout}s"}
+    except Exception as e:
+        report = {"status": "failed", "error": str(e)}
+    report["latency"] = time.monotonic() - started
+    if report["status"] != "ready":
+        logger.error(f"{component.name}: {report['status']} ({report['error']})")
+    return report
+
+async def stop_component(component: Any) -> Dict[str, Any]:
+    """
+    Detiene un proveedor (cerrando sus conexiones) o un framework
+
+    Args:
+        component: Proveedor con close() o framework con stop()
+
+    Returns:
+        dict: {"status": "stopped" | "failed", "error"}
+    """
+    try:
+        if hasattr(component, "close"):
+            await component.close()
+        else:
+            await asyncio.to_thread(component.stop)
+        return {"status": "stopped"}
+    except Exception as e:
+        logger.error(f"Error deteniendo {component.name}: {e}")
+        return {"status": "failed", "error": str(e)}
+
+async def start_all(components: Dict[str, Any], probe: bool = False,
+                    timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Inicia varios componentes a la vez
+
+    Args:
+        components: Componentes por nombre
+        probe: Si es True se comprueba cada componente tras iniciarlo
+        timeout: Tiempo máximo por componente
+
+    Returns:
+        dict: Informe de cada componente {nombre: informe}
+    """
+    reports = await asyncio.gather(*(start_component(component, probe, timeout) for component in components.values()))
+    return dict(zip(components, reports))
+
+async def stop_all(components: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Detiene varios componentes a la vez
+
+    Args:
+        components: Componentes por nombre
+
+    Returns:
+        dict: Informe de cada componente {nombre: informe}
+    """
+    reports = await asyncio.gather(*(stop_component(component) for component in components.values()))
+    return dict(zip(components, reports))
@@ -4,16 +4,29 @@ Módulo para proveedores de modelos de lenguaje (LLM)
 
 from agentforge_core.llm.provider import Provider
 from agentforge_core.llm.openai import OpenAIProvider
+from agentforge_core.llm.groq import GroqProvider
+from agentforge_core.llm.local import EchoProvider, HashingEmbedder
+from agentforge_core.llm.vectorstore import VectorStore
+from agentforge_core.llm.cascade import CascadeProvider, CascadeStage
+from agentforge_core.llm.batch import BatchJob
+from agentforge_core.llm.prompts import BoundPrompt, PromptTemplate
 
 # Las siguientes importaciones se habilitarán cuando existan los archivos
 # from agentforge_core.llm.anthropic import AnthropicProvider
-# from agentforge_core.llm.groq import GroqProvider
 # from agentforge_core.llm.grok import GrokProvider
 
 __all__ = [
     "Provider", 
     "OpenAIProvider", 
     # "AnthropicProvider", 
-    # "GroqProvider", 
+    "GroqProvider", 
+    "EchoProvider",
+    "HashingEmbedder",
+    "VectorStore",
+    "CascadeProvider",
+    "CascadeStage",
+    "BatchJob",
+    "PromptTemplate",
+    "BoundPrompt",
     # "GrokProvider"
 ]
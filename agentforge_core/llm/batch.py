@@ -0,0 +1,323 @@
+"""
+Trabajos por lotes en diferido a través de la API de lotes de los proveedores
+
+Las entradas se escriben en streaming en un directorio de spool, repartidas
+en ficheros JSONL de como mucho batch_max_requests peticiones. Cada fichero
+se envía como un lote en cuanto se completa y se consulta periódicamente
+hasta que termina; sus resultados se añaden a results.jsonl y se emiten
+asociados al ID de su entrada. Todo el progreso se guarda en state.json,
+así que tras una caída basta con volver a lanzar el trabajo con el mismo
+job_id para continuar sin reenviar lo que ya estaba enviado.
+
+Estructura del spool:
+
+    <spool_dir>/<job_id>/
+        state.json          progreso del trabajo
+        chunk-00000.jsonl   peticiones {"custom_id", "messages", "params"}
+        results.jsonl       resultados {"id", "status", "response" | "error"}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Set, Union
+
+from agentforge_core.llm.provider import Provider
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Estados en los que el proveedor ya no va a procesar más peticiones del lote
+FINISHED_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+Inputs = Union[Iterable[Any], AsyncIterable[Any], None]
+
+def batch_request(item: Any, index: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte una entrada en una petición del spool
+
+    Args:
+        item: Texto, o dict con "messages" o "content" y, opcionalmente,
+            "id" y "params"
+        index: Posición de la entrada (ID por defecto)
+        params: Parámetros comunes a todas las peticiones
+
+    Returns:
+        dict: Petición {"custom_id", "messages", "params"}
+    """
+    if isinstance(item, str):
+        item = {"content": item}
+    messages = item.get("messages")
+    if messages is None:
+        messages = [{"role": "user", "content": item.get("content")}]
+    return {
+        "custom_id": str(item.get("id", index)),
+        "messages": list(messages),
+        "params": {**params, **item.get("params", {})},
+    }
+
+async def _iterate(inputs: Inputs) -> AsyncIterator[Any]:
+    if inputs is None:
+        return
+    if hasattr(inputs, "__aiter__"):
+        async for item in inputs:
+            yield item
+    else:
+        for item in inputs:
+            yield item
+
+class BatchJob:
+    """
+    Trabajo por lotes con spool en disco y reanudación tras caídas
+
+    Attributes:
+        provider (Provider): Proveedor que procesa los lotes
+        job_id (str): ID del trabajo (nombre de su directorio de spool)
+        path (Path): Directorio de spool del trabajo
+        poll_interval (float): Segundos entre consultas del estado de los lotes
+        params (dict): Parámetros de chat comunes a todas las peticiones
+    """
+
+    def __init__(self, provider: Provider, spool_dir: Union[str, Path] = "batches",
+                 job_id: Optional[str] = None, poll_interval: float = 30.0, **params):
+        self.provider = provider
+        self.job_id = job_id or uuid.uuid4().hex
+        self.path = Path(spool_dir) / self.job_id
+        self.poll_interval = poll_interval
+        self.params = params
+        self.state: Dict[str, Any] = {"job_id": self.job_id, "provider": provider.name,
+                                      "spooled": False, "total": 0, "chunks": []}
+
+    @property
+    def results_path(self) -> Path:
+        return self.path / "results.jsonl"
+
+    def _load_state(self) -> bool:
+        state_path = self.path / "state.json"
+        if not state_path.exists():
+            return False
+        with open(state_path, "r", encoding="utf-8") as f:
+            self.state = json.load(f)
+        return True
+
+    def _save_state(self) -> None:
+        # Escritura atómica: una caída nunca deja un state.json a medias
+        tmp_path = self.path / "state.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path / "state.json")
+
+    def _stored_results(self) -> List[Dict[str, Any]]:
+        """
+        Lee los resultados guardados antes de una caída
+
+        Una caída durante la escritura deja la última línea a medias: se
+        recorta el fichero hasta el último salto de línea para que el
+        siguiente resultado no se escriba a continuación de ella.
+        """
+        if not self.results_path.exists():
+            return []
+        with open(self.results_path, "r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                end = data.rfind(b"\n") + 1
+                logger.warning(f"Trabajo {self.job_id}: se descarta un resultado escrito a medias")
+                f.truncate(end)
+                data = data[:end]
+        results = []
+        for line in data.decode("utf-8").splitlines():
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+        return results
+
+    async def _spool(self, inputs: Inputs, submitted: asyncio.Queue) -> None:
+        """
+        Escribe las entradas en ficheros de lote y los envía según se completan
+
+        Al reanudar un spool incompleto se saltan las entradas de los
+        ficheros ya cerrados y se reescribe el resto.
+        """
+        chunks = self.state["chunks"]
+        skip = sum(chunk["count"] for chunk in chunks)
+        limit = self.provider.batch_max_requests
+        max_bytes = self.provider.batch_max_bytes
+        current: Optional[Dict[str, Any]] = None
+        f = None
+        index = 0
+
+        async def seal() -> None:
+            nonlocal current, f
+            f.close()
+            chunks.append(current)
+            self.state["total"] += current["count"]
+            self._save_state()
+            await self._submit(current)
+            await submitted.put(current)
+            current, f = None, None
+
+        try:
+            async for item in _iterate(inputs):
+                index += 1
+                if index <= skip:
+                    continue
+                line = json.dumps(batch_request(item, index - 1, self.params)) + "\n"
+                size = len(line.encode("utf-8"))
+                if current is not None and (current["count"] >= limit or current["bytes"] + size > max_bytes):
+                    await seal()
+                if current is None:
+                    name = f"chunk-{len(chunks):05d}.jsonl"
+                    current = {"file": name, "count": 0, "bytes": 0, "batch_id": None, "status": "spooled"}
+                    f = open(self.path / name, "w", encoding="utf-8")
+                f.write(line)
+                current["count"] += 1
+                current["bytes"] += size
+            if current is not None:
+                await seal()
+        finally:
+            if f is not None:
+                f.close()
+        self.state["spooled"] = True
+        self._save_state()
+        await submitted.put(None)
+        logger.info(f"Trabajo {self.job_id}: {self.state['total']} peticiones en {len(chunks)} lotes")
+
+    async def _submit(self, chunk: Dict[str, Any]) -> None:
+        chunk["batch_id"] = await self.provider.create_batch(str(self.path / chunk["file"]))
+        chunk["status"] = "submitted"
+        self._save_state()
+        logger.info(f"Trabajo {self.job_id}: lote {chunk['file']} enviado como {chunk['batch_id']}")
+
+    async def _collect(self, chunk: Dict[str, Any], collected: Set[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Guarda y emite los resultados de un lote terminado
+
+        Las peticiones sin resultado (lote fallido o caducado) se emiten
+        como error.
+        """
+        pending = set()
+        with open(self.path / chunk["file"], "r", encoding="utf-8") as f:
+            for line in f:
+                pending.add(json.loads(line)["custom_id"])
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            async for item in self.provider.batch_results(chunk["batch_id"]):
+                request_id = item["custom_id"]
+                if request_id not in pending:
+                    continue
+                pending.discard(request_id)
+                if request_id in collected:
+                    continue
+                if "error" in item:
+                    result = {"id": request_id, "status": "error", "error": item["error"]}
+                else:
+                    result = {"id": request_id, "status": "success", "response": item["response"]}
+                f.write(json.dumps(result, default=str) + "\n")
+                collected.add(request_id)
+                yield result
+            for request_id in sorted(pending - collected):
+                result = {"id": request_id, "status": "error",
+                          "error": f"Sin resultado (lote {chunk['status']})"}
+                f.write(json.dumps(result) + "\n")
+                collected.add(request_id)
+                yield result
+            f.flush()
+            os.fsync(f.fileno())
+        chunk["status"] = "collected"
+        self._save_state()
+
+    async def run(self, inputs: Inputs = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecuta (o reanuda) el trabajo
+
+        Al reanudar se emiten primero los resultados ya guardados, así que
+        el iterador siempre devuelve un resultado por entrada.
+
+        Args:
+            inputs: Entradas (iterable o iterable asíncrono). Al reanudar un
+                trabajo cuyo spool se completó pueden omitirse
+
+        Yields:
+            dict: {"id", "status": "success", "response"} o {"id", "status": "error", "error"}
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        resumed = self._load_state()
+        if resumed:
+            logger.info(f"Reanudando el trabajo por lotes {self.job_id}")
+            if not self.state["spooled"] and inputs is None:
+                raise ValueError(f"El spool del trabajo {self.job_id} está incompleto: hay que volver a pasar las entradas")
+        else:
+            self._save_state()
+
+        collected = set()
+        if resumed:
+            for result in self._stored_results():
+                if result["id"] not in collected:
+                    collected.add(result["id"])
+                    yield result
+
+        # Lotes cerrados antes de la caída: se envían los que no llegaron a
+        # enviarse y se reenvían los que el proveedor ya no conoce
+        active: List[Dict[str, Any]] = []
+        for chunk in self.state["chunks"]:
+            if chunk["status"] == "collected":
+                continue
+            if chunk["batch_id"] is None or (await self.provider.batch_status(chunk["batch_id"]))["status"] == "unknown":
+                await self._submit(chunk)
+            active.append(chunk)
+
+        submitted: asyncio.Queue = asyncio.Queue()
+        spooling = None
+        if not self.state["spooled"]:
+            spooling = asyncio.create_task(self._spool(inputs, submitted))
+        else:
+            submitted.put_nowait(None)
+
+        try:
+            spooled = False
+            while active or not spooled:
+                while not submitted.empty():
+                    chunk = submitted.get_nowait()
+                    if chunk is None:
+                        spooled = True
+                    else:
+                        active.append(chunk)
+                for chunk in list(active):
+                    status = await self.provider.batch_status(chunk["batch_id"])
+                    if status["status"] == "unknown":
+                        logger.warning(f"Trabajo {self.job_id}: el proveedor no conoce el lote"
+                                       f" {chunk['batch_id']}, se reenvía")
+                        await self._submit(chunk)
+                        continue
+                    if status["status"] not in FINISHED_STATUSES:
+                        continue
+                    chunk["status"] = status["status"]
+                    async for result in self._collect(chunk, collected):
+                        yield result
+                    active.remove(chunk)
+                if spooling is not None and spooling.done():
+                    spooling.result()
+                if active or not spooled:
+                    await self._wait(submitted)
+        finally:
+            if spooling is not None and not spooling.done():
+                spooling.cancel()
+        logger.info(f"Trabajo {self.job_id} terminado: {len(collected)} resultados")
+
+    async def _wait(self, submitted: asyncio.Queue) -> None:
+        # Espera poll_interval o a que se cierre un lote nuevo
+        if not submitted.empty():
+            return
+        getter = asyncio.ensure_future(submitted.get())
+        try:
+            done, _ = await asyncio.wait([getter], timeout=self.poll_interval)
+            if done:
+                # Se devuelve a la cola para procesarlo en la siguiente vuelta
+                submitted.put_nowait(getter.result())
+        finally:
+            getter.cancel()
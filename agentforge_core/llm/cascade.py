@@ -0,0 +1,284 @@
+"""
+Cascada de modelos: primero el más rápido y barato, y solo si su respuesta
+no supera el validador se escala al siguiente
+"""
+
+import collections
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from agentforge_core.llm.provider import Provider
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+Validator = Callable[[Dict[str, Any]], Union[bool, float]]
+
+# Validadores predefinidos
+
+def non_empty(response: Dict[str, Any]) -> bool:
+    """
+    Acepta cualquier respuesta con texto
+    """
+    return bool((response.get("content") or "").strip())
+
+def min_length(characters: int) -> Validator:
+    """
+    Acepta las respuestas con al menos cierto número de caracteres
+
+    Args:
+        characters: Longitud mínima
+    """
+    return lambda response: len((response.get("content") or "").strip()) >= characters
+
+def json_schema(schema: Any = None) -> Validator:
+    """
+    Acepta las respuestas que son JSON válido y, si se indica, cumplen un esquema
+
+    Args:
+        schema: Modelo de pydantic o función que recibe el objeto y devuelve
+            bool (None para aceptar cualquier JSON)
+    """
+    def validate(response: Dict[str, Any]) -> bool:
+        content = response.get("content") or ""
+        if hasattr(schema, "model_validate_json"):
+            try:
+                schema.model_validate_json(content)
+                return True
+            except ValueError:
+                return False
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return False
+        return True if schema is None else bool(schema(data))
+    return validate
+
+valid_json = json_schema()
+
+_CONFIDENCE = re.compile(r"confian(?:za|ce)\W{0,3}(\d+(?:\.\d+)?)\s*(%?)", re.IGNORECASE)
+
+def confidence(response: Dict[str, Any]) -> float:
+    """
+    Puntúa una respuesta con la confianza que declara el propio modelo
+
+    Se busca un campo "confidence" en una respuesta JSON o un texto del tipo
+    "confianza: 0.8" / "confidence: 80%". Sin confianza declarada la
+    puntuación es 0.
+
+    Returns:
+        float: Confianza entre 0 y 1
+    """
+    content = response.get("content") or ""
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict) and isinstance(data.get("confidence"), (int, float)):
+            value = float(data["confidence"])
+            return value / 100 if value > 1 else value
+    except ValueError:
+        pass
+    match = _CONFIDENCE.search(content)
+    if not match:
+        return 0.0
+    value = float(match.group(1))
+    return value / 100 if match.group(2) or value > 1 else value
+
+def all_of(*validators: Validator, threshold: float = 0.5) -> Validator:
+    """
+    Combina varios validadores: la respuesta debe superarlos todos
+
+    Args:
+        *validators: Validadores a combinar
+        threshold: Puntuación mínima para los validadores que devuelven números
+    """
+    def validate(response: Dict[str, Any]) -> bool:
+        for validator in validators:
+            score = validator(response)
+            if score is False or (not isinstance(score, bool) and score < threshold):
+                return False
+        return True
+    return validate
+
+VALIDATORS = {
+    "non_empty": "agentforge_core.llm.cascade:non_empty",
+    "json": "agentforge_core.llm.cascade:valid_json",
+    "confidence": "agentforge_core.llm.cascade:confidence",
+}
+
+class CascadeStage:
+    """
+    Etapa de una cascada
+
+    Attributes:
+        provider: Proveedor o nombre de un proveedor del sistema
+        params (dict): Parámetros adicionales para chat (p. ej. model)
+        validator: Validador de las respuestas de esta etapa (la última no se
+            valida); también un alias de VALIDATORS o una referencia "modulo:nombre"
+        threshold (float): Puntuación mínima si el validador devuelve un número
+        name (str): Nombre de la etapa en las estadísticas
+    """
+
+    def __init__(self, provider: Union[Provider, str], validator: Optional[Validator] = None,
+                 threshold: float = 0.5, name: Optional[str] = None, **params):
+        self.provider = provider
+        self.params = params
+        if isinstance(validator, str):
+            from agentforge_core.config.loader import resolve_reference
+            validator = resolve_reference(validator, VALIDATORS)
+        self.validator = validator or non_empty
+        self.threshold = threshold
+        provider_name = provider if isinstance(provider, str) else provider.name
+        self.name = name or (f"{provider_name}:{params['model']}" if "model" in params else provider_name)
+        self.calls = 0
+        self.accepted = 0
+        self.escalated = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latencies = collections.deque(maxlen=1000)
+
+    def accepts(self, response: Dict[str, Any]) -> bool:
+        """
+        Indica si la respuesta es suficientemente buena para no escalar
+        """
+        if response.get("role") == "error":
+            return False
+        try:
+            score = self.validator(response)
+        except Exception as e:
+            logger.warning(f"Error en el validador de la etapa {self.name}: {e}")
+            return False
+        if isinstance(score, bool):
+            return score
+        return score >= self.threshold
+
+    def record(self, latency: float) -> None:
+        self.calls += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "escalated": self.escalated,
+            "errors": self.errors,
+            "latency_avg": self.latency_total / self.calls if self.calls else None,
+            "latency_p95": recent[int(len(recent) * 0.95)] if recent else None,
+            "latency_max": self.latency_max,
+        }
+
+class CascadeProvider(Provider):
+    """
+    Proveedor que recorre una cascada de modelos de menor a mayor coste
+
+    Cada petición se envía a la primera etapa; si su respuesta no supera el
+    validador de la etapa se repite en la siguiente, y así hasta la última,
+    cuya respuesta se devuelve siempre.
+
+    Attributes:
+        stages (list): Etapas de la cascada
+    """
+
+    def __init__(self, stages: List[Union[CascadeStage, Dict[str, Any]]], **kwargs):
+        super().__init__("Cascade")
+        if not stages:
+            raise ValueError("La cascada necesita al menos una etapa")
+        self.stages = [stage if isinstance(stage, CascadeStage) else CascadeStage(**stage) for stage in stages]
+        # Nombres únicos para que las estadísticas de cada etapa no se mezclen
+        seen: Dict[str, int] = collections.Counter(stage.name for stage in self.stages)
+        for index, stage in enumerate(self.stages):
+            if seen[stage.name] > 1:
+                stage.name = f"{stage.name}#{index}"
+        self.requests = 0
+        self.escalated_requests = 0
+        self._system = None
+
+    def bind(self, system) -> None:
+        """
+        Asocia la cascada a un sistema para resolver las etapas definidas por nombre
+
+        Args:
+            system: AgentSystem con los proveedores de las etapas
+        """
+        self._system = system
+
+    def _provider(self, stage: CascadeStage) -> Provider:
+        if not isinstance(stage.provider, str):
+            return stage.provider
+        provider = self._system.get_provider(stage.provider) if self._system is not None else None
+        if provider is None:
+            raise ValueError(f"Proveedor {stage.provider} de la etapa {stage.name} no disponible")
+        return provider
+
+    def _initialize_client(self) -> None:
+        for stage in self.stages:
+            if not isinstance(stage.provider, str):
+                stage.provider.start()
+        self._client = self
+
+    async def close(self) -> None:
+        # Los proveedores de las etapas pertenecen al sistema o a quien los creó
+        self.stop()
+
+    async def generate(self, prompt: str, **kwargs) -> Optional[str]:
+        response = await self.chat([{"role": "user", "content": prompt}], **kwargs)
+        return None if response.get("role") == "error" else response.get("content")
+
+    async def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """
+        Genera una respuesta escalando por la cascada cuando hace falta
+
+        Args:
+            messages: Lista de mensajes de la conversación
+            **kwargs: Parámetros adicionales (los de cada etapa tienen prioridad)
+
+        Returns:
+            dict: Respuesta de la etapa aceptada, con "cascade" indicando la
+            etapa, las etapas recorridas y la latencia de cada una
+        """
+        self.requests += 1
+        trace: List[Dict[str, Any]] = []
+        response: Dict[str, Any] = {}
+        for index, stage in enumerate(self.stages):
+            last = index == len(self.stages) - 1
+            start = time.monotonic()
+            try:
+                response = await self._provider(stage).chat(messages, **{**kwargs, **stage.params})
+            except Exception as e:
+                logger.error(f"Error en la etapa {stage.name} de la cascada: {e}")
+                response = {"content": f"Error: {e}", "role": "error", "finish_reason": "error"}
+            latency = time.monotonic() - start
+            stage.record(latency)
+            if response.get("role") == "error":
+                stage.errors += 1
+            # La última etapa no se valida: su respuesta es la definitiva
+            accepted = last or stage.accepts(response)
+            trace.append({"stage": stage.name, "latency": latency, "accepted": accepted})
+            if accepted:
+                stage.accepted += 1
+                break
+            stage.escalated += 1
+        if len(trace) > 1:
+            self.escalated_requests += 1
+        response = dict(response)
+        response["cascade"] = {"stage": trace[-1]["stage"], "escalations": len(trace) - 1, "stages": trace}
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas de la cascada
+
+        Returns:
+            dict: Peticiones, tasa de escalado y latencia y resultado por etapa
+        """
+        return {
+            "requests": self.requests,
+            "escalation_rate": self.escalated_requests / self.requests if self.requests else 0.0,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
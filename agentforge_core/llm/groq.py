@@ -0,0 +1,55 @@
+"""
+Proveedor para Groq
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from agentforge_core.llm.openai import OpenAIProvider
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+class GroqProvider(OpenAIProvider):
+    """
+    Proveedor para modelos servidos por Groq (API compatible con OpenAI)
+
+    Pensado como nivel de baja latencia: usa el cliente asíncrono con un
+    pool de conexiones persistentes compartido por todas las peticiones.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "llama-3.1-8b-instant", **kwargs):
+        super().__init__(api_key=api_key, model=model, **kwargs)
+        self.name = "Groq"
+
+    def _create_client(self, base_url: Optional[str], http_client: Any) -> Any:
+        """
+        Crea el cliente asíncrono de Groq sobre el pool de conexiones compartido
+        """
+        try:
+            import groq
+        except ImportError:
+            raise ImportError("Módulo 'groq' no encontrado. Instálalo con 'pip install groq'")
+        return groq.AsyncGroq(api_key=self.api_key, base_url=base_url, http_client=http_client)
+
+    def _usage(self, response: Any) -> Optional[Dict[str, Any]]:
+        """
+        Extrae el consumo de tokens y los tiempos de cola y cómputo de Groq
+
+        En streaming Groq envía el consumo en el campo x_groq de la última parte.
+        """
+        if getattr(response, "usage", None) is None:
+            response = getattr(response, "x_groq", None)
+        result = super()._usage(response)
+        if result is None:
+            return None
+
+        for key in ("queue_time", "prompt_time", "completion_time", "total_time"):
+            value = getattr(response.usage, key, None)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def _stream_params(self) -> Dict[str, Any]:
+        # Groq no acepta stream_options: el consumo llega en x_groq
+        return {"stream": True}
@@ -0,0 +1,146 @@
+"""
+Proveedores locales que no necesitan red ni clave API
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agentforge_core.context import record_usage
+from agentforge_core.llm.provider import Provider
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w{3,}", re.UNICODE)
+
+class HashingEmbedder(Provider):
+    """
+    Embedder determinista basado en feature hashing
+
+    Cada palabra de tres o más letras (en minúsculas) suma uno en una
+    posición del vector elegida con blake2b, y el resultado se normaliza a
+    norma 1. No tiene en cuenta el significado de las palabras, pero es
+    reproducible entre procesos y máquinas, lo que lo hace útil para pruebas
+    y enrutado léxico.
+
+    Attributes:
+        dim (int): Dimensión de los vectores
+    """
+
+    embedding_batch_size = 4096
+    embedding_concurrency = 1
+
+    def __init__(self, dim: int = 1024, **kwargs):
+        super().__init__("Hashing")
+        self.dim = dim
+
+    def _initialize_client(self) -> None:
+        # No hay cliente remoto que crear
+        self._client = self
+
+    async def _embed_batch(self, texts: List[str], **kwargs) -> Any:
+        """
+        Calcula los vectores de un lote de textos
+
+        Args:
+            texts: Lote de textos
+
+        Returns:
+            numpy.ndarray: Matriz float32 normalizada por filas
+        """
+        import numpy as np
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+                matrix[row, digest % self.dim] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+class EchoProvider(Provider):
+    """
+    Proveedor simulado que responde repitiendo el último mensaje del usuario
+
+    Pensado para pruebas locales del sistema completo (servidor, streaming,
+    cascadas...) sin red ni clave API. Simula la caché de prompts: si todos
+    los mensajes salvo el último (y las herramientas) coinciden con los de
+    una petición reciente, sus tokens se cuentan como "cached_tokens".
+
+    Attributes:
+        delay (float): Segundos de espera simulada por respuesta
+        prefix (str): Texto antepuesto a cada respuesta
+    """
+
+    def __init__(self, delay: float = 0.0, prefix: str = "echo: ", **kwargs):
+        super().__init__("Echo")
+        self.delay = delay
+        self.prefix = prefix
+        self._prefixes: "collections.OrderedDict[str, None]" = collections.OrderedDict()
+
+    def _initialize_client(self) -> None:
+        self._client = self
+
+    def _reply(self, messages: List[Dict[str, Any]]) -> str:
+        content = next((message.get("content") for message in reversed(messages)
+                        if message.get("role") == "user"), "")
+        return f"{self.prefix}{content or ''}"
+
+    def _cached_tokens(self, messages: List[Dict[str, Any]], tools: Any) -> int:
+        prefix = messages[:-1]
+        if not prefix:
+            return 0
+        key = hashlib.sha256(json.dumps([prefix, tools], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        if key in self._prefixes:
+            self._prefixes.move_to_end(key)
+            return sum(len(str(message.get("content") or "").split()) for message in prefix)
+        self._prefixes[key] = None
+        if len(self._prefixes) > 1024:
+            self._prefixes.popitem(last=False)
+        return 0
+
+    def _fake_usage(self, messages: List[Dict[str, Any]], reply: str, tools: Any = None) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(message.get("content") or "").split()) for message in messages)
+        completion_tokens = len(reply.split())
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cached_tokens": self._cached_tokens(messages, tools)
+        }
+
+    async def generate(self, prompt: str, **kwargs) -> Optional[str]:
+        response = await self.chat([{"role": "user", "content": prompt}], **kwargs)
+        return response["content"]
+
+    async def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        self._request_timeout()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        reply = self._reply(messages)
+        usage = self._fake_usage(messages, reply, kwargs.get("tools"))
+        record_usage(usage)
+        return {
+            "content": reply,
+            "role": "assistant",
+            "finish_reason": "stop",
+            "usage": usage
+        }
+
+    async def stream(self, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        self._request_timeout()
+        reply = self._reply(messages)
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay / len(words))
+            yield {"content": word if i == 0 else f" {word}"}
+        usage = self._fake_usage(messages, reply, kwargs.get("tools"))
+        record_usage(usage)
+        yield {"content": "", "finish_reason": "stop", "usage": usage}
@@ -2,10 +2,14 @@
 Proveedor para OpenAI
 """
 
+import asyncio
+import importlib.util
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
+from agentforge_core.context import DeadlineExceeded, record_usage
 from agentforge_core.llm.provider import Provider
 
 # Configurar logger
@@ -13,42 +17,177 @@ logger = logging.getLogger(__name__)
 
 class OpenAIProvider(Provider):
     """
-    Proveedor para modelos de OpenAI
+    Proveedor para modelos de OpenAI o servidores compatibles con su API
+    
+    Con base_url se puede apuntar a servidores de inferencia propios. Si se
+    indican varias réplicas, cada petición se envía a la que tenga menos
+    peticiones en curso (en caso de empate, por turno rotatorio).
+    
+    Attributes:
+        model (str): Modelo por defecto
+        base_urls (list): URLs base de las réplicas (vacía para la API de OpenAI)
+        http2 (bool): Usar HTTP/2 (requiere el paquete h2)
+        uds (str): Ruta de un socket Unix por el que enviar las peticiones
+        embedding_model (str): Modelo para embed()
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o", **kwargs):
+    # Límite de entradas por petición de la API de embeddings
+    embedding_batch_size = 2048
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o",
+                 base_url: Union[str, List[str], None] = None, http2: bool = False,
+                 max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, uds: Optional[str] = None,
+                 embedding_model: str = "text-embedding-3-small", **kwargs):
         super().__init__("OpenAI", api_key)
         self.model = model
+        self.embedding_model = embedding_model
+        self.base_urls: List[str] = [base_url] if isinstance(base_url, str) else list(base_url or [])
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.uds = uds
         self.extra_params = kwargs
+        self._clients: List[Any] = []
+        self._client_inflight: List[int] = []
+        self._next_client = 0
+        self._closing: List[asyncio.Task] = []
+        
+    @property
+    def base_url(self) -> Optional[str]:
+        """
+        URL base de la primera réplica o None para la API de OpenAI
+        """
+        return self.base_urls[0] if self.base_urls else None
         
     def _initialize_client(self) -> None:
         """
-        Inicializa el cliente de OpenAI
+        Inicializa un cliente de OpenAI por réplica, cada uno con su pool de conexiones
+        """
+        # Cliente asíncrono: cancelar la corrutina aborta la petición HTTP
+        # y devuelve la conexión al pool
+        clients = [
+            self._create_client(base_url, self._create_http_client())
+            for base_url in self.base_urls or [None]
+        ]
+        self._clients = clients
+        self._client_inflight = [0] * len(clients)
+        self._client = clients[0]
+        
+    def _create_http_client(self) -> Any:
+        """
+        Crea el cliente HTTP con los límites de conexiones y keep-alive configurados
+        
+        Sin el paquete h2 se usa HTTP/1.1 aunque se haya pedido HTTP/2.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("Módulo 'httpx' no encontrado. Instálalo con 'pip install httpx'")
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(f"Paquete 'h2' no encontrado: {self.name} usará HTTP/1.1."
+                           f" Instálalo con 'pip install httpx[http2]'")
+            self.http2 = False
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=limits, uds=self.uds)
+        return httpx.AsyncClient(transport=transport)
+        
+    def _create_client(self, base_url: Optional[str], http_client: Any) -> Any:
+        """
+        Crea el cliente de OpenAI para una réplica
+        
+        Args:
+            base_url: URL base de la réplica o None para la API de OpenAI
+            http_client: Cliente HTTP compartido por las peticiones a la réplica
         """
         try:
             # Importación real para OpenAI
             import openai
-            self._client = openai.OpenAI(api_key=self.api_key)
         except ImportError:
             raise ImportError("Módulo 'openai' no encontrado. Instálalo con 'pip install openai'")
+        # Los servidores propios no suelen exigir clave, pero el cliente necesita una
+        api_key = self.api_key or ("sin-clave" if base_url else None)
+        return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
         
-    async def generate(self, prompt: str, **kwargs) -> Optional[str]:
+    @asynccontextmanager
+    async def _lease_client(self) -> AsyncIterator[Any]:
         """
-        Genera una respuesta usando modelos de OpenAI
-    
-        Args:
-            prompt: Prompt para el modelo
-            **kwargs: Parámetros adicionales
-        
-        Returns:
-            str: Respuesta generada o None si hay error
+        Elige la réplica con menos peticiones en curso durante el bloque
         """
         if not self._client:
             self.start()
+        clients = self._clients
+        if not clients:
+            raise RuntimeError(f"El proveedor {self.name} no está inicializado")
+        inflight = self._client_inflight
+        count = len(clients)
+        start = self._next_client = (self._next_client + 1) % count
+        index = min(range(count), key=lambda i: (inflight[i], (i - start) % count))
+        inflight[index] += 1
+        try:
+            yield clients[index]
+        finally:
+            inflight[index] -= 1
+            
+    def stop(self) -> bool:
+        """
+        Cierra los clientes de OpenAI y sus pools de conexiones
+        
+        Desde el bucle de eventos el cierre se programa en segundo plano;
+        close() espera a que termine.
+        
+        Returns:
+            bool: True si se cerró correctamente
+        """
+        clients = self._clients
+        self._clients = []
+        super().stop()
+        if clients:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Sin bucle de eventos activo el pool se libera al recolectar el cliente
+                return True
+            # Guardar las tareas para que no se recolecten antes de terminar
+            self._closing.extend(loop.create_task(client.close()) for client in clients)
+        return True
+        
+    async def close(self) -> None:
+        """
+        Cierra los clientes de OpenAI esperando a que se liberen las conexiones
+        """
+        clients = self._clients
+        self._clients = []
+        super().stop()
+        closing, self._closing = self._closing, []
+        await asyncio.gather(*(client.close() for client in clients), *closing)
         
+    async def health_check(self) -> None:
+        """
+        Lista los modelos con cada réplica: valida la clave y abre las conexiones
+        
+        Raises:
+            Exception: Si alguna réplica no responde
+        """
+        if not self._clients:
+            raise RuntimeError(f"El proveedor {self.name} no está inicializado")
+        await asyncio.gather(*(client.models.list() for client in self._clients))
+        
+    def _build_params(self, messages: List[Dict[str, Any]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combina los parámetros por defecto con los de la llamada y el deadline
+        
+        Raises:
+            DeadlineExceeded: Si el deadline de la petición ya ha pasado
+        """
         params = {
             "model": kwargs.get("model", self.model),
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             **self.extra_params
         }
     
@@ -56,17 +195,72 @@ class OpenAIProvider(Provider):
         for key, value in kwargs.items():
             if key != "messages":  # Evitar conflicto con messages que ya se procesa
                 params[key] = value
+                
+        timeout = self._request_timeout(params.get("timeout"))
+        if timeout is not None:
+            params["timeout"] = timeout
+        return params
+        
+    def _usage(self, response: Any) -> Optional[Dict[str, Any]]:
+        """
+        Extrae el consumo de tokens de una respuesta o de la última parte de un stream
         
-        # Eliminar messages duplicado si está en kwargs
-        if "messages" in kwargs:
-            params["messages"] = kwargs["messages"]
+        Args:
+            response: Respuesta o parte del stream
+            
+        Returns:
+            dict: Tokens de prompt, de respuesta, totales y cacheados, o None
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        result = {
+            "prompt_tokens": usage.prompt_tokens or 0,
+            "completion_tokens": usage.completion_tokens or 0,
+            "total_tokens": usage.total_tokens or 0
+        }
+        # Los clientes que no conocen el campo (p. ej. el de Groq) lo dejan como dict
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            cached_tokens = details.get("cached_tokens")
+        else:
+            cached_tokens = getattr(details, "cached_tokens", None)
+        if cached_tokens is not None:
+            result["cached_tokens"] = cached_tokens
+        return result
+        
+    def _stream_params(self) -> Dict[str, Any]:
+        """
+        Parámetros adicionales para las peticiones en streaming
+        """
+        return {"stream": True, "stream_options": {"include_usage": True}}
+        
+    async def generate(self, prompt: str, **kwargs) -> Optional[str]:
+        """
+        Genera una respuesta usando modelos de OpenAI
+    
+        Args:
+            prompt: Prompt para el modelo
+            **kwargs: Parámetros adicionales
+        
+        Returns:
+            str: Respuesta generada o None si hay error
+        """
+        if not self._client:
+            self.start()
+        
+        try:
+            params = self._build_params(kwargs.get("messages", [{"role": "user", "content": prompt}]), kwargs)
+        except DeadlineExceeded as e:
+            logger.warning(f"Petición a {self.name} descartada: {e}")
+            return None
         
         try:
-            # La API de OpenAI ahora devuelve directamente el objeto, no requiere await
-            response = self._client.chat.completions.create(**params)
+            async with self._lease_client() as client:
+                response = await client.chat.completions.create(**params)
             return response.choices[0].message.content
         except Exception as e:
-            logger.error(f"Error generando respuesta con OpenAI: {e}")
+            logger.error(f"Error generando respuesta con {self.name}: {e}")
             return None
 
 
@@ -84,31 +278,239 @@ class OpenAIProvider(Provider):
         if not self._client:
             self.start()
         
-        params = {
-            "model": kwargs.get("model", self.model),
-            "messages": messages,
-            **self.extra_params
-        }
-    
-        # Actualizar con parámetros adicionales
-        for key, value in kwargs.items():
-            if key != "messages":  # Evitar conflicto con messages que ya se procesa
-                params[key] = value
-    
         try:
-            # La API de OpenAI ahora devuelve directamente el objeto, no requiere await
-            response = self._client.chat.completions.create(**params)
+            params = self._build_params(messages, kwargs)
+        except DeadlineExceeded as e:
+            logger.warning(f"Petición a {self.name} descartada: {e}")
             return {
+                "content": f"Error: {str(e)}",
+                "role": "error",
+                "finish_reason": "expired"
+            }
+    
+        try:
+            async with self._lease_client() as client:
+                response = await client.chat.completions.create(**params)
+            result = {
                 "content": response.choices[0].message.content,
                 "role": "assistant",
                 "finish_reason": response.choices[0].finish_reason,
+                "usage": self._usage(response),
                 "raw_response": json.loads(response.model_dump_json())
             }
+            record_usage(result["usage"])
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_calls:
+                result["tool_calls"] = [
+                    {
+                        "id": call.id,
+                        "type": "function",
+                        "function": {"name": call.function.name, "arguments": call.function.arguments}
+                    }
+                    for call in tool_calls
+                ]
+            return result
         except Exception as e:
-            logger.error(f"Error generando chat con OpenAI: {e}")
+            logger.error(f"Error generando chat con {self.name}: {e}")
             return {
                 "content": f"Error: {str(e)}",
                 "role": "error",
                 "finish_reason": "error"
             }
-
+            
+    async def stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera una respuesta en streaming a partir de una conversación
+        
+        Args:
+            messages: Lista de mensajes de la conversación
+            **kwargs: Parámetros adicionales
+            
+        Yields:
+            dict: Partes con el texto incremental en "content"; la última
+            incluye "finish_reason" y "usage"
+        """
+        if not self._client:
+            self.start()
+            
+        try:
+            params = self._build_params(messages, kwargs)
+        except DeadlineExceeded as e:
+            logger.warning(f"Petición a {self.name} descartada: {e}")
+            yield {"content": "", "finish_reason": "expired", "error": str(e)}
+            return
+        params.update(self._stream_params())
+        
+        finish_reason = None
+        usage = None
+        try:
+            async with self._lease_client() as client:
+                response = await client.chat.completions.create(**params)
+                try:
+                    async for chunk in response:
+                        usage = self._usage(chunk) or usage
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        finish_reason = choice.finish_reason or finish_reason
+                        if choice.delta is not None and choice.delta.content:
+                            yield {"content": choice.delta.content}
+                finally:
+                    await response.close()
+        except Exception as e:
+            logger.error(f"Error en streaming con {self.name}: {e}")
+            yield {"content": "", "finish_reason": "error", "error": str(e)}
+            return
+            
+        record_usage(usage)
+        yield {"content": "", "finish_reason": finish_reason, "usage": usage}
+        
+    async def _embed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Calcula los embeddings de un lote con la API de OpenAI
+        
+        Args:
+            texts: Lote de textos
+            **kwargs: Parámetros adicionales (p. ej. model o dimensions)
+            
+        Returns:
+            list: Un vector por texto, en el mismo orden
+        """
+        params = {"model": self.embedding_model, **kwargs, "input": texts}
+        timeout = self._request_timeout(params.get("timeout"))
+        if timeout is not None:
+            params["timeout"] = timeout
+        async with self._lease_client() as client:
+            response = await client.embeddings.create(**params)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        
+    # Estados de la API de lotes de OpenAI
+    _BATCH_STATUS = {
+        "validating": "in_progress",
+        "in_progress": "in_progress",
+        "finalizing": "in_progress",
+        "completed": "completed",
+        "failed": "failed",
+        "expired": "expired",
+        "cancelling": "cancelled",
+        "cancelled": "cancelled",
+    }
+        
+    async def create_batch(self, path: str) -> str:
+        """
+        Envía un lote a la API de lotes de OpenAI (/v1/batches)
+        
+        Las peticiones se convierten al formato de la API en un fichero junto
+        al original, que se sube con purpose="batch". El lote se procesa en
+        un plazo de 24 horas a mitad de precio y sin consumir los límites
+        de peticiones interactivas.
+        
+        Args:
+            path: Fichero JSONL con una petición por línea
+                {"custom_id", "messages", "params"}
+                
+        Returns:
+            str: ID del lote
+        """
+        upload_path = f"{path}.openai"
+        
+        def convert() -> None:
+            with open(path, "r", encoding="utf-8") as source, open(upload_path, "w", encoding="utf-8") as target:
+                for line in source:
+                    if not line.strip():
+                        continue
+                    request = json.loads(line)
+                    body = {"model": self.model, **self.extra_params, **request.get("params", {}),
+                            "messages": request["messages"]}
+                    target.write(json.dumps({"custom_id": request["custom_id"], "method": "POST",
+                                             "url": "/v1/chat/completions", "body": body}) + "\n")
+                    
+        await asyncio.to_thread(convert)
+        async with self._lease_client() as client:
+            with open(upload_path, "rb") as f:
+                uploaded = await client.files.create(file=f, purpose="batch")
+            batch = await client.batches.create(input_file_id=uploaded.id, endpoint="/v1/chat/completions",
+                                                completion_window="24h")
+        return batch.id
+        
+    async def batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Consulta el estado de un lote de la API de OpenAI
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+            
+        Returns:
+            dict: "status", peticiones terminadas ("completed") y totales ("total")
+        """
+        try:
+            import openai
+        except ImportError:
+            raise ImportError("Módulo 'openai' no encontrado. Instálalo con 'pip install openai'")
+        try:
+            async with self._lease_client() as client:
+                batch = await client.batches.retrieve(batch_id)
+        except openai.NotFoundError:
+            return {"status": "unknown"}
+        counts = batch.request_counts
+        return {
+            "status": self._BATCH_STATUS.get(batch.status, "in_progress"),
+            "completed": (counts.completed + counts.failed) if counts else 0,
+            "total": counts.total if counts else None,
+        }
+        
+    async def batch_results(self, batch_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Descarga los resultados y errores de un lote de la API de OpenAI
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+            
+        Yields:
+            dict: {"custom_id", "response"} o {"custom_id", "error"}
+        """
+        async with self._lease_client() as client:
+            batch = await client.batches.retrieve(batch_id)
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                content = await client.files.content(file_id)
+                for line in content.text.splitlines():
+                    if line.strip():
+                        yield self._batch_line(json.loads(line))
+                        
+    def _batch_line(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convierte una línea de resultados de la API al formato de chat()
+        """
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            return {"custom_id": line["custom_id"], "error": error.get("message") or str(error)}
+        choice = body["choices"][0]
+        usage = body.get("usage") or {}
+        result = {
+            "content": choice["message"].get("content"),
+            "role": "assistant",
+            "finish_reason": choice.get("finish_reason"),
+            "usage": {
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0)
+            },
+            "raw_response": body
+        }
+        if choice["message"].get("tool_calls"):
+            result["tool_calls"] = choice["message"]["tool_calls"]
+        return {"custom_id": line["custom_id"], "response": result}
+        
+    async def cancel_batch(self, batch_id: str) -> None:
+        """
+        Cancela un lote de la API de OpenAI
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+        """
+        async with self._lease_client() as client:
+            await client.batches.cancel(batch_id)
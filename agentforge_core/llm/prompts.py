@@ -0,0 +1,185 @@
+"""
+Plantillas de prompt precompiladas con prefijo estable para la caché de prompts
+
+Los proveedores (OpenAI, Anthropic, servidores vLLM...) reutilizan el
+cálculo de la parte inicial de un prompt si es idéntica byte a byte a la de
+una petición reciente. Por eso las partes fijas (prompt de sistema, rol,
+definiciones de herramientas) van siempre primero y el contenido variable
+al final.
+
+Una PromptTemplate se analiza una sola vez al crearla. bind() sustituye los
+valores fijos (rol, nombre...) y construye el prefijo, que ya no cambia;
+render() solo añade el historial y el mensaje del usuario.
+"""
+
+import copy
+import hashlib
+import json
+import string
+from typing import Any, Dict, List, Optional, Tuple
+
+# Segmento compilado: (texto literal, campo, conversión, formato)
+Segment = Tuple[str, Optional[str], Optional[str], str]
+
+def compile_format(text: str) -> List[Segment]:
+    """
+    Analiza una cadena de formato (sintaxis de str.format) una sola vez
+
+    Args:
+        text: Cadena con campos {nombre}, {nombre!r} o {nombre:formato}
+
+    Returns:
+        list: Segmentos (literal, campo, conversión, formato)
+    """
+    segments = []
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        if field is not None and (not field.isidentifier()):
+            raise ValueError(f"Campo de plantilla no soportado: {{{field}}} (solo nombres simples)")
+        if spec and "{" in spec:
+            raise ValueError(f"Formato anidado no soportado en {{{field}:{spec}}}")
+        segments.append((literal, field, conversion, spec or ""))
+    return segments
+
+def _fields(segments: List[Segment]) -> List[str]:
+    return list(dict.fromkeys(field for _, field, _, _ in segments if field is not None))
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+def render_segments(segments: List[Segment], values: Dict[str, Any], template: str = "") -> str:
+    """
+    Rellena una cadena compilada con compile_format
+
+    Args:
+        segments: Segmentos compilados
+        values: Valores de los campos
+        template: Nombre de la plantilla (para los mensajes de error)
+
+    Returns:
+        str: Texto resultante
+    """
+    parts = []
+    for literal, field, conversion, spec in segments:
+        parts.append(literal)
+        if field is None:
+            continue
+        try:
+            value = values[field]
+        except KeyError:
+            raise ValueError(f"Falta el valor {field} para la plantilla {template}") from None
+        if conversion:
+            value = _CONVERSIONS[conversion](value)
+        parts.append(format(value, spec) if spec else str(value))
+    return "".join(parts)
+
+class PromptTemplate:
+    """
+    Plantilla de prompt: parte fija (sistema) y parte variable (usuario)
+
+    Los campos del prompt de sistema se rellenan una vez en bind() (p. ej.
+    {role}); los del mensaje de usuario en cada render() (p. ej. {content}).
+
+    Attributes:
+        name (str): Nombre de la plantilla
+        system (str): Prompt de sistema (parte fija)
+        user (str): Mensaje del usuario (parte variable)
+        static_fields (list): Campos que hay que indicar en bind()
+        fields (list): Campos que hay que indicar en render()
+    """
+
+    def __init__(self, system: str = "", user: str = "{content}", name: Optional[str] = None):
+        self.name = name or "prompt"
+        self.system = system
+        self.user = user
+        self._system_segments = compile_format(system)
+        self._user_segments = compile_format(user)
+        self.static_fields = _fields(self._system_segments)
+        self.fields = _fields(self._user_segments)
+
+    def bind(self, tools: Optional[List[Dict[str, Any]]] = None, **static) -> "BoundPrompt":
+        """
+        Fija los valores estáticos y construye el prefijo del prompt
+
+        Args:
+            tools: Definiciones de herramientas (formato de la API de chat);
+                se ordenan por nombre para que el prefijo no dependa del
+                orden de registro
+            **static: Valores de los campos del prompt de sistema
+
+        Returns:
+            BoundPrompt: Prompt listo para render()
+        """
+        return BoundPrompt(self, render_segments(self._system_segments, static, self.name), tools)
+
+class BoundPrompt:
+    """
+    Prompt con la parte fija ya construida y estadísticas de caché
+
+    El prefijo (mensaje de sistema y herramientas) se construye una vez y
+    se reutiliza en todas las peticiones, así que es idéntico byte a byte.
+
+    Attributes:
+        template (PromptTemplate): Plantilla de origen
+        prefix (list): Mensajes fijos del principio de la conversación
+        tools (list): Definiciones de herramientas ordenadas por nombre (None si no hay)
+        prefix_hash (str): Huella del prefijo y las herramientas
+    """
+
+    def __init__(self, template: PromptTemplate, system: str, tools: Optional[List[Dict[str, Any]]] = None):
+        self.template = template
+        self.prefix: List[Dict[str, Any]] = [{"role": "system", "content": system}] if system else []
+        self.tools = None
+        if tools:
+            self.tools = sorted(copy.deepcopy(tools), key=lambda tool: tool.get("function", {}).get("name", ""))
+        fingerprint = json.dumps([self.prefix, self.tools], sort_keys=True, ensure_ascii=False)
+        self.prefix_hash = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+        self.requests = 0
+        self.reported = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def render(self, values: Optional[Dict[str, Any]] = None,
+               history: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Construye la conversación: prefijo fijo, historial y mensaje del usuario
+
+        Args:
+            values: Valores de los campos del mensaje de usuario
+            history: Mensajes anteriores de la conversación
+
+        Returns:
+            list: Mensajes para provider.chat
+        """
+        user = render_segments(self.template._user_segments, values or {}, self.template.name)
+        return [*self.prefix, *(history or ()), {"role": "user", "content": user}]
+
+    def observe(self, usage: Optional[Dict[str, Any]]) -> None:
+        """
+        Registra el consumo de una respuesta para calcular la tasa de acierto de caché
+
+        Args:
+            usage: Campo "usage" de la respuesta del proveedor
+        """
+        self.requests += 1
+        if not usage or "cached_tokens" not in usage:
+            return
+        self.reported += 1
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.cached_tokens += usage.get("cached_tokens") or 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas de caché del prompt
+
+        Returns:
+            dict: Peticiones, tokens de prompt y cacheados (de las respuestas
+            que informan de ellos) y tasa de acierto (cacheados / prompt)
+        """
+        return {
+            "template": self.template.name,
+            "prefix_hash": self.prefix_hash,
+            "requests": self.requests,
+            "reported": self.reported,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "hit_rate": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else None,
+        }
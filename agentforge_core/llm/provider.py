@@ -2,8 +2,13 @@
 Clase base para proveedores de LLM
 """
 
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+from agentforge_core.context import DeadlineExceeded, remaining_time
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -15,12 +20,24 @@ class Provider:
     Attributes:
         name (str): Nombre del proveedor
         api_key (str): Clave API para el proveedor
+        embedding_batch_size (int): Máximo de textos por petición de embeddings
+        embedding_concurrency (int): Peticiones de embeddings simultáneas
+        batch_max_requests (int): Máximo de peticiones por lote de create_batch
+        batch_max_bytes (int): Tamaño máximo del fichero de un lote
+        batch_concurrency (int): Peticiones simultáneas de los lotes locales
     """
     
+    embedding_batch_size = 256
+    embedding_concurrency = 4
+    batch_max_requests = 50000
+    batch_max_bytes = 100 * 1024 * 1024
+    batch_concurrency = 8
+    
     def __init__(self, name: str, api_key: Optional[str] = None):
         self.name = name
         self.api_key = api_key
         self._client = None
+        self._local_batches: Dict[str, Dict[str, Any]] = {}
         
     def start(self) -> bool:
         """
@@ -51,6 +68,44 @@ class Provider:
         logger.info(f"Proveedor {self.name} detenido")
         return True
         
+    async def close(self) -> None:
+        """
+        Cierra el cliente del proveedor esperando a liberar sus conexiones
+        """
+        self.stop()
+        
+    async def health_check(self) -> None:
+        """
+        Comprueba que el proveedor responde con una petición barata
+        
+        Por defecto no hace nada; los proveedores remotos la usan para
+        validar la clave y dejar abiertas las conexiones antes de recibir
+        tráfico.
+        
+        Raises:
+            Exception: Si el proveedor no responde
+        """
+        
+    def _request_timeout(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Calcula el timeout de una petición a partir del deadline actual
+        
+        Args:
+            timeout: Timeout configurado explícitamente o None
+            
+        Returns:
+            float: Timeout efectivo en segundos o None si no hay límite
+            
+        Raises:
+            DeadlineExceeded: Si el deadline de la petición ya ha pasado
+        """
+        remaining = remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline superado antes de llamar a {self.name}")
+        return remaining if timeout is None else min(timeout, remaining)
+        
     def _initialize_client(self) -> None:
         """
         Inicializa el cliente del proveedor (a implementar por subclases)
@@ -82,3 +137,199 @@ class Provider:
             dict: Respuesta generada
         """
         raise NotImplementedError("Los proveedores deben implementar chat")
+        
+    async def stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Genera una respuesta en streaming a partir de una conversación
+        
+        Por defecto devuelve la respuesta de chat completa en una sola parte.
+        
+        Args:
+            messages: Lista de mensajes de la conversación
+            **kwargs: Parámetros adicionales
+            
+        Yields:
+            dict: Partes con el texto incremental en "content"; la última
+            incluye "finish_reason" y "usage"
+        """
+        response = await self.chat(messages, **kwargs)
+        yield {
+            "content": response.get("content") or "",
+            "finish_reason": response.get("finish_reason"),
+            "usage": response.get("usage")
+        }
+        
+    async def chat_prompt(self, prompt, values: Optional[Dict[str, Any]] = None,
+                          history: Optional[List[Dict[str, Any]]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Genera una respuesta a partir de un prompt precompilado
+        
+        El prefijo fijo del prompt (sistema y herramientas) va siempre
+        primero, así que el proveedor puede reutilizarlo de su caché; los
+        tokens cacheados de cada respuesta se suman a las estadísticas del
+        prompt.
+        
+        Args:
+            prompt: BoundPrompt (ver PromptTemplate.bind o Agent.bound_prompt)
+            values: Valores de los campos del mensaje de usuario
+            history: Mensajes anteriores de la conversación
+            **kwargs: Parámetros adicionales
+            
+        Returns:
+            dict: Respuesta generada
+        """
+        if prompt.tools:
+            kwargs.setdefault("tools", prompt.tools)
+        response = await self.chat(prompt.render(values, history), **kwargs)
+        prompt.observe(response.get("usage"))
+        return response
+        
+    async def embed(self, texts: Sequence[str], store=None, **kwargs):
+        """
+        Calcula los embeddings de una lista de textos
+        
+        Los textos se agrupan en lotes de embedding_batch_size que se envían
+        en paralelo. Si se indica un VectorStore, los textos ya calculados se
+        leen de él sin llamar a la API y los nuevos se guardan (la lectura y
+        escritura del almacén se hacen en un hilo para no bloquear el bucle).
+        
+        Args:
+            texts: Textos a convertir
+            store: VectorStore opcional que actúa como caché compartida
+            **kwargs: Parámetros adicionales para el proveedor
+            
+        Returns:
+            numpy.ndarray: Matriz float32 de forma (len(texts), dimensión)
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Módulo 'numpy' no encontrado. Instálalo con 'pip install numpy'")
+            
+        texts = list(texts)
+        if store is not None:
+            result, missing = await asyncio.to_thread(store.get_many, texts)
+        else:
+            result, missing = None, list(range(len(texts)))
+        if not missing:
+            return result if result is not None else np.zeros((0, 0), dtype=np.float32)
+            
+        # Cada texto distinto se calcula una sola vez
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        size = self.embedding_batch_size
+        semaphore = asyncio.Semaphore(self.embedding_concurrency)
+        
+        async def run(batch: List[str]):
+            async with semaphore:
+                return np.asarray(await self._embed_batch(batch, **kwargs), dtype=np.float32)
+                
+        parts = await asyncio.gather(*(run(unique[i:i + size]) for i in range(0, len(unique), size)))
+        vectors = np.concatenate(parts)
+        
+        if result is None:
+            result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        position = {text: i for i, text in enumerate(unique)}
+        result[missing] = vectors[[position[texts[i]] for i in missing]]
+        
+        if store is not None:
+            await asyncio.to_thread(store.put_many, unique, vectors)
+        return result
+        
+    async def _embed_batch(self, texts: List[str], **kwargs) -> Any:
+        """
+        Calcula los embeddings de un lote (a implementar por subclases)
+        
+        Args:
+            texts: Lote de textos (como máximo embedding_batch_size)
+            **kwargs: Parámetros adicionales
+            
+        Returns:
+            Lista de vectores o matriz con una fila por texto
+        """
+        raise NotImplementedError(f"El proveedor {self.name} no soporta embeddings")
+        
+    async def create_batch(self, path: str) -> str:
+        """
+        Envía un lote de peticiones de chat para procesarlas en diferido
+        
+        Por defecto el lote se procesa en local llamando a chat() con como
+        mucho batch_concurrency peticiones a la vez; sirve para pruebas y
+        para proveedores sin API de lotes. El estado se guarda en memoria,
+        así que tras reiniciar el proceso batch_status devuelve "unknown".
+        
+        Args:
+            path: Fichero JSONL con una petición por línea
+                {"custom_id", "messages", "params"}
+                
+        Returns:
+            str: ID del lote
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch_id = f"local-{uuid.uuid4().hex}"
+        batch = {"status": "in_progress", "total": len(requests), "results": []}
+        batch["task"] = asyncio.create_task(self._run_local_batch(batch, requests))
+        self._local_batches[batch_id] = batch
+        return batch_id
+        
+    async def _run_local_batch(self, batch: Dict[str, Any], requests: List[Dict[str, Any]]) -> None:
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        
+        async def run(request: Dict[str, Any]) -> None:
+            async with semaphore:
+                try:
+                    response = await self.chat(request["messages"], **request.get("params", {}))
+                    batch["results"].append({"custom_id": request["custom_id"], "response": response})
+                except Exception as e:
+                    batch["results"].append({"custom_id": request["custom_id"], "error": str(e)})
+                    
+        try:
+            await asyncio.gather(*(run(request) for request in requests))
+            batch["status"] = "completed"
+        except asyncio.CancelledError:
+            batch["status"] = "cancelled"
+            
+    async def batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Consulta el estado de un lote
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+            
+        Returns:
+            dict: "status" ("in_progress", "completed", "failed", "expired",
+            "cancelled" o "unknown" si el proveedor no conoce el lote),
+            peticiones terminadas ("completed") y totales ("total")
+        """
+        batch = self._local_batches.get(batch_id)
+        if batch is None:
+            return {"status": "unknown"}
+        return {"status": batch["status"], "completed": len(batch["results"]), "total": batch["total"]}
+        
+    async def batch_results(self, batch_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Devuelve los resultados de un lote terminado
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+            
+        Yields:
+            dict: {"custom_id", "response"} con la respuesta en el formato de
+            chat() o {"custom_id", "error"} si la petición falló
+        """
+        batch = self._local_batches.pop(batch_id, None)
+        if batch is None:
+            raise KeyError(f"Lote {batch_id} desconocido")
+        for result in batch["results"]:
+            yield result
+            
+    async def cancel_batch(self, batch_id: str) -> None:
+        """
+        Cancela un lote en curso
+        
+        Args:
+            batch_id: ID devuelto por create_batch
+        """
+        batch = self._local_batches.get(batch_id)
+        if batch is not None:
+            batch["task"].cancel()
@@ -0,0 +1,188 @@
+"""
+Almacén de embeddings en disco compartido entre procesos
+
+Estructura del directorio:
+    meta.json    dimensión y espacio de nombres (modelo) del almacén
+    vectors.f32  matriz float32 fila a fila, sin cabecera
+    keys.bin     hash blake2b de 16 bytes del texto de cada fila
+
+Los ficheros solo crecen por el final. Cada escritor añade primero los
+vectores y después las claves bajo un cerrojo de fichero, así que un lector
+que ve una clave siempre encuentra su vector completo; antes de escribir se
+descartan los restos de un escritor interrumpido (vectores sin clave o una
+clave a medias). Los vectores se leen con numpy.memmap, de forma que varios
+procesos comparten las mismas páginas del sistema operativo sin cargar el
+almacén entero en memoria.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin cerrojo entre procesos
+    fcntl = None
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_KEY_SIZE = 16
+
+class VectorStore:
+    """
+    Caché de embeddings indexada por el hash del contenido
+
+    Attributes:
+        path (str): Directorio del almacén
+        dim (int): Dimensión de los vectores
+        namespace (str): Identificador del modelo que generó los vectores
+    """
+
+    def __init__(self, path: str, dim: int, namespace: str = ""):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Módulo 'numpy' no encontrado. Instálalo con 'pip install numpy'")
+        self._np = np
+        self.path = path
+        self.dim = dim
+        self.namespace = namespace
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._lock_path = os.path.join(path, ".lock")
+        self._index: Dict[bytes, int] = {}
+        self._keys_read = 0
+        self._matrix = None
+        # El cerrojo de fichero no protege el índice en memoria entre hilos
+        self._thread_lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        with self._locked():
+            meta_path = os.path.join(path, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("dim") != dim or meta.get("namespace", "") != namespace:
+                    raise ValueError(
+                        f"El almacén {path} contiene vectores de dimensión {meta.get('dim')} "
+                        f"({meta.get('namespace')!r}), no {dim} ({namespace!r})"
+                    )
+            else:
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": dim, "namespace": namespace}, f)
+                open(self._vectors_path, "ab").close()
+                open(self._keys_path, "ab").close()
+        self.refresh()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=_KEY_SIZE).digest()
+
+    def refresh(self) -> None:
+        """
+        Incorpora las filas añadidas por otros procesos desde la última lectura
+        """
+        with self._thread_lock:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._keys_read * _KEY_SIZE)
+                data = f.read()
+            count = len(data) // _KEY_SIZE
+            if count == 0 and self._matrix is not None:
+                return
+            for i in range(count):
+                self._index.setdefault(data[i * _KEY_SIZE:(i + 1) * _KEY_SIZE], self._keys_read + i)
+            self._keys_read += count
+            if self._keys_read:
+                self._matrix = self._np.memmap(self._vectors_path, dtype=self._np.float32, mode="r",
+                                               shape=(self._keys_read, self.dim))
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[object, List[int]]:
+        """
+        Busca los vectores de varios textos
+
+        Args:
+            texts: Textos a buscar
+
+        Returns:
+            tuple: (matriz float32 con una fila por texto, índices de los
+            textos que no están en el almacén; sus filas quedan a cero)
+        """
+        np = self._np
+        keys = [self._key(text) for text in texts]
+        with self._thread_lock:
+            if any(key not in self._index for key in keys):
+                self.refresh()
+            rows = [self._index.get(key, -1) for key in keys]
+            matrix = self._matrix
+        missing = [i for i, row in enumerate(rows) if row < 0]
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        found = [i for i, row in enumerate(rows) if row >= 0]
+        if found:
+            result[found] = matrix[[rows[i] for i in found]]
+        return result, missing
+
+    def put_many(self, texts: Sequence[str], vectors) -> int:
+        """
+        Guarda los vectores de varios textos
+
+        Args:
+            texts: Textos
+            vectors: Matriz con una fila por texto
+
+        Returns:
+            int: Número de filas nuevas escritas
+        """
+        np = self._np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape != (len(texts), self.dim):
+            raise ValueError(f"Se esperaba una matriz de forma ({len(texts)}, {self.dim})")
+
+        with self._thread_lock, self._locked():
+            self.refresh()
+            pending: Dict[bytes, int] = {}
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                if key not in self._index:
+                    pending.setdefault(key, i)
+            if not pending:
+                return 0
+            # Tras un fallo a medias puede haber vectores sin clave: se descartan
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(self._keys_read * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors[list(pending.values())].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            # Y una clave escrita a medias desalinearía todas las siguientes
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(self._keys_read * _KEY_SIZE)
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(pending))
+                f.flush()
+            self.refresh()
+        return len(pending)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._keys_read
+
+    def __contains__(self, text: str) -> bool:
+        key = self._key(text)
+        if key not in self._index:
+            self.refresh()
+        return key in self._index
@@ -0,0 +1,276 @@
+"""
+Mensajes y resultados inmutables con serialización binaria
+
+Message y Result son alternativas opcionales a los diccionarios: tienen
+campos tipados y __slots__, no pueden modificarse y por eso pueden
+compartirse entre agentes sin copiarlos (copy() devuelve el mismo objeto).
+Se comportan como un Mapping de solo lectura (message["content"],
+message.get("priority"), {**message}, dict(message)), así que los
+processors que solo leen el mensaje funcionan sin cambios; los que lo
+modifican deben trabajar sobre dict(message) o crear otro con evolve().
+
+pack() y unpack() los serializan con msgpack conservando su tipo.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+def _field(name: str) -> property:
+    return property(lambda self: self._data.get(name), doc=f"Campo {name} (None si no está)")
+
+class _Envelope(Mapping):
+    """
+    Base de Message y Result: un diccionario privado que nunca se modifica
+    tras construir el objeto
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, **fields: Any):
+        object.__setattr__(self, "_data", {key: value for key, value in fields.items() if value is not None})
+
+    @classmethod
+    def _wrap(cls, data: Dict[str, Any]) -> "_Envelope":
+        # Sin copiar: solo para diccionarios que nadie más conserva
+        envelope = object.__new__(cls)
+        object.__setattr__(envelope, "_data", data)
+        return envelope
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} es inmutable; usa evolve()")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} es inmutable; usa evolve()")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _Envelope):
+            return type(self) is type(other) and self._data == other._data
+        if isinstance(other, Mapping):
+            return self._data == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{key}={value!r}' for key, value in self._data.items())})"
+
+    def __reduce__(self):
+        return (type(self)._wrap, (dict(self._data),))
+
+    def copy(self) -> "_Envelope":
+        """
+        Devuelve el propio objeto: al ser inmutable no hace falta copiarlo
+        """
+        return self
+
+    def evolve(self, **changes: Any) -> "_Envelope":
+        """
+        Crea una copia con algunos campos cambiados
+
+        Args:
+            **changes: Campos a cambiar (None elimina el campo)
+
+        Returns:
+            Nuevo objeto del mismo tipo
+        """
+        data = {**self._data, **changes}
+        return type(self)._wrap({key: value for key, value in data.items() if value is not None})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte el objeto en un diccionario nuevo
+
+        Returns:
+            dict: Campos con valor
+        """
+        return dict(self._data)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "_Envelope":
+        """
+        Crea un objeto a partir de un diccionario (o devuelve el mismo si ya lo es)
+
+        Args:
+            data: Diccionario con los campos
+
+        Returns:
+            Objeto del tipo de la clase
+        """
+        if type(data) is cls:
+            return data
+        return cls._wrap({key: value for key, value in data.items() if value is not None})
+
+class Message(_Envelope):
+    """
+    Mensaje inmutable para enviar a los agentes
+
+    Los campos habituales tienen atributo propio; el resto se pasan como
+    argumentos con nombre y se leen como claves (message["history"]).
+
+    Attributes:
+        content: Contenido del mensaje
+        role (str): Rol del emisor ("user", "assistant"...)
+        sender (str): ID del agente o cliente que envía el mensaje
+        priority (int): Prioridad en el planificador
+        deadline (float): Deadline absoluto (epoch en segundos)
+        tenant (str): Tenant al que se atribuye la petición
+    """
+
+    __slots__ = ()
+
+    def __init__(self, content: Any = None, role: Optional[str] = None, sender: Optional[str] = None,
+                 priority: Optional[int] = None, deadline: Optional[float] = None,
+                 tenant: Optional[str] = None, **extra: Any):
+        # extra es un diccionario nuevo en cada llamada: se usa directamente
+        if content is not None:
+            extra["content"] = content
+        if role is not None:
+            extra["role"] = role
+        if sender is not None:
+            extra["sender"] = sender
+        if priority is not None:
+            extra["priority"] = priority
+        if deadline is not None:
+            extra["deadline"] = deadline
+        if tenant is not None:
+            extra["tenant"] = tenant
+        object.__setattr__(self, "_data", extra)
+
+    content = _field("content")
+    role = _field("role")
+    sender = _field("sender")
+    priority = _field("priority")
+    deadline = _field("deadline")
+    tenant = _field("tenant")
+
+class Result(_Envelope):
+    """
+    Resultado inmutable devuelto por un agente
+
+    Attributes:
+        status (str): Estado ("success", "error", "timeout"...)
+        agent (str): ID del agente que lo produjo
+        content: Contenido de la respuesta
+        response: Respuesta del processor (formato de CustomAgent)
+        error (str): Descripción del error
+    """
+
+    __slots__ = ()
+
+    def __init__(self, status: Optional[str] = None, agent: Optional[str] = None, content: Any = None,
+                 response: Any = None, error: Optional[str] = None, **extra: Any):
+        if status is not None:
+            extra["status"] = status
+        if agent is not None:
+            extra["agent"] = agent
+        if content is not None:
+            extra["content"] = content
+        if response is not None:
+            extra["response"] = response
+        if error is not None:
+            extra["error"] = error
+        object.__setattr__(self, "_data", extra)
+
+    status = _field("status")
+    agent = _field("agent")
+    content = _field("content")
+    response = _field("response")
+    error = _field("error")
+
+def to_builtin(value: Any) -> Any:
+    """
+    Función default para json.dumps: convierte mensajes y resultados en dict
+
+    Args:
+        value: Objeto que json no sabe serializar
+
+    Returns:
+        dict para los Mapping y los modelos de pydantic, texto para el resto
+    """
+    if isinstance(value, _Envelope):
+        return value._data
+    if isinstance(value, Mapping):
+        return dict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+# Tipos de extensión de msgpack
+_EXT_TYPES = {Message: 1, Result: 2}
+_EXT_CLASSES = {code: cls for cls, code in _EXT_TYPES.items()}
+
+_msgpack_module = None
+
+def _msgpack():
+    global _msgpack_module
+    if _msgpack_module is None:
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("Módulo 'msgpack' no encontrado. Instálalo con 'pip install msgpack'")
+        _msgpack_module = msgpack
+    return _msgpack_module
+
+def _default(value: Any) -> Any:
+    msgpack = _msgpack()
+    code = _EXT_TYPES.get(type(value))
+    if code is not None:
+        return msgpack.ExtType(code, msgpack.packb(value._data, default=_default, use_bin_type=True))
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    cls = _EXT_CLASSES.get(code)
+    if cls is None:
+        return _msgpack().ExtType(code, data)
+    return cls._wrap(unpack(data))
+
+def pack(value: Any) -> bytes:
+    """
+    Serializa un valor en binario (msgpack) conservando Message y Result
+
+    Args:
+        value: Valor a serializar
+
+    Returns:
+        bytes: Datos serializados
+    """
+    msgpack = _msgpack()
+    code = _EXT_TYPES.get(type(value))
+    if code is not None:
+        # Camino rápido para el caso habitual (un Message o Result suelto):
+        # evita pasar por default desde dentro del empaquetador
+        value = msgpack.ExtType(code, msgpack.packb(value._data, default=_default, use_bin_type=True))
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+def unpack(data: bytes) -> Any:
+    """
+    Deserializa datos obtenidos con pack()
+
+    Args:
+        data: Datos serializados
+
+    Returns:
+        Valor deserializado
+    """
+    return _msgpack().unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
@@ -0,0 +1,7 @@
+"""
+Servidor HTTP (ASGI) para exponer un AgentSystem
+"""
+
+from agentforge_core.server.app import AgentApp, create_app
+
+__all__ = ["AgentApp", "create_app"]
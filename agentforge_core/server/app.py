@@ -0,0 +1,302 @@
+"""
+Aplicación ASGI que expone un AgentSystem por HTTP
+
+Rutas:
+    GET  /health                        Estado del sistema
+    GET  /ready                         Informe de disponibilidad (503 si no está listo)
+    GET  /metrics                       Métricas de carga (get_metrics)
+    GET  /agents                        Agentes registrados
+    POST /agents/{agent_id}/messages    process_message (cuerpo: mensaje JSON)
+    POST /agents/{agent_id}/stream      stream_message con Server-Sent Events
+    POST /broadcast                     broadcast_message (?agents=a,b para filtrar)
+
+Las opciones priority, timeout y deadline se leen de la query string. No
+depende de ningún framework web: funciona con cualquier servidor ASGI
+(uvicorn, hypercorn...).
+"""
+
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+
+from agentforge_core.agent.system import AgentSystem
+from agentforge_core.message import to_builtin
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+_AGENT_ROUTE = re.compile(r"^/agents/([^/]+)/(messages|stream)$")
+
+_STATUS_CODES = {
+    "success": 200,
+    "error": 500,
+    "timeout": 504,
+    "expired": 504,
+    "cancelled": 499,
+    "overloaded": 503,
+    "quota_exceeded": 429,
+}
+
+class HTTPError(Exception):
+    """
+    Error que se devuelve al cliente con un código HTTP
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class AgentApp:
+    """
+    Aplicación ASGI sobre un AgentSystem compartido por todas las peticiones
+
+    Al recibir el evento de apagado (lifespan) deja de aceptar peticiones
+    nuevas, espera a que terminen las que están en curso y después detiene
+    el sistema y cierra las conexiones de los proveedores.
+
+    Attributes:
+        system (AgentSystem): Sistema expuesto
+        drain_timeout (float): Tiempo máximo de espera de las peticiones en curso al apagar
+        manager (ConfigManager): Gestor de configuración opcional (para recarga en caliente)
+        probe (bool): Comprobar que los proveedores responden al arrancar
+    """
+
+    def __init__(self, system: AgentSystem, drain_timeout: float = 30.0, manager=None,
+                 watch_interval: Optional[float] = None, probe: bool = False):
+        self.system = system
+        self.drain_timeout = drain_timeout
+        self.probe = probe
+        self.manager = manager
+        self.watch_interval = watch_interval
+        self.draining = False
+        self._watch_task: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[[], Awaitable[Dict[str, Any]]],
+                       send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Tipo de conexión no soportado: {scope['type']}")
+
+    async def startup(self) -> None:
+        """
+        Arranca el sistema (y la vigilancia de la configuración si procede)
+        """
+        self.draining = False
+        if not self.system.running:
+            await self.system.start(probe=self.probe)
+        if self.manager is not None and self.watch_interval and self.manager.source is not None:
+            self._watch_task = asyncio.create_task(self.manager.watch(self.watch_interval))
+        logger.info(f"Servidor HTTP del nodo {self.system.node_id} listo")
+
+    async def shutdown(self) -> None:
+        """
+        Vacía las peticiones en curso y detiene el sistema
+        """
+        self.draining = True
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+        await self.system.stop(drain_timeout=self.drain_timeout)
+        await self.system.disconnect_nodes()
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send) -> None:
+        try:
+            if self.draining:
+                raise HTTPError(503, "Servidor apagándose")
+            handler, args = self._route(scope["method"], scope["path"])
+            query = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+            body = await self._read_body(receive) if scope["method"] == "POST" else None
+            await handler(send, receive, query, body, *args)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"status": "error", "error": str(e)})
+        except Exception as e:
+            logger.error(f"Error atendiendo {scope['method']} {scope['path']}: {e}")
+            await self._send_json(send, 500, {"status": "error", "error": str(e)})
+
+    def _route(self, method: str, path: str) -> Tuple[Callable, List[str]]:
+        routes = {
+            ("GET", "/health"): self._health,
+            ("GET", "/ready"): self._ready,
+            ("GET", "/metrics"): self._metrics,
+            ("GET", "/agents"): self._agents,
+            ("POST", "/broadcast"): self._broadcast,
+        }
+        if (method, path) in routes:
+            return routes[(method, path)], []
+        match = _AGENT_ROUTE.match(path)
+        if match:
+            if method != "POST":
+                raise HTTPError(405, f"Método {method} no permitido")
+            handler = self._message if match.group(2) == "messages" else self._stream
+            return handler, [unquote(match.group(1))]
+        raise HTTPError(404, f"Ruta no encontrada: {path}")
+
+    async def _read_body(self, receive) -> Dict[str, Any]:
+        chunks = []
+        size = 0
+        while True:
+            event = await receive()
+            if event["type"] == "http.disconnect":
+                raise HTTPError(499, "Cliente desconectado")
+            chunk = event.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                raise HTTPError(413, "Cuerpo de la petición demasiado grande")
+            chunks.append(chunk)
+            if not event.get("more_body"):
+                break
+        data = b"".join(chunks)
+        if not data:
+            return {}
+        try:
+            body = json.loads(data)
+        except ValueError as e:
+            raise HTTPError(400, f"JSON inválido: {e}") from e
+        if not isinstance(body, dict):
+            raise HTTPError(400, "El cuerpo debe ser un objeto JSON")
+        return body
+
+    def _options(self, query: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            return {
+                "priority": int(query["priority"]) if "priority" in query else None,
+                "timeout": float(query["timeout"]) if "timeout" in query else None,
+                "deadline": float(query["deadline"]) if "deadline" in query else None,
+            }
+        except ValueError as e:
+            raise HTTPError(400, f"Parámetro inválido: {e}") from e
+
+    async def _send_json(self, send, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=to_builtin).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _health(self, send, receive, query, body) -> None:
+        await self._send_json(send, 200, {
+            "status": "ok" if self.system.running else "stopped",
+            "node_id": self.system.node_id,
+            "inflight": self.system.inflight,
+        })
+
+    async def _ready(self, send, receive, query, body) -> None:
+        readiness = self.system.readiness
+        await self._send_json(send, 200 if readiness["ready"] else 503, readiness)
+
+    async def _metrics(self, send, receive, query, body) -> None:
+        await self._send_json(send, 200, self.system.get_metrics())
+
+    async def _agents(self, send, receive, query, body) -> None:
+        agents = self.system.registry.list_agents(materialize=False)
+        await self._send_json(send, 200, [
+            {"id": agent_id, "name": agent.name, "role": agent.role} for agent_id, agent in agents.items()
+        ])
+
+    async def _message(self, send, receive, query, body, agent_id: str) -> None:
+        try:
+            result = await self.system.process_message(agent_id, body, **self._options(query))
+        except ValueError as e:
+            raise HTTPError(404, str(e)) from e
+        await self._send_json(send, _STATUS_CODES.get(result.get("status"), 200), result)
+
+    async def _broadcast(self, send, receive, query, body) -> None:
+        agents = set(query["agents"].split(",")) if query.get("agents") else None
+        results = await self.system.broadcast_message(
+            body, (lambda agent: agent.id in agents) if agents else None, **self._options(query)
+        )
+        await self._send_json(send, 200, results)
+
+    async def _stream(self, send, receive, query, body, agent_id: str) -> None:
+        options = self._options(query)
+        if not self.system.resolve_agent(agent_id):
+            raise HTTPError(404, f"Agente {agent_id} no encontrado")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        })
+        # La respuesta ya ha empezado: a partir de aquí los errores no pueden
+        # devolverse como otra respuesta, solo registrarse y cerrar el cuerpo.
+        # Si el cliente se desconecta se cancela el stream del proveedor
+        chunks = self.system.stream_message(agent_id, body, **options)
+        relay = asyncio.create_task(self._relay(send, chunks))
+        disconnect = asyncio.create_task(_wait_disconnect(receive))
+        try:
+            done, _ = await asyncio.wait((relay, disconnect), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            relay.cancel()
+            disconnect.cancel()
+            await asyncio.gather(relay, disconnect, return_exceptions=True)
+            await chunks.aclose()
+        if relay not in done:
+            logger.info(f"Cliente desconectado del stream del agente {agent_id}")
+            return
+        error = relay.exception()
+        if error is not None:
+            logger.error(f"Error en el stream del agente {agent_id}: {error}")
+            try:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            except Exception as e:
+                logger.debug(f"No se pudo cerrar el stream del agente {agent_id}: {e}")
+
+    async def _relay(self, send, chunks) -> None:
+        """
+        Envía las partes del stream como eventos SSE
+        """
+        async for chunk in chunks:
+            await send({"type": "http.response.body", "body": _sse("chunk", chunk), "more_body": True})
+        await send({"type": "http.response.body", "body": _sse("done", {}), "more_body": False})
+
+async def _wait_disconnect(receive) -> None:
+    """
+    Espera a que el cliente cierre la conexión
+    """
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+def _sse(event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=to_builtin)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+def create_app(system: AgentSystem, drain_timeout: float = 30.0, manager=None,
+               watch_interval: Optional[float] = None, probe: bool = False) -> AgentApp:
+    """
+    Crea la aplicación ASGI para un AgentSystem
+
+    Args:
+        system: Sistema a exponer
+        drain_timeout: Tiempo máximo de espera de las peticiones en curso al apagar
+        manager: ConfigManager del sistema (opcional)
+        watch_interval: Si se indica, recarga la configuración cuando cambia el fichero
+        probe: Comprobar que los proveedores responden al arrancar
+
+    Returns:
+        AgentApp: Aplicación ASGI
+    """
+    return AgentApp(system, drain_timeout, manager, watch_interval, probe)
@@ -0,0 +1,307 @@
+"""
+Fachada síncrona: un AgentSystem en un bucle de eventos propio
+
+Pensada para código síncrono (aplicaciones WSGI, scripts): el sistema vive
+en un hilo con su propio bucle de eventos durante toda la vida del proceso,
+así que las conexiones de los proveedores se reutilizan entre llamadas en
+lugar de crear un bucle nuevo con asyncio.run() en cada una. Cualquier hilo
+puede enviar peticiones con submit() y recibe un concurrent.futures.Future.
+Las llamadas bloqueantes esperan como mucho wait_timeout segundos.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import inspect
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from agentforge_core.agent.system import AgentSystem
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+class SyncAgentSystem:
+    """
+    Acceso síncrono y seguro entre hilos a un AgentSystem
+
+    Los métodos asíncronos del sistema se ejecutan en el bucle de fondo y
+    los síncronos (create_agent, add_provider...) también se ejecutan en
+    ese hilo, así que el estado del sistema solo se toca desde un hilo.
+    Los generadores asíncronos (stream_message, map_reduce, submit_batch)
+    se devuelven como iteradores síncronos. Los atributos que no son
+    métodos se leen directamente.
+
+    Uso:
+
+        with SyncAgentSystem(system) as agents:
+            future = agents.submit("asistente", {"content": "Hola"})
+            print(future.result(timeout=30))
+
+    Attributes:
+        system (AgentSystem): Sistema gestionado
+        wait_timeout (float): Tiempo máximo de espera de las llamadas bloqueantes
+            (None espera sin límite)
+    """
+
+    def __init__(self, system: Optional[AgentSystem] = None, wait_timeout: Optional[float] = 300.0, **kwargs):
+        """
+        Args:
+            system: Sistema a gestionar (si no se indica se crea uno)
+            wait_timeout: Tiempo máximo de espera de las llamadas bloqueantes
+            **kwargs: Argumentos para crear el AgentSystem
+        """
+        self.system = system if system is not None else AgentSystem(**kwargs)
+        self.wait_timeout = wait_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, source: Any, wait_timeout: Optional[float] = 300.0) -> "SyncAgentSystem":
+        """
+        Crea la fachada a partir de una configuración declarativa
+
+        Args:
+            source: Ruta a un fichero de configuración o dict
+            wait_timeout: Tiempo máximo de espera de las llamadas bloqueantes
+
+        Returns:
+            SyncAgentSystem: Fachada sobre el sistema construido
+        """
+        from agentforge_core.config.manager import build_system
+        return cls(build_system(source), wait_timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if not self.running:
+                self._loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(self._loop, ready),
+                                                name="agentforge-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def start(self, probe: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Arranca el bucle de fondo y el sistema
+
+        Args:
+            probe: Si es True se comprueba que cada proveedor responde
+            timeout: Tiempo máximo para iniciar y comprobar cada componente
+
+        Returns:
+            dict: Informe de disponibilidad (ver AgentSystem.start)
+        """
+        return self.run(self.system.start(probe, timeout))
+
+    def stop(self, drain_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Detiene el sistema y el bucle de fondo
+
+        Args:
+            drain_timeout: Tiempo máximo de espera de las peticiones en curso
+
+        Returns:
+            dict: Resultado de la parada (ver AgentSystem.stop)
+        """
+        if not self.running:
+            return {"drained": True, "inflight": 0, "components": {}}
+        # El vaciado puede durar más que una llamada normal
+        timeout = None if drain_timeout is None or self.wait_timeout is None else drain_timeout + self.wait_timeout
+        try:
+            return self.run(self.system.stop(drain_timeout), timeout)
+        finally:
+            loop, thread = self._loop, self._thread
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def __enter__(self) -> "SyncAgentSystem":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def submit_coroutine(self, coroutine) -> concurrent.futures.Future:
+        """
+        Ejecuta una corrutina en el bucle de fondo
+
+        Args:
+            coroutine: Corrutina a ejecutar
+
+        Returns:
+            concurrent.futures.Future: Resultado de la corrutina; cancelarlo
+            cancela la tarea en el bucle
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("No se puede esperar al bucle de fondo desde el propio bucle")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    def run(self, coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Ejecuta una corrutina en el bucle de fondo y espera su resultado
+
+        Args:
+            coroutine: Corrutina a ejecutar
+            timeout: Tiempo máximo de espera (por defecto wait_timeout); se
+                cancela la corrutina al superarlo
+
+        Returns:
+            Resultado de la corrutina
+
+        Raises:
+            concurrent.futures.TimeoutError: Si se supera el tiempo de espera
+        """
+        future = self.submit_coroutine(coroutine)
+        try:
+            return future.result(self.wait_timeout if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def submit(self, agent_id: str, message: Dict[str, Any], priority: Optional[int] = None,
+               deadline: Optional[float] = None, timeout: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        Envía un mensaje a un agente sin bloquear el hilo que llama
+
+        Args:
+            agent_id: ID del agente destinatario
+            message: Mensaje a procesar
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos (por defecto default_timeout)
+
+        Returns:
+            concurrent.futures.Future: Respuesta del agente
+        """
+        return self.submit_coroutine(self.system.process_message(agent_id, message, priority, deadline, timeout))
+
+    def process_message(self, agent_id: str, message: Dict[str, Any], priority: Optional[int] = None,
+                        deadline: Optional[float] = None, timeout: Optional[float] = None,
+                        wait_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Envía un mensaje a un agente y espera la respuesta
+
+        Args:
+            agent_id: ID del agente destinatario
+            message: Mensaje a procesar
+            priority: Prioridad del mensaje (mayor pasa antes)
+            deadline: Deadline absoluto del mensaje (epoch en segundos)
+            timeout: Timeout en segundos (por defecto default_timeout)
+            wait_timeout: Tiempo máximo de espera del hilo que llama (por
+                defecto wait_timeout); se cancela la petición al superarlo
+
+        Returns:
+            dict: Respuesta del agente
+
+        Raises:
+            concurrent.futures.TimeoutError: Si se supera el tiempo de espera
+        """
+        return self.run(self.system.process_message(agent_id, message, priority, deadline, timeout), wait_timeout)
+
+    def iterate(self, agen: AsyncIterator[Any], timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Recorre un generador asíncrono del sistema desde código síncrono
+
+        Cada elemento se pide al bucle de fondo por separado. Si se deja de
+        iterar (break, excepción) se cierra el generador en el bucle.
+
+        Args:
+            agen: Generador asíncrono (p. ej. system.stream_message(...))
+            timeout: Tiempo máximo de espera de cada elemento (por defecto wait_timeout)
+
+        Yields:
+            Elementos del generador
+
+        Raises:
+            concurrent.futures.TimeoutError: Si un elemento tarda más del tiempo de espera
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("No se puede esperar al bucle de fondo desde el propio bucle")
+        if timeout is None:
+            timeout = self.wait_timeout
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop)
+                try:
+                    item = future.result(timeout)
+                except StopAsyncIteration:
+                    return
+                except concurrent.futures.TimeoutError:
+                    # Se espera a que la cancelación llegue al generador antes de cerrarlo
+                    future.cancel()
+                    concurrent.futures.wait([future], timeout)
+                    raise
+                yield item
+        finally:
+            try:
+                self.run(agen.aclose(), timeout)
+            except Exception as e:
+                logger.debug(f"No se pudo cerrar el generador asíncrono: {e}")
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta una función síncrona en el hilo del bucle y espera su resultado
+
+        Args:
+            func: Función a ejecutar
+            *args: Argumentos posicionales
+            **kwargs: Argumentos con nombre
+
+        Returns:
+            Resultado de la función
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            return func(*args, **kwargs)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def runner():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        loop.call_soon_threadsafe(runner)
+        return future.result(self.wait_timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "system":
+            raise AttributeError(name)
+        attr = getattr(self.system, name)
+        if inspect.isasyncgenfunction(attr):
+            @functools.wraps(attr)
+            def iterator(*args, **kwargs):
+                return self.iterate(attr(*args, **kwargs))
+            return iterator
+        if asyncio.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            def blocking(*args, **kwargs):
+                return self.run(attr(*args, **kwargs))
+            return blocking
+        if callable(attr):
+            return functools.partial(self.call, attr)
+        return attr
@@ -0,0 +1,9 @@
+"""
+Módulo de transportes para distribuir un AgentSystem entre varios nodos
+"""
+
+from agentforge_core.transport.base import Transport, TransportError
+from agentforge_core.transport.hashring import HashRing
+from agentforge_core.transport.sockets import SocketServer, SocketTransport
+
+__all__ = ["Transport", "TransportError", "HashRing", "SocketServer", "SocketTransport"]
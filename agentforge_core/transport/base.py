@@ -0,0 +1,56 @@
+"""
+Clase base para transportes entre nodos
+"""
+
+from typing import Any, Dict, Optional
+
+class TransportError(Exception):
+    """
+    Error de comunicación con un nodo remoto
+    """
+
+class Transport:
+    """
+    Clase base para todos los transportes entre nodos de un AgentSystem
+
+    Un transporte mantiene la conexión con un único nodo remoto y permite
+    enviar peticiones concurrentes sobre ella.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or self.__class__.__name__
+
+    @property
+    def connected(self) -> bool:
+        """
+        Indica si el transporte tiene una conexión abierta
+        """
+        raise NotImplementedError("Los transportes deben implementar connected")
+
+    async def connect(self) -> None:
+        """
+        Abre la conexión con el nodo remoto
+        """
+        raise NotImplementedError("Los transportes deben implementar connect")
+
+    async def request(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Envía una petición al nodo remoto y espera su respuesta
+
+        Args:
+            payload: Petición a enviar (serializable a JSON)
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            El resultado devuelto por el nodo remoto
+
+        Raises:
+            TransportError: Si la comunicación falla o el nodo devuelve un error
+        """
+        raise NotImplementedError("Los transportes deben implementar request")
+
+    async def close(self) -> None:
+        """
+        Cierra la conexión con el nodo remoto
+        """
+        raise NotImplementedError("Los transportes deben implementar close")
@@ -0,0 +1,103 @@
+"""
+Anillo de hash consistente para ubicar agentes en nodos
+"""
+
+import bisect
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+def _hash(key: str) -> int:
+    """
+    Calcula un hash estable de 64 bits (independiente de PYTHONHASHSEED)
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HashRing:
+    """
+    Anillo de hash consistente con nodos virtuales
+
+    Al añadir o quitar un nodo solo cambian de ubicación las claves
+    que le correspondían, no todas.
+
+    Attributes:
+        replicas (int): Número de nodos virtuales por unidad de peso
+    """
+
+    def __init__(self, nodes: Optional[List[str]] = None, replicas: int = 100):
+        self.replicas = replicas
+        self._weights: Dict[str, int] = {}
+        self._keys: List[int] = []
+        self._ring: List[Tuple[int, str]] = []
+        for node_id in nodes or []:
+            self.add_node(node_id)
+
+    def add_node(self, node_id: str, weight: int = 1) -> bool:
+        """
+        Añade un nodo al anillo
+
+        Args:
+            node_id: ID del nodo
+            weight: Peso relativo del nodo
+
+        Returns:
+            bool: True si el nodo se añadió, False si ya existía
+        """
+        if node_id in self._weights:
+            return False
+        self._weights[node_id] = weight
+        self._rebuild()
+        return True
+
+    def remove_node(self, node_id: str) -> bool:
+        """
+        Elimina un nodo del anillo
+
+        Args:
+            node_id: ID del nodo
+
+        Returns:
+            bool: True si el nodo fue eliminado
+        """
+        if node_id not in self._weights:
+            return False
+        del self._weights[node_id]
+        self._rebuild()
+        return True
+
+    def get_node(self, key: str) -> Optional[str]:
+        """
+        Obtiene el nodo responsable de una clave
+
+        Args:
+            key: Clave a ubicar (normalmente un agent_id)
+
+        Returns:
+            str: ID del nodo o None si el anillo está vacío
+        """
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    @property
+    def nodes(self) -> List[str]:
+        """
+        Lista de nodos del anillo
+        """
+        return list(self._weights)
+
+    def _rebuild(self) -> None:
+        ring = [
+            (_hash(f"{node_id}#{i}"), node_id)
+            for node_id, weight in self._weights.items()
+            for i in range(self.replicas * weight)
+        ]
+        ring.sort()
+        self._ring = ring
+        self._keys = [point for point, _ in ring]
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._weights
@@ -0,0 +1,343 @@
+"""
+Transporte de referencia sobre sockets TCP o Unix
+
+Protocolo: cada trama es un entero de 4 bytes big-endian con la longitud
+seguido de un objeto JSON en UTF-8. Si el bit más alto de la longitud está
+activo el objeto va en msgpack (ver agentforge_core.message.pack), que
+conserva los tipos Message y Result; el servidor responde cada petición con
+el mismo formato en que la recibió. Cada petición lleva un "id" que se
+devuelve en su respuesta, lo que permite multiplexar muchas peticiones
+concurrentes sobre una única conexión persistente.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+from agentforge_core.message import pack, to_builtin, unpack
+from agentforge_core.transport.base import Transport, TransportError
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+_BINARY = 0x80000000
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+CODECS = ("json", "msgpack")
+
+def encode_frame(payload: Dict[str, Any], binary: bool = False) -> bytes:
+    """
+    Serializa un objeto como trama con prefijo de longitud
+
+    Args:
+        payload: Objeto a serializar
+        binary: Si es True se serializa con msgpack en lugar de JSON
+
+    Returns:
+        bytes: Trama lista para escribir en el socket
+    """
+    if binary:
+        data = pack(payload)
+        return _HEADER.pack(len(data) | _BINARY) + data
+    data = json.dumps(payload, default=to_builtin, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(data)) + data
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """
+    Lee una trama completa del socket
+
+    Args:
+        reader: Stream de lectura
+
+    Returns:
+        dict: Objeto deserializado
+
+    Raises:
+        asyncio.IncompleteReadError: Si la conexión se cierra a mitad de trama
+        TransportError: Si la trama supera el tamaño máximo
+    """
+    return (await _read_frame(reader))[0]
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[Dict[str, Any], bool]:
+    """
+    Lee una trama e indica si venía en msgpack
+    """
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    binary = bool(length & _BINARY)
+    length &= ~_BINARY
+    if length > MAX_FRAME_SIZE:
+        raise TransportError(f"Trama de {length} bytes supera el máximo permitido")
+    data = await reader.readexactly(length)
+    return (unpack(data) if binary else json.loads(data)), binary
+
+class SocketTransport(Transport):
+    """
+    Cliente TCP/Unix con conexión persistente y peticiones multiplexadas
+
+    Attributes:
+        host (str): Host del nodo remoto (TCP)
+        port (int): Puerto del nodo remoto (TCP)
+        path (str): Ruta del socket Unix (alternativa a host/port)
+        codec (str): Formato de las tramas ("json" o "msgpack")
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 path: Optional[str] = None, connect_timeout: float = 5.0, codec: str = "json"):
+        if path is None and (host is None or port is None):
+            raise ValueError("SocketTransport necesita host y port o un path de socket Unix")
+        if codec not in CODECS:
+            raise ValueError(f"Codec desconocido: {codec}")
+        super().__init__("SocketTransport")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.connect_timeout = connect_timeout
+        self.codec = codec
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def address(self) -> str:
+        """
+        Dirección legible del nodo remoto
+        """
+        return f"unix:{self.path}" if self.path else f"{self.host}:{self.port}"
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                if self.path:
+                    opener = asyncio.open_unix_connection(self.path)
+                else:
+                    opener = asyncio.open_connection(self.host, self.port)
+                reader, writer = await asyncio.wait_for(opener, self.connect_timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise TransportError(f"No se pudo conectar con {self.address}: {e}") from e
+            self._reader, self._writer = reader, writer
+            self._reader_task = asyncio.create_task(self._read_loop(reader, writer))
+            logger.debug(f"Conexión establecida con {self.address}")
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Recibe respuestas y las entrega a la petición correspondiente
+        """
+        error = TransportError(f"Conexión con {self.address} cerrada")
+        try:
+            while True:
+                frame = await read_frame(reader)
+                future = self._pending.pop(frame.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(frame)
+        except asyncio.IncompleteReadError:
+            pass
+        except (ConnectionError, OSError, TransportError, ValueError) as e:
+            error = TransportError(f"Error leyendo de {self.address}: {e}")
+        finally:
+            if self._writer is writer:
+                self._reader = None
+                self._writer = None
+            writer.close()
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def request(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        if not self.connected:
+            await self.connect()
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        sent = False
+        try:
+            frame = encode_frame({**payload, "id": request_id}, self.codec == "msgpack")
+            async with self._write_lock:
+                writer = self._writer
+                if writer is None:
+                    raise TransportError(f"Conexión con {self.address} cerrada")
+                writer.write(frame)
+                sent = True
+                await writer.drain()
+            response = await asyncio.wait_for(future, timeout)
+        except (ConnectionError, OSError) as e:
+            raise TransportError(f"Error enviando a {self.address}: {e}") from e
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Avisar al nodo remoto para que deje de trabajar en la petición
+            if sent:
+                self._send_cancel(request_id)
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in response:
+            raise TransportError(response["error"])
+        return response.get("result")
+
+    def _send_cancel(self, request_id: int) -> None:
+        """
+        Envía sin esperar la cancelación de una petición en curso
+        """
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            return
+        try:
+            writer.write(encode_frame({"op": "cancel", "target": request_id}, self.codec == "msgpack"))
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"No se pudo cancelar la petición {request_id}: {e}")
+            
+    async def close(self) -> None:
+        writer = self._writer
+        task = self._reader_task
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+class SocketServer:
+    """
+    Servidor que expone los agentes locales de un AgentSystem a otros nodos
+
+    Las peticiones de una misma conexión se atienden concurrentemente y
+    sus respuestas pueden volver en cualquier orden.
+    """
+
+    def __init__(self, system, host: Optional[str] = None, port: Optional[int] = None,
+                 path: Optional[str] = None):
+        if path is None and port is None:
+            raise ValueError("SocketServer necesita un port o un path de socket Unix")
+        self.system = system
+        self.host = host
+        self.port = port
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> bool:
+        """
+        Empieza a aceptar conexiones
+
+        Returns:
+            bool: True si el servidor se inició correctamente
+        """
+        if self._server is not None:
+            return True
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            if not self.port:
+                self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Nodo {self.system.node_id} escuchando en {self.path or f'{self.host}:{self.port}'}")
+        return True
+
+    async def stop(self) -> bool:
+        """
+        Deja de aceptar conexiones
+
+        Returns:
+            bool: True si el servidor se detuvo correctamente
+        """
+        if self._server is None:
+            return True
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        return True
+
+    async def serve_forever(self) -> None:
+        """
+        Atiende conexiones hasta que se cancele la tarea
+        """
+        await self.start()
+        await self._server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks: Dict[Any, asyncio.Task] = {}
+        try:
+            while True:
+                frame, binary = await _read_frame(reader)
+                if frame.get("op") == "cancel":
+                    task = tasks.get(frame.get("target"))
+                    if task is not None:
+                        task.cancel()
+                    continue
+                request_id = frame.get("id")
+                task = asyncio.create_task(self._dispatch(frame, writer, write_lock, binary))
+                tasks[request_id] = task
+                task.add_done_callback(lambda _, request_id=request_id: tasks.pop(request_id, None))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        except asyncio.CancelledError:
+            # Al detener el nodo se cancelan las conexiones abiertas
+            pass
+        except (TransportError, ValueError) as e:
+            logger.error(f"Trama inválida recibida en nodo {self.system.node_id}: {e}")
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            try:
+                writer.close()
+            except (ConnectionError, OSError, RuntimeError):
+                pass
+
+    async def _dispatch(self, frame: Dict[str, Any], writer: asyncio.StreamWriter,
+                        write_lock: asyncio.Lock, binary: bool = False) -> None:
+        request_id = frame.get("id")
+        try:
+            response = {"id": request_id, "result": await self._execute(frame)}
+        except Exception as e:
+            response = {"id": request_id, "error": str(e)}
+
+        try:
+            async with write_lock:
+                writer.write(encode_frame(response, binary))
+                await writer.drain()
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"No se pudo enviar la respuesta {request_id}: {e}")
+
+    async def _execute(self, frame: Dict[str, Any]) -> Any:
+        op = frame.get("op")
+        if op == "process":
+            agent_id = frame.get("agent_id")
+            if not self.system.is_local(agent_id):
+                raise ValueError(f"Agente {agent_id} no encontrado en el nodo {self.system.node_id}")
+            message = frame.get("message") or {}
+            tenant = frame.get("tenant")
+            if tenant is not None and message.get("tenant") is None:
+                # El tenant del nodo de origen se aplica también en este nodo
+                message = message.evolve(tenant=tenant) if hasattr(message, "evolve") else {**message, "tenant": tenant}
+            return await self.system.process_message(agent_id, message, priority=frame.get("priority"),
+                                                     deadline=frame.get("deadline"))
+        if op == "ping":
+            return {"status": "ok", "node": self.system.node_id}
+        if op == "list_agents":
+            return [agent_id for agent_id in self.system.registry.list_agents()
+                    if self.system.is_local(agent_id)]
+        raise ValueError(f"Operación desconocida: {op}")
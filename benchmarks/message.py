@@ -0,0 +1,74 @@
+"""
+Comparativa entre mensajes dict y Message/Result
+
+    python benchmarks/message.py
+
+Mide la creación de mensajes, el acceso a campos, la copia por agente de
+broadcast_message, la serialización (JSON frente a msgpack) y un broadcast
+completo a través de AgentSystem.
+"""
+
+import asyncio
+import json
+import time
+import timeit
+
+from agentforge_core import AgentSystem, Message
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.message import pack, unpack
+
+N = 200_000
+AGENTS = 200
+
+HISTORY = [{"role": "user", "content": f"mensaje {i}"} for i in range(20)]
+
+def make_dict():
+    return {"content": "Resume el documento adjunto", "role": "user", "priority": 1,
+            "tenant": "acme", "history": HISTORY}
+
+def make_message():
+    return Message("Resume el documento adjunto", role="user", priority=1, tenant="acme", history=HISTORY)
+
+def bench(label, dict_stmt, message_stmt, number=N, **namespace):
+    dict_time = timeit.timeit(dict_stmt, number=number, globals={**globals(), **namespace})
+    message_time = timeit.timeit(message_stmt, number=number, globals={**globals(), **namespace})
+    print(f"{label:<34}{dict_time / number * 1e9:>10.0f} ns{message_time / number * 1e9:>12.0f} ns"
+          f"{dict_time / message_time:>9.2f}x")
+
+async def echo(agent, message):
+    return {"content": message.get("content"), "tenant": message.get("tenant")}
+
+async def broadcast(message, processor, rounds=20):
+    system = AgentSystem()
+    system.set_framework(CustomAgentFramework())
+    for i in range(AGENTS):
+        system.create_agent(f"agente{i}", processor=processor)
+    await system.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await system.broadcast_message(message)
+    elapsed = time.perf_counter() - start
+    await system.stop()
+    return elapsed / rounds
+
+def main():
+    payload_dict = make_dict()
+    payload_message = make_message()
+    print(f"{'':<34}{'dict':>13}{'Message':>15}{'mejora':>9}")
+    bench("creación", "make_dict()", "make_message()")
+    bench("acceso a campo (get)", "d.get('content')", "m.get('content')", d=payload_dict, m=payload_message)
+    bench("acceso a campo (atributo)", "d['content']", "m.content", d=payload_dict, m=payload_message)
+    bench(f"copia para {AGENTS} agentes", f"[d.copy() for _ in range({AGENTS})]",
+          f"[m.copy() for _ in range({AGENTS})]", number=N // AGENTS, d=payload_dict, m=payload_message)
+    bench("serialización (json / msgpack)", "json.loads(json.dumps(d))", "unpack(pack(m))",
+          number=N // 10, d=payload_dict, m=payload_message, pack=pack, unpack=unpack)
+    print(f"tamaño serializado: {len(json.dumps(payload_dict).encode())} B JSON,"
+          f" {len(pack(payload_message))} B msgpack")
+
+    dict_time = asyncio.run(broadcast(payload_dict, echo))
+    message_time = asyncio.run(broadcast(payload_message, echo))
+    print(f"{f'broadcast a {AGENTS} agentes':<34}{dict_time * 1e6:>10.0f} us{message_time * 1e6:>12.0f} us"
+          f"{dict_time / message_time:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from agentforge_core import AgentSystem
-from agentforge_core.llm import OpenAIProvider
+from agentforge_core.llm import OpenAIProvider, PromptTemplate
 from agentforge_core.agent.frameworks import AtomicAgentsFramework, CustomAgentFramework
 
 # Cargar variables de entorno (.env en directorio actual o padres)
@@ -36,6 +36,14 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Plantilla del asistente: la parte fija (sistema y rol) va primero para que
+# el proveedor pueda reutilizarla de su caché de prompts en cada petición
+ASSISTANT_PROMPT = PromptTemplate(
+    system="Actúas como un {role}. Responde al mensaje del usuario de forma clara y concisa.",
+    user="{content}",
+    name="asistente"
+)
+
 # Definir un procesador simple para el agente Custom
 async def simple_processor(agent, message):
     """Procesador simple que usa el LLM del sistema para responder"""
@@ -53,14 +61,8 @@ async def simple_processor(agent, message):
             "error": "Proveedor LLM no disponible"
         }
     
-    # Convertir el mensaje a formato de chat
-    chat_message = [{
-        "role": "user",
-        "content": f"Actuando como un {agent.role}, responde al siguiente mensaje: {message.get('content', '')}"
-    }]
-    
-    # Generar respuesta
-    response = await provider.chat(chat_message)
+    # Generar respuesta: el prefijo del prompt se construye una sola vez por agente
+    response = await provider.chat_prompt(agent.bound_prompt(), {"content": message.get("content", "")})
     
     return {
         "status": "success",
@@ -102,9 +104,12 @@ async def main():
     
     # Añadir referencia al sistema en los agentes
     asistente.set_metadata("system", system)
+    asistente.set_prompt(ASSISTANT_PROMPT)
     
     # Iniciar el sistema
-    system.start()
+    report = await system.start()
+    if not report["ready"]:
+        print(f"Componentes no disponibles: {report['components']}")
     
     # Probar con un mensaje
     print("\n> Enviando mensaje al asistente personal (Custom Framework)")
@@ -112,9 +117,10 @@ async def main():
         "content": "¿Qué actividades recomiendas para el fin de semana?"
     })
     print(f"Respuesta: {resultado_asistente.get('response')}")
+    print(f"Caché de prompts: {asistente.bound_prompt().stats()}")
     
     # Detener el sistema
-    system.stop()
+    await system.stop()
     
     # Ejemplo 2: Usando Atomic Agents
     try:
@@ -138,7 +144,7 @@ async def main():
         )
         
         # Iniciar el sistema
-        system.start()
+        await system.start()
         
         # Probar con un mensaje
         print("\n> Enviando mensaje al asistente (Atomic Framework)")
@@ -148,7 +154,7 @@ async def main():
         print(f"Respuesta: {resultado_atomic.get('response')}")
         
         # Detener el sistema
-        system.stop()
+        await system.stop()
     except ImportError as e:
         print(f"\nNota: No se pudo ejecutar el ejemplo de Atomic Agents: {e}")
         print("Para ejecutar este ejemplo, asegúrate de tener instaladas las dependencias necesarias:")
@@ -18,6 +18,10 @@ setup(
         "openai": ["openai>=1.0.0"],
         "anthropic": ["anthropic>=0.5.0"],
         "groq": ["groq>=0.3.0"],
+        "embeddings": ["numpy>=1.21"],
+        "http2": ["httpx[http2]>=0.23.0"],
+        "server": ["uvicorn>=0.22.0"],
+        "msgpack": ["msgpack>=1.0.0"],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.18.0",
@@ -29,6 +33,14 @@ setup(
             "openai>=1.0.0",
             "anthropic>=0.5.0",
             "groq>=0.3.0",
+            "numpy>=1.21",
+            "uvicorn>=0.22.0",
+            "msgpack>=1.0.0",
+        ],
+    },
+    entry_points={
+        "console_scripts": [
+            "agentforge=agentforge_core.cli:main",
         ],
     },
     classifiers=[
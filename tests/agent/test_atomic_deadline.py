@@ -0,0 +1,85 @@
+"""
+Pruebas del deadline en las llamadas de los agentes Atomic
+
+No requieren atomic_agents ni instructor: el cliente y el BaseAgent se
+sustituyen por objetos equivalentes.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from agentforge_core.agent.frameworks.atomic import AtomicAgent, AtomicAgentsFramework
+from agentforge_core.agent.schemas import compile_schema
+from agentforge_core.context import deadline_scope
+
+class ChatInput(BaseModel):
+    chat_message: str
+
+class FakeOpenAI:
+    def __init__(self, options=None):
+        self.options = options or {}
+
+    def with_options(self, **options):
+        return FakeOpenAI(options)
+
+class FakeBaseAgent:
+    def __init__(self):
+        self.client = FakeOpenAI()
+        self.calls = []
+
+    def run(self, input_data):
+        self.calls.append(self.client.options)
+        return SimpleNamespace(chat_message=f"eco: {input_data.chat_message}")
+
+def _agent():
+    framework = AtomicAgentsFramework()
+    framework._openai = FakeOpenAI()
+    framework._instructor = SimpleNamespace(Mode=SimpleNamespace(TOOLS="tools"),
+                                            from_openai=lambda client, mode: client)
+    framework._timeout = 60.0
+    framework.executor = ThreadPoolExecutor(max_workers=1)
+    agent = AtomicAgent("atomic")
+    agent.set_metadata("framework", framework)
+    agent._atomic_agent = FakeBaseAgent()
+    agent._input_schema = compile_schema(ChatInput)
+    agent._initialized = True
+    return agent
+
+def test_call_timeout_is_the_remaining_deadline():
+    agent = _agent()
+
+    async def scenario():
+        with deadline_scope(time.time() + 5):
+            with_deadline = await agent.process({"content": "hola"})
+        without_deadline = await agent.process({"content": "adiós"})
+        return with_deadline, without_deadline
+
+    with_deadline, without_deadline = asyncio.run(scenario())
+    calls = agent._atomic_agent.calls
+
+    assert with_deadline["response"] == "eco: hola"
+    assert without_deadline["response"] == "eco: adiós"
+    assert 4 < calls[0]["timeout"] <= 5 and calls[0]["max_retries"] == 0
+    # Sin deadline se usa el cliente del agente, que no cambia
+    assert calls[1] == {}
+    assert agent._atomic_agent.client.options == {}
+
+def test_expired_while_waiting_for_a_thread_does_not_call_the_model():
+    agent = _agent()
+    executor = agent.get_metadata("framework").executor
+
+    async def scenario():
+        busy = executor.submit(time.sleep, 0.3)
+        with deadline_scope(time.time() + 0.1):
+            result = await agent.process({"content": "hola"})
+        busy.result()
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result["status"] == "expired"
+    assert agent._atomic_agent.calls == []
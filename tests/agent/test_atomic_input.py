@@ -0,0 +1,45 @@
+"""
+Pruebas de la construcción de la entrada de los agentes Atomic
+
+No requieren atomic_agents: el esquema de entrada por defecto se sustituye
+por uno equivalente.
+"""
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from agentforge_core.agent.frameworks.atomic import AtomicAgent
+from agentforge_core.agent.schemas import compile_schema
+
+class ChatInput(BaseModel):
+    chat_message: str
+
+class Ticket(BaseModel):
+    title: str
+    priority: int = 0
+
+def _agent(input_schema=None):
+    agent = AtomicAgent("atomic", input_schema=input_schema)
+    agent._input_schema = agent.input_schema or compile_schema(ChatInput)
+    return agent
+
+def test_default_schema_ignores_input_metadata():
+    agent = _agent()
+    # El resultado de otro agente lleva el mensaje original en "input"
+    result = {"status": "success", "content": "resume esto", "input": {"content": "antes"}}
+
+    assert agent._build_input(result) == ChatInput(chat_message="resume esto")
+
+def test_default_schema_uses_schema_instances():
+    agent = _agent()
+    data = ChatInput(chat_message="hola")
+
+    assert agent._build_input({"input": data}) is data
+
+def test_custom_schema_reads_input_or_fields():
+    agent = _agent(Ticket)
+
+    assert agent._build_input({"input": {"title": "caído", "priority": 2}}) == Ticket(title="caído", priority=2)
+    assert agent._build_input({"title": "lento", "content": "ignorado"}) == Ticket(title="lento")
+    with pytest.raises(ValidationError):
+        agent._build_input({"input": {"priority": 1}})
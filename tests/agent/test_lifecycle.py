@@ -0,0 +1,75 @@
+"""
+Pruebas de arranque y parada del sistema de agentes
+"""
+
+import asyncio
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.system import AgentSystem
+
+async def slow(agent, message):
+    await asyncio.sleep(message.get("delay", 0.1))
+    return {"response": message.get("content")}
+
+async def stream(agent, message):
+    yield {"content": message.get("content")}
+
+def _system():
+    system = AgentSystem()
+    system.set_framework(CustomAgentFramework())
+    system.create_agent("lento", processor=slow)
+    system.create_agent("stream", processor=stream)
+    return system
+
+def test_stop_rejects_new_requests_while_draining():
+    async def scenario():
+        system = _system()
+        await system.start()
+        accepted = asyncio.create_task(system.process_message("lento", {"content": "antes", "delay": 0.2}))
+        await asyncio.sleep(0.05)
+        stopping = asyncio.create_task(system.stop(drain_timeout=None))
+        await asyncio.sleep(0)
+        rejected = await system.process_message("lento", {"content": "durante"})
+        chunks = [chunk async for chunk in system.stream_message("stream", {"content": "durante"})]
+        return await accepted, rejected, chunks, await asyncio.wait_for(stopping, 2)
+
+    accepted, rejected, chunks, stopped = asyncio.run(scenario())
+
+    assert accepted["response"] == "antes"
+    assert rejected["status"] == "overloaded"
+    assert chunks[-1]["status"] == "overloaded"
+    assert stopped["drained"] is True
+
+def test_stop_returns_under_steady_load():
+    async def scenario():
+        system = _system()
+        await system.start()
+        results = []
+
+        async def load():
+            # Cada petición nueva empieza antes de que termine la anterior
+            while True:
+                results.append(asyncio.create_task(system.process_message("lento", {"delay": 0.05})))
+                await asyncio.sleep(0.02)
+
+        generator = asyncio.create_task(load())
+        await asyncio.sleep(0.1)
+        stopped = await asyncio.wait_for(system.stop(drain_timeout=None), 2)
+        generator.cancel()
+        return stopped, await asyncio.gather(*results), system
+
+    stopped, results, system = asyncio.run(scenario())
+
+    assert stopped["drained"] is True
+    assert {result.get("status") for result in results} <= {"success", None, "overloaded"}
+    assert system.inflight == 0
+
+def test_restart_accepts_requests_again():
+    async def scenario():
+        system = _system()
+        await system.start()
+        await system.stop()
+        await system.start()
+        return await system.process_message("lento", {"content": "hola", "delay": 0})
+
+    assert asyncio.run(scenario())["response"] == "hola"
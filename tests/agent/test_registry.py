@@ -0,0 +1,52 @@
+"""
+Pruebas de la eliminación de agentes de sesión inactivos
+"""
+
+import asyncio
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.system import AgentSystem
+
+async def slow(agent, message):
+    await asyncio.sleep(message.get("delay", 0))
+    return {"response": agent.id}
+
+def _system(**kwargs):
+    system = AgentSystem(**kwargs)
+    system.set_framework(CustomAgentFramework())
+    system.create_template("sesion", processor=slow)
+    return system
+
+def test_lru_skips_agents_with_requests_in_flight():
+    async def scenario():
+        system = _system(max_session_agents=1)
+        system.clone_agent("sesion", "s1")
+        busy = asyncio.create_task(system.process_message("s1", {"delay": 0.2}))
+        await asyncio.sleep(0.05)
+        system.clone_agent("sesion", "s2")
+        during = system.registry.ids()
+        result = await busy
+        return during, result, system.registry.ids()
+
+    during, result, after = asyncio.run(scenario())
+
+    # s1 estaba en uso: se mantiene hasta que termina su petición
+    assert set(during) == {"s1", "s2"}
+    assert result["response"] == "s1"
+    assert after == ["s1"]
+
+def test_ttl_is_enforced_without_new_traffic():
+    async def scenario():
+        system = _system(agent_ttl=0.1)
+        await system.start()
+        system.clone_agent("sesion", "s1")
+        await system.process_message("s1", {})
+        await asyncio.sleep(0.3)
+        ids = system.registry.ids()
+        await system.stop()
+        return ids, system.registry.stats()["evicted"]
+
+    ids, evicted = asyncio.run(scenario())
+
+    assert ids == []
+    assert evicted == 1
@@ -0,0 +1,52 @@
+"""
+Pruebas de snapshot y restauración de un AgentSystem
+"""
+
+import asyncio
+
+import pytest
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.snapshot import SnapshotError
+from agentforge_core.agent.system import AgentSystem
+
+async def echo(agent, message):
+    return {"response": message.get("content")}
+
+def _system():
+    system = AgentSystem()
+    system.set_framework(CustomAgentFramework())
+    return system
+
+def test_restored_agents_belong_to_the_system(tmp_path):
+    path = str(tmp_path / "sistema.snap")
+    source = _system()
+    source.create_agent("eco", role="repetidor", processor=echo)
+    assert source.snapshot(path) == 1
+
+    target = _system()
+
+    @target.register_tool
+    def hora() -> str:
+        """Hora actual"""
+        return "12:00"
+
+    assert target.restore(path) == 1
+    agent = target.registry.get("eco")
+
+    assert agent.get_metadata("system") is target
+    assert "hora" in agent.available_tools()
+    assert asyncio.run(target.process_message("eco", {"content": "hola"}))["response"] == "hola"
+
+def test_snapshot_fails_for_processors_that_cannot_be_imported(tmp_path):
+    path = tmp_path / "sistema.snap"
+    system = _system()
+    system.create_agent("eco", processor=echo)
+    system.snapshot(str(path))
+    previous = path.read_bytes()
+    system.create_agent("anonimo", processor=lambda agent, message: {"response": "hola"})
+
+    with pytest.raises(SnapshotError, match="anonimo.*lambda"):
+        system.snapshot(str(path))
+    assert path.read_bytes() == previous
+    assert [p.name for p in tmp_path.iterdir()] == ["sistema.snap"]
@@ -0,0 +1,85 @@
+"""
+Pruebas de plantillas de agentes y clonado
+"""
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.system import AgentSystem
+
+async def echo(agent, message):
+    return {"response": message.get("content")}
+
+def _system():
+    system = AgentSystem()
+    system.set_framework(CustomAgentFramework())
+    return system
+
+def test_clone_tools_are_copy_on_write():
+    system = _system()
+    template = system.create_template("soporte", role="agente de soporte", processor=echo)
+
+    @template.register_tool
+    def buscar(texto: str) -> str:
+        """Busca en la base de conocimiento"""
+        return texto
+
+    clone = system.clone_agent("soporte", "sesion-1")
+    sibling = system.clone_agent("soporte", "sesion-2")
+    assert clone.tools is template.tools
+
+    @clone.register_tool
+    def escalar(motivo: str) -> str:
+        """Escala la incidencia"""
+        return motivo
+
+    assert "escalar" in clone.tools
+    assert "escalar" not in template.tools
+    assert "escalar" not in sibling.tools
+    assert set(clone.available_tools()) == {"buscar", "escalar"}
+    assert set(sibling.available_tools()) == {"buscar"}
+
+    # Las herramientas que se añaden después a la plantilla llegan a todos los clones
+    @template.register_tool
+    def traducir(texto: str) -> str:
+        """Traduce un texto"""
+        return texto
+
+    assert "traducir" in clone.tools and "traducir" in sibling.tools
+
+def test_clone_of_clone_keeps_layers():
+    system = _system()
+    template = system.create_template("base", processor=echo)
+    clone = system.clone_agent("base", "hijo")
+    clone.register_tool(lambda: "a", name="a", description="Herramienta a")
+    grandchild = clone.clone("nieto")
+    grandchild.register_tool(lambda: "b", name="b", description="Herramienta b")
+
+    assert set(grandchild.available_tools()) == {"a", "b"}
+    assert set(clone.available_tools()) == {"a"}
+    assert len(template.tools) == 0
+
+def test_bound_prompt_follows_system_tools():
+    system = _system()
+    agent = system.create_agent("asistente", processor=echo)
+    template = system.create_template("soporte", processor=echo)
+    template.bound_prompt()
+    clone = system.clone_agent("soporte", "sesion")
+
+    def names(bound):
+        return [tool["function"]["name"] for tool in bound.tools or []]
+
+    first = agent.bound_prompt()
+    assert agent.bound_prompt() is first
+    assert names(first) == []
+
+    @system.register_tool
+    def buscar(texto: str) -> str:
+        """Busca en la base de conocimiento"""
+        return texto
+
+    assert names(agent.bound_prompt()) == ["buscar"]
+    assert names(clone.bound_prompt()) == ["buscar"]
+    assert agent.bound_prompt() is agent.bound_prompt()
+
+    system.tools.remove("buscar")
+    assert names(agent.bound_prompt()) == []
+    assert names(clone.bound_prompt()) == []
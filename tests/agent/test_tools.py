@@ -0,0 +1,53 @@
+"""
+Pruebas de la ejecución de herramientas
+"""
+
+import asyncio
+import functools
+import json
+import threading
+from typing import Optional, Union
+
+from agentforge_core.agent.tools import Tool, run_tool_calls
+
+async def sumar(a: int, b: int) -> int:
+    await asyncio.sleep(0)
+    return a + b
+
+class Multiplicador:
+    def __init__(self):
+        self.threads = []
+
+    async def __call__(self, a: int, b: int) -> int:
+        self.threads.append(threading.current_thread())
+        return a * b
+
+def _call(name, **arguments):
+    return {"id": name, "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+def test_async_callables_are_awaited():
+    multiplicador = Multiplicador()
+    tools = {
+        "objeto": Tool(multiplicador, name="objeto", description="Multiplica"),
+        "parcial": Tool(functools.partial(sumar, b=10), name="parcial", description="Suma diez"),
+        "envuelta": Tool(lambda a, b: sumar(a, b), name="envuelta", description="Suma"),
+    }
+    results = asyncio.run(run_tool_calls(
+        [_call("objeto", a=3, b=4), _call("parcial", a=1), _call("envuelta", a=2, b=2)], tools
+    ))
+
+    assert [(result["status"], result["content"]) for result in results] == [
+        ("success", "12"), ("success", "11"), ("success", "4")
+    ]
+    assert tools["objeto"].is_async and multiplicador.threads == [threading.main_thread()]
+
+def test_optional_parameters_keep_their_type():
+    def buscar(texto: str, limite: Optional[int] = None, umbral: float | None = None,
+               etiquetas: Optional[list[str]] = None, valor: Union[int, str] = 0) -> str:
+        return texto
+
+    properties = Tool(buscar).parameters["properties"]
+
+    assert {name: schema["type"] for name, schema in properties.items()} == {
+        "texto": "string", "limite": "integer", "umbral": "number", "etiquetas": "array", "valor": "string"
+    }
@@ -0,0 +1,50 @@
+"""
+Pruebas de la recarga en caliente de la configuración
+"""
+
+import asyncio
+
+import pytest
+
+from agentforge_core.config.loader import ConfigError
+from agentforge_core.config.manager import ConfigManager
+
+def _config(**system):
+    return {
+        "system": system,
+        "providers": {"eco": {"type": "agentforge_core.llm.local:EchoProvider"}},
+        "framework": {"type": "custom"},
+        "agents": {},
+    }
+
+def test_reload_applies_admission_and_loop_monitor():
+    async def scenario():
+        manager = ConfigManager(_config(max_concurrency=8))
+        system = manager.system
+        await system.start()
+        states = []
+        changes = await manager.reload(_config(max_concurrency=8, adaptive_concurrency=True,
+                                               loop_monitor_threshold=0.5))
+        states.append((system.admission is not None, system.loop_monitor is not None
+                       and system.loop_monitor.threshold == 0.5))
+        await manager.reload(_config(max_concurrency=4))
+        states.append((system.admission is not None, system.scheduler.max_concurrency))
+        await system.stop()
+        return changes, states
+
+    changes, states = asyncio.run(scenario())
+
+    assert set(changes["system"]) == {"adaptive_concurrency", "loop_monitor_threshold"}
+    assert states == [(True, True), (False, 4)]
+
+def test_reload_rejects_node_id_change():
+    async def scenario():
+        manager = ConfigManager(_config(node_id="a"))
+        with pytest.raises(ConfigError, match="reinicio"):
+            await manager.reload(_config(node_id="b"))
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert manager.system.node_id == "a"
+    assert manager.config["system"]["node_id"] == "a"
@@ -0,0 +1,144 @@
+"""
+Servidor simulado compatible con la API de chat de OpenAI (y la de Groq)
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+class OpenAIStub:
+    """
+    Responde a /chat/completions y /models como lo haría la API real
+
+    Se usa como handler de httpx.MockTransport o se sirve con serve(). En
+    streaming envía el consumo en una parte final sin choices si la
+    petición lleva stream_options (OpenAI) o en el campo x_groq de la
+    última parte si no (Groq). Si la petición incluye herramientas,
+    responde llamando a la primera. Si el último mensaje es
+    "espera:<segundos>" tarda ese tiempo en responder.
+
+    Attributes:
+        reply (str): Texto de las respuestas
+        cached_tokens (int): Tokens de prompt cacheados que se informan
+        status (int): Código HTTP de todas las respuestas (200 para responder con normalidad)
+        requests (list): Peticiones recibidas (método, ruta, cuerpo)
+    """
+
+    def __init__(self, reply: str = "hola desde el stub", cached_tokens: int = 8, name: str = "stub"):
+        self.reply = reply
+        self.cached_tokens = cached_tokens
+        self.name = name
+        self.status = 200
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        body = json.loads(content) if content else None
+        self.requests.append((request.method, request.url.path, body))
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": {"message": "petición rechazada", "type": "stub"}})
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"object": "list", "data": [
+                {"id": "modelo", "object": "model", "created": 0, "owned_by": self.name}
+            ]})
+        if request.url.path.endswith("/chat/completions"):
+            content = str(body["messages"][-1].get("content") or "")
+            if content.startswith("espera:"):
+                await asyncio.sleep(float(content.partition(":")[2]))
+            if body.get("stream"):
+                return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                                      content=self._events(body))
+            return httpx.Response(200, json=self._completion(body))
+        return httpx.Response(404, json={"error": {"message": "ruta desconocida", "type": "stub"}})
+
+    def usage(self) -> dict:
+        completion_tokens = len(self.reply.split())
+        return {
+            "prompt_tokens": 12,
+            "completion_tokens": completion_tokens,
+            "total_tokens": 12 + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": self.cached_tokens},
+            "queue_time": 0.01,
+        }
+
+    def _completion(self, body: dict) -> dict:
+        message = {"role": "assistant", "content": f"{self.name}: {self.reply}"}
+        finish_reason = "stop"
+        if body.get("tools"):
+            tool = body["tools"][0]["function"]["name"]
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_1", "type": "function", "function": {"name": tool, "arguments": "{\"x\": 1}"}}
+            ]}
+            finish_reason = "tool_calls"
+        return {
+            "id": "chat-1", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": self.usage(),
+        }
+
+    def _events(self, body: dict) -> bytes:
+        words = f"{self.name}: {self.reply}".split(" ")
+        chunks = [
+            {"choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"}, "finish_reason": None}]}
+            for i, word in enumerate(words)
+        ]
+        chunks.append({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append({"choices": [], "usage": self.usage()})
+        else:
+            chunks[-1]["x_groq"] = {"id": "req-1", "usage": self.usage()}
+        lines = [
+            "data: " + json.dumps({"id": "chat-1", "object": "chat.completion.chunk", "created": 0,
+                                   "model": body["model"], **chunk}) + "\n\n"
+            for chunk in chunks
+        ]
+        return ("".join(lines) + "data: [DONE]\n\n").encode("utf-8")
+
+@asynccontextmanager
+async def serve(stub: OpenAIStub, path: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Sirve el stub por HTTP/1.1 con keep-alive en un puerto TCP libre o en un socket Unix
+
+    Args:
+        stub: Stub que responde a las peticiones
+        path: Ruta del socket Unix (None para TCP en 127.0.0.1)
+
+    Yields:
+        str: URL base de la API
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+                request_line, *lines = head.split("\r\n")
+                method, target, _ = request_line.split(" ", 2)
+                headers = dict(line.split(": ", 1) for line in lines if line)
+                length = int(next((value for key, value in headers.items() if key.lower() == "content-length"), 0))
+                body = await reader.readexactly(length)
+                response = await stub(httpx.Request(method, f"http://stub{target}", headers=headers, content=body))
+                content = await response.aread()
+                writer.write((
+                    f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n"
+                    f"content-type: {response.headers.get('content-type', 'application/json')}\r\n"
+                    f"content-length: {len(content)}\r\n\r\n"
+                ).encode("latin-1") + content)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    if path:
+        server = await asyncio.start_unix_server(handle, path)
+        url = "http://stub/v1"
+    else:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+    try:
+        yield url
+    finally:
+        server.close()
+        await server.wait_closed()
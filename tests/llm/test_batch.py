@@ -0,0 +1,51 @@
+"""
+Pruebas de los trabajos por lotes con el lote local por defecto (EchoProvider)
+"""
+
+import asyncio
+import json
+from collections import Counter
+
+from agentforge_core.llm.batch import BatchJob
+from agentforge_core.llm.local import EchoProvider
+
+INPUTS = [{"id": f"e{i}", "content": f"texto {i}"} for i in range(10)]
+
+def _job(tmp_path):
+    # Cada proveedor nuevo simula un proceso nuevo: no conoce los lotes anteriores
+    provider = EchoProvider()
+    provider.batch_max_requests = 4
+    return BatchJob(provider, tmp_path, job_id="nocturno", poll_interval=0.01)
+
+async def _run(tmp_path, inputs=None):
+    return [result async for result in _job(tmp_path).run(inputs)]
+
+def test_batch_job_emits_every_input(tmp_path):
+    results = asyncio.run(_run(tmp_path, INPUTS))
+
+    assert sorted(result["id"] for result in results) == sorted(item["id"] for item in INPUTS)
+    assert {result["response"]["content"] for result in results if result["id"] == "e3"} == {"echo: texto 3"}
+
+def test_resume_after_crash_emits_each_id_once(tmp_path):
+    async def crash():
+        results = _job(tmp_path).run(INPUTS)
+        seen = [await results.__anext__() for _ in range(3)]
+        await results.aclose()
+        return seen
+
+    first = asyncio.run(crash())
+    results_path = tmp_path / "nocturno" / "results.jsonl"
+    # La caída interrumpe la escritura de un resultado
+    with open(results_path, "a", encoding="utf-8") as f:
+        f.write('{"id": "e9", "sta')
+
+    resumed = asyncio.run(_run(tmp_path, INPUTS))
+    again = asyncio.run(_run(tmp_path))
+
+    expected = sorted(item["id"] for item in INPUTS)
+    assert len(first) == 3
+    for results in (resumed, again):
+        assert Counter(result["id"] for result in results) == Counter(expected)
+        assert all(result["status"] == "success" for result in results)
+    with open(results_path, "r", encoding="utf-8") as f:
+        assert sorted(json.loads(line)["id"] for line in f) == expected
@@ -0,0 +1,103 @@
+"""
+Pruebas de OpenAIProvider contra servidores compatibles locales
+"""
+
+import asyncio
+import importlib.util
+
+from agentforge_core.llm.openai import OpenAIProvider
+from tests.llm.stub import OpenAIStub, serve
+
+def _message(content):
+    return [{"role": "user", "content": content}]
+
+def test_requests_go_to_least_busy_replica():
+    stubs = [OpenAIStub(name="r0"), OpenAIStub(name="r1")]
+
+    async def scenario():
+        async with serve(stubs[0]) as url0, serve(stubs[1]) as url1:
+            provider = OpenAIProvider(model="modelo", base_url=[url0, url1])
+            try:
+                busy = asyncio.create_task(provider.chat(_message("espera:1")))
+                while not any(stub.requests for stub in stubs):
+                    await asyncio.sleep(0.01)
+                busy_stub = next(stub for stub in stubs if stub.requests)
+                # Con una réplica ocupada las demás peticiones van a la otra
+                replies = [(await provider.chat(_message("hola")))["content"] for _ in range(4)]
+                await busy
+            finally:
+                await provider.close()
+            return busy_stub, replies
+
+    busy_stub, replies = asyncio.run(scenario())
+    idle_stub = stubs[1 - stubs.index(busy_stub)]
+
+    assert len(busy_stub.requests) == 1
+    assert len(idle_stub.requests) == 4
+    assert replies == [f"{idle_stub.name}: hola desde el stub"] * 4
+
+def test_concurrent_requests_are_spread_across_replicas():
+    stubs = [OpenAIStub(name=f"r{i}") for i in range(3)]
+
+    async def scenario():
+        async with serve(stubs[0]) as url0, serve(stubs[1]) as url1, serve(stubs[2]) as url2:
+            provider = OpenAIProvider(model="modelo", base_url=[url0, url1, url2])
+            try:
+                await asyncio.gather(*(provider.chat(_message("espera:0.1")) for _ in range(6)))
+            finally:
+                await provider.close()
+
+    asyncio.run(scenario())
+
+    assert [len(stub.requests) for stub in stubs] == [2, 2, 2]
+
+def test_unix_socket_transport(tmp_path):
+    stub = OpenAIStub()
+    path = str(tmp_path / "llm.sock")
+
+    async def scenario():
+        async with serve(stub, path) as url:
+            provider = OpenAIProvider(model="modelo", base_url=url, uds=path)
+            try:
+                result = await provider.chat(_message("hola"))
+                chunks = [chunk async for chunk in provider.stream(_message("hola"))]
+            finally:
+                await provider.close()
+            return result, chunks
+
+    result, chunks = asyncio.run(scenario())
+
+    assert result["content"] == "stub: hola desde el stub"
+    assert "".join(chunk["content"] for chunk in chunks) == "stub: hola desde el stub"
+    assert len(stub.requests) == 2
+
+def test_stop_inside_loop_is_awaited_by_close():
+    stub = OpenAIStub()
+
+    async def scenario():
+        async with serve(stub) as url:
+            provider = OpenAIProvider(model="modelo", base_url=url)
+            await provider.chat(_message("hola"))
+            clients = list(provider._clients)
+            provider.stop()
+            assert provider._closing
+            await provider.close()
+            return provider, clients
+
+    provider, clients = asyncio.run(scenario())
+
+    assert provider._closing == []
+    assert all(client.is_closed() for client in clients)
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *args: None if name == "h2" else find_spec(name, *args))
+    provider = OpenAIProvider(api_key="clave", http2=True)
+
+    async def scenario():
+        client = provider._create_http_client()
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    assert provider.http2 is False
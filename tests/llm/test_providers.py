@@ -0,0 +1,114 @@
+"""
+Pruebas de conformidad de los proveedores compatibles con la API de OpenAI
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from agentforge_core.llm.groq import GroqProvider
+from agentforge_core.llm.openai import OpenAIProvider
+from tests.llm.stub import OpenAIStub
+
+PROVIDERS = {"openai": OpenAIProvider, "groq": GroqProvider}
+
+@pytest.fixture(params=list(PROVIDERS))
+def kind(request):
+    return request.param
+
+def _provider(kind, stub, **kwargs):
+    provider = PROVIDERS[kind](api_key="clave", model="modelo", **kwargs)
+    provider._create_http_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    assert provider.start()
+    return provider
+
+def _run(provider, coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            await provider.close()
+    return asyncio.run(scenario())
+
+def test_chat(kind):
+    stub = OpenAIStub()
+    provider = _provider(kind, stub)
+    result = _run(provider, provider.chat([{"role": "user", "content": "hola"}], temperature=0))
+
+    assert result["content"] == "stub: hola desde el stub"
+    assert result["role"] == "assistant"
+    assert result["finish_reason"] == "stop"
+    assert "tool_calls" not in result
+    _, path, body = stub.requests[0]
+    assert path.endswith("/chat/completions")
+    assert body["model"] == "modelo"
+    assert body["temperature"] == 0
+
+def test_usage_mapping(kind):
+    provider = _provider(kind, OpenAIStub())
+    usage = _run(provider, provider.chat([{"role": "user", "content": "hola"}]))["usage"]
+
+    assert usage["prompt_tokens"] == 12
+    assert usage["completion_tokens"] == 4
+    assert usage["total_tokens"] == 16
+    assert usage["cached_tokens"] == 8
+    # Solo Groq informa de los tiempos de cola y cómputo
+    assert ("queue_time" in usage) == (kind == "groq")
+
+def test_stream(kind):
+    stub = OpenAIStub()
+    provider = _provider(kind, stub)
+
+    async def collect():
+        return [chunk async for chunk in provider.stream([{"role": "user", "content": "hola"}])]
+
+    chunks = _run(provider, collect())
+    *parts, last = chunks
+
+    assert "".join(chunk["content"] for chunk in parts) == "stub: hola desde el stub"
+    assert last["finish_reason"] == "stop"
+    assert last["usage"]["total_tokens"] == 16
+    assert last["usage"]["cached_tokens"] == 8
+    # Groq no acepta stream_options: el consumo llega en x_groq
+    _, _, body = stub.requests[0]
+    assert ("stream_options" in body) == (kind == "openai")
+
+def test_tool_calls(kind):
+    stub = OpenAIStub()
+    provider = _provider(kind, stub)
+    tools = [{"type": "function", "function": {"name": "hora", "description": "Hora actual",
+                                               "parameters": {"type": "object", "properties": {}}}}]
+    result = _run(provider, provider.chat([{"role": "user", "content": "¿qué hora es?"}], tools=tools))
+
+    assert result["finish_reason"] == "tool_calls"
+    assert result["tool_calls"] == [
+        {"id": "call_1", "type": "function", "function": {"name": "hora", "arguments": "{\"x\": 1}"}}
+    ]
+    assert stub.requests[0][2]["tools"] == tools
+
+def test_health_check(kind):
+    stub = OpenAIStub()
+    provider = _provider(kind, stub)
+    _run(provider, provider.health_check())
+
+    method, path, _ = stub.requests[0]
+    assert method == "GET"
+    assert path.endswith("/models")
+
+def test_health_check_fails_on_rejected_key(kind):
+    stub = OpenAIStub()
+    stub.status = 401
+    provider = _provider(kind, stub)
+
+    with pytest.raises(Exception):
+        _run(provider, provider.health_check())
+
+def test_errors_are_returned_as_error_responses(kind):
+    stub = OpenAIStub()
+    stub.status = 400
+    provider = _provider(kind, stub)
+    result = _run(provider, provider.chat([{"role": "user", "content": "hola"}]))
+
+    assert result["role"] == "error"
+    assert result["finish_reason"] == "error"
@@ -0,0 +1,57 @@
+"""
+Pruebas del almacén de embeddings en disco
+"""
+
+import asyncio
+import os
+import threading
+
+import numpy as np
+
+from agentforge_core.llm.local import HashingEmbedder
+from agentforge_core.llm.vectorstore import VectorStore
+
+def test_embed_uses_store_as_cache(tmp_path):
+    embedder = HashingEmbedder(dim=32)
+    store = VectorStore(str(tmp_path), 32, "hashing")
+    texts = ["uno dos tres", "cuatro cinco seis", "uno dos tres"]
+    first = asyncio.run(embedder.embed(texts, store=store))
+
+    calls = []
+    embedder._embed_batch = lambda batch, **kwargs: calls.append(batch)
+    second = asyncio.run(embedder.embed(texts, store=VectorStore(str(tmp_path), 32, "hashing")))
+
+    assert len(store) == 2
+    assert calls == []
+    np.testing.assert_array_equal(first, second)
+
+def test_embed_does_not_block_event_loop_on_store(tmp_path):
+    store = VectorStore(str(tmp_path), 8)
+    threads = []
+    put_many = store.put_many
+
+    def recording_put_many(texts, vectors):
+        threads.append(threading.current_thread())
+        return put_many(texts, vectors)
+
+    store.put_many = recording_put_many
+    asyncio.run(HashingEmbedder(dim=8).embed(["hola mundo"], store=store))
+
+    assert threads and threads[0] is not threading.main_thread()
+
+def test_torn_key_write_is_discarded(tmp_path):
+    store = VectorStore(str(tmp_path), 4)
+    store.put_many(["a", "b"], np.array([[1, 1, 1, 1], [2, 2, 2, 2]]))
+    # Un escritor interrumpido deja un vector completo y media clave
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.full(4, 9, dtype=np.float32).tobytes())
+    with open(tmp_path / "keys.bin", "ab") as f:
+        f.write(b"\x00" * 7)
+
+    reopened = VectorStore(str(tmp_path), 4)
+    reopened.put_many(["c", "d"], np.array([[3, 3, 3, 3], [4, 4, 4, 4]]))
+    vectors, missing = VectorStore(str(tmp_path), 4).get_many(["a", "b", "c", "d"])
+
+    assert missing == []
+    assert vectors[:, 0].tolist() == [1, 2, 3, 4]
+    assert os.path.getsize(tmp_path / "keys.bin") == 4 * 16
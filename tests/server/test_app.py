@@ -0,0 +1,204 @@
+"""
+Pruebas de la aplicación ASGI con un proveedor local (EchoProvider)
+"""
+
+import asyncio
+import json
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.system import AgentSystem
+from agentforge_core.llm.local import EchoProvider
+from agentforge_core.server import create_app
+
+async def chat(agent, message):
+    provider = agent.get_metadata("system").get_provider()
+    response = await provider.chat([{"role": "user", "content": message.get("content", "")}])
+    return {"response": response["content"]}
+
+async def stream(agent, message):
+    provider = agent.get_metadata("system").get_provider()
+    async for chunk in provider.stream([{"role": "user", "content": message.get("content", "")}]):
+        yield chunk
+
+async def endless(agent, message):
+    try:
+        while True:
+            yield {"content": "."}
+            await asyncio.sleep(0.01)
+    finally:
+        agent.set_metadata("closed", True)
+
+def _app(delay=0.0):
+    system = AgentSystem()
+    system.add_provider(EchoProvider(delay=delay))
+    system.set_framework(CustomAgentFramework())
+    system.create_agent("eco", processor=chat)
+    system.create_agent("stream", processor=stream)
+    system.create_agent("infinito", processor=endless)
+    return create_app(system, drain_timeout=5)
+
+class Client:
+    """
+    Cliente ASGI mínimo que guarda los mensajes enviados por la aplicación
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.disconnected = asyncio.Event()
+
+    async def request(self, method, path, body=None, query=b"", send=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        received = [{"type": "http.request", "body": data, "more_body": False}]
+        messages = []
+
+        async def receive():
+            if received:
+                return received.pop()
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def record(message):
+            messages.append(message)
+            if send is not None:
+                await send(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": []}
+        await self.app(scope, receive, record)
+        return messages
+
+def _status(messages):
+    starts = [message for message in messages if message["type"] == "http.response.start"]
+    assert len(starts) == 1
+    return starts[0]["status"]
+
+def _json(messages):
+    return json.loads(b"".join(message.get("body", b"") for message in messages[1:]))
+
+def _events(messages):
+    text = b"".join(message.get("body", b"") for message in messages[1:]).decode()
+    events = []
+    for block in filter(None, text.split("\n\n")):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+def test_messages():
+    async def scenario():
+        client = Client(_app())
+        return (await client.request("POST", "/agents/eco/messages", {"content": "hola"}),
+                await client.request("POST", "/agents/nadie/messages", {"content": "hola"}))
+
+    found, missing = asyncio.run(scenario())
+
+    assert _status(found) == 200
+    assert _json(found)["response"] == "echo: hola"
+    assert _status(missing) == 404
+
+def test_message_to_streaming_agent():
+    async def scenario():
+        client = Client(_app())
+        return (await client.request("POST", "/agents/stream/messages", {"content": "hola mundo"}),
+                await client.request("POST", "/broadcast", {"content": "hola"}, query=b"agents=stream"))
+
+    message, broadcast = asyncio.run(scenario())
+
+    assert _status(message) == 200
+    assert _json(message)["response"] == "echo: hola mundo"
+    assert _json(broadcast)["stream"]["status"] == "success"
+    assert _json(broadcast)["stream"]["response"] == "echo: hola"
+
+def test_stream_sse():
+    messages = asyncio.run(Client(_app()).request("POST", "/agents/stream/stream", {"content": "hola mundo"}))
+    events = _events(messages)
+
+    assert _status(messages) == 200
+    assert dict(messages[0]["headers"])[b"content-type"] == b"text/event-stream"
+    assert "".join(data.get("content", "") for event, data in events if event == "chunk") == "echo: hola mundo"
+    assert events[-1] == ("done", {})
+    assert messages[-1]["more_body"] is False
+
+def test_stream_error_after_start_ends_body():
+    async def scenario():
+        sent = 0
+
+        async def send(message):
+            nonlocal sent
+            if message.get("more_body"):
+                sent += 1
+                if sent == 2:
+                    raise OSError("conexión interrumpida")
+
+        return await Client(_app()).request("POST", "/agents/stream/stream", {"content": "hola mundo"}, send=send)
+
+    messages = asyncio.run(scenario())
+
+    # Una sola respuesta: el error no se envía como otra respuesta JSON
+    assert _status(messages) == 200
+    assert messages[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+def test_stream_is_cancelled_when_client_disconnects():
+    app = _app()
+
+    async def scenario():
+        client = Client(app)
+        chunks = 0
+
+        async def send(message):
+            nonlocal chunks
+            if message.get("more_body"):
+                chunks += 1
+                if chunks == 3:
+                    client.disconnected.set()
+
+        await asyncio.wait_for(client.request("POST", "/agents/infinito/stream", {}, send=send), 2)
+
+    asyncio.run(scenario())
+
+    assert app.system.registry.get("infinito").get_metadata("closed") is True
+    assert app.system.inflight == 0
+
+def test_broadcast():
+    client = Client(_app())
+    messages = asyncio.run(client.request("POST", "/broadcast", {"content": "hola"}, query=b"agents=eco,stream"))
+
+    assert _status(messages) == 200
+    results = _json(messages)
+    assert set(results) == {"eco", "stream"}
+    assert results["eco"]["response"] == "echo: hola"
+
+def test_lifespan_drains_inflight_requests():
+    app = _app(delay=0.3)
+
+    async def scenario():
+        events = asyncio.Queue()
+        sent = []
+
+        async def receive():
+            return await events.get()
+
+        async def send(message):
+            sent.append(message["type"])
+
+        lifespan = asyncio.create_task(app({"type": "lifespan"}, receive, send))
+        await events.put({"type": "lifespan.startup"})
+        while not sent:
+            await asyncio.sleep(0.01)
+        assert app.system.running
+
+        client = Client(app)
+        request = asyncio.create_task(client.request("POST", "/agents/eco/messages", {"content": "hola"}))
+        await asyncio.sleep(0.05)
+        await events.put({"type": "lifespan.shutdown"})
+        await asyncio.sleep(0.05)
+        # Durante el apagado se rechazan las peticiones nuevas
+        rejected = await client.request("GET", "/health")
+        await lifespan
+        return sent, await request, rejected
+
+    sent, drained, rejected = asyncio.run(scenario())
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert _status(drained) == 200
+    assert _json(drained)["response"] == "echo: hola"
+    assert _status(rejected) == 503
+    assert not app.system.running
@@ -0,0 +1,64 @@
+"""
+Pruebas de la fachada síncrona
+"""
+
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from agentforge_core import SyncAgentSystem
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.llm.local import EchoProvider
+
+async def echo(agent, message):
+    await asyncio.sleep(message.get("delay", 0))
+    return {"response": message.get("content")}
+
+async def words(agent, message):
+    for word in message.get("content", "").split():
+        await asyncio.sleep(message.get("delay", 0))
+        yield {"content": word}
+
+def _agents(**kwargs):
+    agents = SyncAgentSystem(**kwargs)
+    agents.add_provider(EchoProvider())
+    agents.set_framework(CustomAgentFramework())
+    agents.create_agent("eco", processor=echo)
+    agents.create_agent("palabras", processor=words)
+    return agents
+
+def test_stream_message_is_a_sync_iterator():
+    with _agents() as agents:
+        chunks = list(agents.stream_message("palabras", {"content": "uno dos tres"}))
+
+    assert [chunk["content"] for chunk in chunks] == ["uno", "dos", "tres"]
+
+def test_breaking_out_closes_the_stream():
+    with _agents() as agents:
+        for chunk in agents.stream_message("palabras", {"content": "uno dos tres"}):
+            break
+        # El stream libera su hueco del planificador al cerrarse
+        inflight = agents.inflight
+
+    assert chunk["content"] == "uno"
+    assert inflight == 0
+
+def test_submit_batch_is_a_sync_iterator(tmp_path):
+    with _agents() as agents:
+        results = list(agents.submit_batch([{"id": "a", "content": "hola"}, {"id": "b", "content": "adiós"}],
+                                           job_id="prueba", spool_dir=str(tmp_path), poll_interval=0))
+
+    assert sorted(result["id"] for result in results) == ["a", "b"]
+
+def test_blocking_calls_have_a_wait_timeout():
+    with _agents(wait_timeout=0.1) as agents:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            agents.process_message("eco", {"content": "hola", "delay": 5})
+        with pytest.raises(concurrent.futures.TimeoutError):
+            list(agents.stream_message("palabras", {"content": "uno dos", "delay": 5}))
+        result = agents.process_message("eco", {"content": "hola", "delay": 0.2}, wait_timeout=2)
+        inflight = agents.inflight
+
+    assert result["response"] == "hola"
+    assert inflight == 0
@@ -0,0 +1,243 @@
+"""
+Pruebas de varios nodos conectados por sockets Unix
+"""
+
+import asyncio
+import multiprocessing
+from contextlib import asynccontextmanager
+
+import pytest
+
+from agentforge_core.agent.frameworks.custom import CustomAgentFramework
+from agentforge_core.agent.remote import RemoteAgent
+from agentforge_core.agent.system import AgentSystem
+from agentforge_core.context import current_tenant
+from agentforge_core.transport import HashRing, SocketServer, SocketTransport, TransportError
+
+AGENTS = [f"agente-{i}" for i in range(16)]
+
+async def echo(agent, message):
+    await asyncio.sleep(message.get("delay", 0))
+    return {"response": f"{agent.get_metadata('system').node_id}:{message.get('content')}"}
+
+async def slow(agent, message):
+    try:
+        await asyncio.sleep(10)
+    except asyncio.CancelledError:
+        agent.set_metadata("cancelled", True)
+        raise
+    return {"response": "terminado"}
+
+def _system(node_id):
+    system = AgentSystem(node_id=node_id)
+    system.set_framework(CustomAgentFramework())
+    return system
+
+@asynccontextmanager
+async def cluster(tmp_path, node_ids=("a", "b"), codec="json"):
+    """
+    Levanta un nodo por ID con los agentes que le asigna el anillo
+    """
+    systems = {node_id: _system(node_id) for node_id in node_ids}
+    servers = {}
+    connections = {node_id: 0 for node_id in node_ids}
+    for node_id, system in systems.items():
+        server = SocketServer(system, path=str(tmp_path / f"{node_id}.sock"))
+        handler = server._handle_connection
+
+        async def counted(reader, writer, node_id=node_id, handler=handler):
+            connections[node_id] += 1
+            await handler(reader, writer)
+
+        server._handle_connection = counted
+        await server.start()
+        servers[node_id] = server
+    for system in systems.values():
+        for node_id in node_ids:
+            transport = None
+            if node_id != system.node_id:
+                transport = SocketTransport(path=servers[node_id].path, codec=codec)
+            system.add_node(node_id, transport)
+    for agent_id in AGENTS:
+        system = systems[systems["a"].locate(agent_id)]
+        system.create_agent(agent_id, processor=echo)
+    try:
+        yield systems, connections
+    finally:
+        for system in systems.values():
+            await system.disconnect_nodes()
+        for server in servers.values():
+            await server.stop()
+
+def _remote_agent(systems, node_id="b", processor=slow):
+    agent_id = next(f"lento-{i}" for i in range(1000) if systems["a"].locate(f"lento-{i}") == node_id)
+    return systems[node_id].create_agent(agent_id, processor=processor)
+
+def test_hash_ring_moves_only_keys_of_new_node():
+    ring = HashRing(["a", "b"])
+    before = {key: ring.get_node(key) for key in map(str, range(2000))}
+    ring.add_node("c")
+    moved = {key for key, node in before.items() if ring.get_node(key) != node}
+
+    assert all(ring.get_node(key) == "c" for key in moved)
+    assert 400 < len(moved) < 1000
+    assert HashRing(["b", "a"]).get_node("agente-1") == HashRing(["a", "b"]).get_node("agente-1")
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+def test_messages_are_routed_to_owner_node(tmp_path, codec):
+    async def scenario():
+        async with cluster(tmp_path, ("a", "b", "c"), codec) as (systems, _):
+            owners = {agent_id: systems["a"].locate(agent_id) for agent_id in AGENTS}
+            for agent_id, owner in owners.items():
+                result = await systems["a"].process_message(agent_id, {"content": agent_id})
+                assert result["status"] == "success"
+                assert result["response"] == f"{owner}:{agent_id}"
+                assert isinstance(systems["a"].resolve_agent(agent_id), RemoteAgent) == (owner != "a")
+            assert set(owners.values()) == {"a", "b", "c"}
+
+    asyncio.run(scenario())
+
+def test_concurrent_requests_share_one_connection(tmp_path):
+    async def scenario():
+        async with cluster(tmp_path) as (systems, connections):
+            agent_id = next(agent_id for agent_id in AGENTS if systems["a"].locate(agent_id) == "b")
+            # Las respuestas llegan en orden inverso al de envío
+            results = await asyncio.gather(*(
+                systems["a"].process_message(agent_id, {"content": i, "delay": 0.05 - i * 0.001})
+                for i in range(40)
+            ))
+
+            assert [result["response"] for result in results] == [f"b:{i}" for i in range(40)]
+            assert connections == {"a": 0, "b": 1}
+
+    asyncio.run(scenario())
+
+def test_remote_timeout_cancels_remote_work(tmp_path):
+    async def scenario():
+        async with cluster(tmp_path) as (systems, _):
+            agent = _remote_agent(systems)
+            result = await systems["a"].process_message(agent.id, {}, timeout=0.2)
+            await asyncio.sleep(0.1)
+
+            assert result["status"] == "timeout"
+            assert agent.get_metadata("cancelled") is True
+            assert systems["b"].inflight == 0
+
+    asyncio.run(scenario())
+
+def test_priority_and_tenant_reach_the_remote_node(tmp_path):
+    async def record(agent, message):
+        return {"response": current_tenant().name}
+
+    async def caller(agent, message):
+        system = agent.get_metadata("system")
+        return await system.process_message(message["target"], {}, priority=7)
+
+    async def scenario():
+        async with cluster(tmp_path) as (systems, _):
+            remote = _remote_agent(systems, processor=record)
+            local = next(f"cliente-{i}" for i in range(1000) if systems["a"].locate(f"cliente-{i}") == "a")
+            systems["a"].create_agent(local, processor=caller).set_metadata("tenant", "acme")
+            priorities = []
+            slot = systems["b"].scheduler.slot
+
+            def recording_slot(priority=0, *args, **kwargs):
+                priorities.append(priority)
+                return slot(priority, *args, **kwargs)
+
+            systems["b"].scheduler.slot = recording_slot
+            explicit = await systems["a"].process_message(remote.id, {"tenant": "globex"}, priority=3)
+            nested = await systems["a"].process_message(local, {"target": remote.id})
+            return explicit, nested, priorities, systems["b"].scheduler.tenants
+
+    explicit, nested, priorities, tenants = asyncio.run(scenario())
+
+    assert explicit["response"] == "globex"
+    # La llamada anidada hereda el tenant de la petición en curso en el nodo a
+    assert nested["response"] == "acme"
+    assert priorities == [3, 7]
+    assert tenants["acme"].completed == 1
+
+def test_cancelling_caller_cancels_remote_work(tmp_path):
+    async def scenario():
+        async with cluster(tmp_path) as (systems, _):
+            agent = _remote_agent(systems)
+            task = asyncio.create_task(systems["a"].process_message(agent.id, {}))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.1)
+
+            assert agent.get_metadata("cancelled") is True
+            assert systems["b"].inflight == 0
+
+    asyncio.run(scenario())
+
+def test_broadcast_reaches_local_and_remote_agents(tmp_path):
+    async def scenario():
+        async with cluster(tmp_path) as (systems, _):
+            for agent_id in AGENTS:
+                systems["a"].resolve_agent(agent_id)
+            results = await systems["a"].broadcast_message({"content": "hola"})
+
+            assert set(results) == set(AGENTS)
+            for agent_id, result in results.items():
+                assert result["response"] == f"{systems['a'].locate(agent_id)}:hola"
+
+    asyncio.run(scenario())
+
+def test_unreachable_node_returns_error(tmp_path):
+    async def scenario():
+        system = _system("a")
+        system.add_node("a")
+        system.add_node("b", SocketTransport(path=str(tmp_path / "nadie.sock"), connect_timeout=0.5))
+        agent_id = next(agent_id for agent_id in AGENTS if system.locate(agent_id) == "b")
+        result = await system.process_message(agent_id, {"content": "hola"})
+
+        assert result["status"] == "error"
+        assert result["node"] == "b"
+
+    asyncio.run(scenario())
+
+async def _serve_node(node_id, path, agent_ids):
+    system = _system(node_id)
+    for agent_id in agent_ids:
+        system.create_agent(agent_id, processor=echo)
+    server = await system.serve(path=path)
+    await server.serve_forever()
+
+def _run_node(node_id, path, agent_ids):
+    asyncio.run(_serve_node(node_id, path, agent_ids))
+
+def test_nodes_in_separate_processes(tmp_path):
+    ring = HashRing(["a", "b"])
+    remote = [agent_id for agent_id in AGENTS if ring.get_node(agent_id) == "b"]
+    path = str(tmp_path / "b.sock")
+    process = multiprocessing.get_context("spawn").Process(target=_run_node, args=("b", path, remote), daemon=True)
+    process.start()
+
+    async def scenario():
+        transport = SocketTransport(path=path, connect_timeout=0.5)
+        for _ in range(100):
+            try:
+                assert (await transport.request({"op": "ping"}, timeout=1))["node"] == "b"
+                break
+            except TransportError:
+                await asyncio.sleep(0.1)
+        system = _system("a")
+        system.add_node("a")
+        system.add_node("b", transport)
+        try:
+            results = await asyncio.gather(*(system.process_message(agent_id, {"content": agent_id})
+                                             for agent_id in remote))
+            assert [result["response"] for result in results] == [f"b:{agent_id}" for agent_id in remote]
+            assert sorted(await transport.request({"op": "list_agents"})) == sorted(remote)
+        finally:
+            await system.disconnect_nodes()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        process.terminate()
+        process.join(5)